@@ -215,23 +215,21 @@ class UberClique(object):
       # We fetch placeholder information from the original message (the XTB file
       # only contains placeholder names).
       original_msg = self.BestClique(id).GetMessage()
+      placeholder_index = original_msg.GetPlaceholderIndex()
 
-      translation = tclib.Translation(id=id)
+      parts = []
       for is_ph,text in structure:
         if not is_ph:
-          translation.AppendText(text)
+          parts.append(text)
         else:
-          found_placeholder = False
-          for ph in original_msg.GetPlaceholders():
-            if ph.GetPresentation() == text:
-              translation.AppendPlaceholder(tclib.Placeholder(
-                ph.GetPresentation(), ph.GetOriginal(), ph.GetExample()))
-              found_placeholder = True
-              break
-          if not found_placeholder:
+          ph = placeholder_index.get(text)
+          if ph is None:
             raise exception.MismatchingPlaceholders(
               'Translation for message ID %s had <ph name="%s"/>, no match\n'
               'in original message' % (id, text))
+          parts.append(ph)
+      translation = tclib.Translation(
+          id=id, parts=parts, placeholders=original_msg.GetSharedPlaceholders())
       self.FindCliqueAndAddTranslation(translation, lang)
     return Callback
 
@@ -297,6 +295,9 @@ class MessageClique(object):
   '''A message along with all of its translations.  Also code to bring
   translations together with their original message.'''
 
+  __slots__ = ('uber_clique', 'translateable', 'clique', 'real_content_cache_',
+               'shortcut_groups', 'custom_type')
+
   # change this to the language code of Messages you add to cliques_.
   # TODO(joi) Actually change this based on the <grit> node's source language
   source_language = 'en'
@@ -333,6 +334,11 @@ class MessageClique(object):
     # A mapping of language identifiers to tclib.BaseMessage and its
     # subclasses (i.e. tclib.Message and tclib.Translation).
     self.clique = { MessageClique.source_language : message }
+    # Maps (lang, pseudo_if_no_match, fallback_to_english, escaping_function)
+    # to the real content of the message for that language, so that each
+    # translation is rendered once.  Created on first use and dropped when a
+    # translation is added.
+    self.real_content_cache_ = None
     # A list of the "shortcut groups" this clique is
     # part of.  Within any given shortcut group, no shortcut key (e.g. &J)
     # must appear more than once in each language for all cliques that
@@ -387,9 +393,9 @@ class MessageClique(object):
     if lang == constants.CONSTANT_LANGUAGE:
       return self.CONSTANT_TRANSLATION
 
-    for msglang in self.clique.keys():
-      if lang == msglang:
-        return self.clique[msglang]
+    msg = self.clique.get(lang)
+    if msg is not None:
+      return msg
 
     if lang == constants.FAKE_BIDI:
       return pseudo_rtl.PseudoRTLMessage(self.GetMessage())
@@ -406,6 +412,25 @@ class MessageClique(object):
 
     return pseudo.PseudoMessage(self.GetMessage())
 
+  def RealContentForLanguage(self, lang, pseudo_if_no_match=True,
+                             fallback_to_english=False,
+                             escaping_function=tclib.Identity):
+    '''Returns the real content of MessageForLanguage(lang,
+    pseudo_if_no_match, fallback_to_english), with translateable parts
+    escaped by escaping_function.  The content is rendered only the first
+    time it is asked for.
+    '''
+    key = (lang, pseudo_if_no_match, fallback_to_english, escaping_function)
+    if self.real_content_cache_ is None:
+      self.real_content_cache_ = {}
+    content = self.real_content_cache_.get(key)
+    if content is None:
+      msg = self.MessageForLanguage(lang, pseudo_if_no_match,
+                                    fallback_to_english)
+      content = msg.GetRealContent(escaping_function=escaping_function)
+      self.real_content_cache_[key] = content
+    return content
+
   def AllMessagesThatMatch(self, lang_re, include_pseudo = True):
     '''Returns a map of all messages that match 'lang', including the pseudo
     translation if requested.
@@ -472,12 +497,25 @@ class MessageClique(object):
              (language, translation.GetId()))
       assert False
 
-    transl_msg = tclib.Translation(id=self.GetId(),
-                                   text=translation.GetPresentableContent(),
-                                   placeholders=original.GetPlaceholders())
+    placeholder_index = original.GetPlaceholderIndex()
+    parts = []
+    for part in translation.parts:
+      if isinstance(part, tclib.Placeholder):
+        ph = placeholder_index.get(part.GetPresentation())
+        if ph is None:
+          raise exception.MismatchingPlaceholders(
+            "'%s' translation of message id %s had placeholder %s, no match "
+            'in original message' % (language, translation.GetId(),
+                                     part.GetPresentation()))
+        part = ph
+      parts.append(part)
+    transl_msg = tclib.Translation(
+        id=self.GetId(), parts=parts,
+        placeholders=original.GetSharedPlaceholders())
 
     if self.custom_type and not self.custom_type.ValidateAndModify(language, transl_msg):
       print "WARNING: %s translation failed validation: %s" % (
         language, transl_msg.GetId())
 
     self.clique[language] = transl_msg
+    self.real_content_cache_ = None
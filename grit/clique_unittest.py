@@ -152,6 +152,33 @@ class MessageCliqueUnittest(unittest.TestCase):
     self.failUnless(cliques[1].MessageForLanguage('fr').GetRealContent() ==
                     'Bonjour %s')
 
+  def testXtbCallbackUsesOriginalPlaceholders(self):
+    factory = clique.UberClique()
+    placeholders = [tclib.Placeholder('USERNAME', '%s', 'Joi'),
+                    tclib.Placeholder('COUNT', '%d', '3')]
+    msg = tclib.Message(text='Hello USERNAME, you have COUNT messages',
+                        placeholders=placeholders)
+    c = factory.MakeClique(msg)
+    callback = factory.GenerateXtbParserCallback('fr')
+    callback(msg.GetId(), [(False, 'Bonjour '), (True, 'USERNAME'),
+                           (False, ', '), (True, 'COUNT'),
+                           (False, ' messages')])
+    transl = c.MessageForLanguage('fr')
+    self.failUnlessEqual('Bonjour %s, %d messages', transl.GetRealContent())
+    self.failUnless(
+        transl.GetSharedPlaceholders() is msg.GetSharedPlaceholders())
+
+    # Placeholders may be reordered in a translation.
+    callback = factory.GenerateXtbParserCallback('de')
+    callback(msg.GetId(), [(True, 'COUNT'), (False, ' Nachrichten, '),
+                           (True, 'USERNAME')])
+    self.failUnlessEqual('%d Nachrichten, %s',
+                         c.MessageForLanguage('de').GetRealContent())
+
+    callback = factory.GenerateXtbParserCallback('es')
+    self.assertRaises(exception.MismatchingPlaceholders, callback,
+                      msg.GetId(), [(True, 'NOSUCHPLACEHOLDER')])
+
   def testMissingTranslations(self):
     messages = [ tclib.Message(text='Hello'), tclib.Message(text='Goodbye') ]
     factory = clique.UberClique()
@@ -171,6 +198,32 @@ class MessageCliqueUnittest(unittest.TestCase):
     self.failUnless(report.count('ERROR') == 1)
     self.failUnless(report.count('800120468867715734 "Hello" de') == 1)
 
+  def testRealContentForLanguage(self):
+    factory = clique.UberClique()
+    placeholders = [tclib.Placeholder('USERNAME', '%s', 'Joi')]
+    msg = tclib.Message(text='Hello USERNAME', placeholders=placeholders)
+    c = factory.MakeClique(msg)
+    def Upper(text):
+      return text.upper()
+
+    self.failUnlessEqual('Hello %s', c.RealContentForLanguage('en'))
+    self.failUnlessEqual('HELLO %s', c.RealContentForLanguage(
+        'en', escaping_function=Upper))
+    self.failUnless(c.RealContentForLanguage('fr', False, True) is
+                    c.RealContentForLanguage('fr', False, True))
+    self.failUnlessEqual('Hello %s', c.RealContentForLanguage('fr', False,
+                                                              True))
+    self.failUnless(factory.fallback_translations_)
+
+    # Adding a translation replaces the fallback content.
+    c.AddTranslation(tclib.Translation(
+        text='Bonjour USERNAME', id=msg.GetId(),
+        placeholders=placeholders), 'fr')
+    self.failUnlessEqual('Bonjour %s', c.RealContentForLanguage('fr', False,
+                                                                True))
+    self.failUnlessEqual('BONJOUR %s', c.RealContentForLanguage(
+        'fr', escaping_function=Upper))
+
   def testCustomTypes(self):
     factory = clique.UberClique()
     message = tclib.Message(text='Bingo bongo')
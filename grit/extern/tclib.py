@@ -56,6 +56,9 @@ class MessageTranslationError(exceptions.Exception):
 # The Placeholder class represents a placeholder in a message.
 
 class Placeholder(object):
+  # Subclasses may use __slots__ to avoid a per-instance dictionary.
+  __slots__ = ()
+
   # String representation
   def __str__(self):
     return '%s, "%s", "%s"' % \
@@ -63,9 +63,9 @@ in the output xml file. For example:
 import os
 import re
 import types
-import xml.sax.saxutils
 
 from grit import lazy_re
+from grit.format import escaping
 from grit.node import message
 
 
@@ -117,10 +117,19 @@ def Format(root, lang='en', output_dir='.'):
       raise Exception('env variable ANDROID_JAVA_TAGGED_ONLY must have value '
                       'true or false. Invalid value: %s' % tagged_only)
 
+  items = []
+  values = []
   for item in root.ActiveDescendants():
     with item:
       if ShouldOutputNode(item, tagged_only):
-        yield _FormatMessage(item, lang)
+        items.append(item)
+        values.append(item.ws_at_start + item.Translate(lang) + item.ws_at_end)
+
+  # Replace < > & with &lt; &gt; &amp; to ensure we generate valid XML and
+  # replace ' " with \' \" to conform to Android's string formatting rules.
+  for item, value in zip(items, escaping.ANDROID_XML.EscapeAll(values)):
+    with item:
+      yield _FormatMessage(item, value)
 
   yield '</resources>\n'
 
@@ -179,8 +188,9 @@ def _FormatPluralMessage(message):
   return ''.join(lines)
 
 
-def _FormatMessage(item, lang):
-  """Writes out a single string as a <resource/> element."""
+def _FormatMessage(item, value):
+  """Writes out a single string as a <resource/> element, given its escaped
+  value."""
 
   mangled_name = item.GetTextualIds()[0]
   match = _NAME_PATTERN.match(mangled_name)
@@ -188,11 +198,6 @@ def _FormatMessage(item, lang):
     raise Exception('Unexpected resource name: %s' % mangled_name)
   name = match.group('name').lower()
 
-  value = item.ws_at_start + item.Translate(lang) + item.ws_at_end
-  # Replace < > & with &lt; &gt; &amp; to ensure we generate valid XML and
-  # replace ' " with \' \" to conform to Android's string formatting rules.
-  value = xml.sax.saxutils.escape(value, {"'": "\\'", '"': '\\"'})
-
   plurals = _FormatPluralMessage(value)
   if plurals:
     return _PLURALS_TEMPLATE % (name, plurals)
@@ -7,10 +7,10 @@
 """
 
 import os
-import re
 import types
 
 from grit import util
+from grit.format import escaping
 
 
 def _FormatHeader(root, output_dir):
@@ -40,46 +40,25 @@ def Format(root, lang='en', output_dir='.'):
 
   yield 'const char* GetString(int id) {\n  switch (id) {'
 
+  items = []
+  messages = []
   for item in root.ActiveDescendants():
     with item:
       if isinstance(item, message.MessageNode):
-        yield _FormatMessage(item, lang)
+        items.append(item)
+        messages.append(item.ws_at_start + item.Translate(lang) +
+                        item.ws_at_end)
+
+  # output messages with non-ascii chars escaped as octal numbers
+  for item, message_text in zip(items, escaping.C_STRING.EscapeAll(messages)):
+    with item:
+      yield _FormatMessage(item, message_text)
 
   yield '\n    default:\n      return 0;\n  }\n}'
 
 
-def _HexToOct(match):
-  "Return the octal form of the hex numbers"
-  hex = match.group("hex")
-  result = ""
-  while len(hex):
-    next_num = int(hex[2:4], 16)
-    result += "\\" + '%03d' % int(oct(next_num), 10)
-    hex = hex[4:]
-  return match.group("escaped_backslashes") + result
-
-
-def _FormatMessage(item, lang):
-  """Format a single <message> element."""
-
-  message = item.ws_at_start + item.Translate(lang) + item.ws_at_end
-  # output message with non-ascii chars escaped as octal numbers
-  # C's grammar allows escaped hexadecimal numbers to be infinite,
-  # but octal is always of the form \OOO
-  message = message.encode('utf-8').encode('string_escape')
-  # an escaped char is (\xHH)+ but only if the initial
-  # backslash is not escaped.
-  not_a_backslash = r"(^|[^\\])"  # beginning of line or a non-backslash char
-  escaped_backslashes = not_a_backslash + r"(\\\\)*"
-  hex_digits = r"((\\x)[0-9a-f]{2})+"
-  two_digit_hex_num = re.compile(
-    r"(?P<escaped_backslashes>%s)(?P<hex>%s)"
-    % (escaped_backslashes, hex_digits))
-  message = two_digit_hex_num.sub(_HexToOct, message)
-  # unescape \ (convert \\ back to \)
-  message = message.replace('\\\\', '\\')
-  message = message.replace('"', '\\"')
-  message = util.LINEBREAKS.sub(r'\\n', message)
+def _FormatMessage(item, message):
+  """Format a single <message> element, given its escaped text."""
 
   name_attr = item.GetTextualIds()[0]
 
@@ -6,34 +6,33 @@
 """Formats as a .json file that can be used to localize Google Chrome
 extensions."""
 
-from json import JSONEncoder
-import re
-import types
-
-from grit import util
+from grit.format import escaping
 from grit.node import message
 
 def Format(root, lang='en', output_dir='.'):
   """Format the messages as JSON."""
   yield '{\n'
 
-  encoder = JSONEncoder();
   format = ('  "%s": {\n'
-            '    "message": %s\n'
+            '    "message": "%s"\n'
             '  }')
-  first = True
+  ids = []
+  loc_messages = []
   for child in root.ActiveDescendants():
     if isinstance(child, message.MessageNode):
       id = child.attrs['name']
       if id.startswith('IDR_') or id.startswith('IDS_'):
         id = id[4:]
+      ids.append(id)
+      loc_messages.append(child.ws_at_start + child.Translate(lang) +
+                          child.ws_at_end)
 
-      loc_message = encoder.encode(child.ws_at_start + child.Translate(lang) +
-                                   child.ws_at_end)
-
-      if not first:
-        yield ',\n'
-      first = False
-      yield format % (id, loc_message)
+  first = True
+  for id, loc_message in zip(ids,
+                             escaping.JSON_STRING.EscapeAll(loc_messages)):
+    if not first:
+      yield ',\n'
+    first = False
+    yield format % (id, loc_message)
 
   yield '\n}\n'
@@ -16,6 +16,8 @@ if __name__ == '__main__':
   sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 from grit import util
+from grit.format import gzip_string
+from grit.format import rc_header
 from grit.node import include
 from grit.node import message
 from grit.node import structure
@@ -24,6 +26,21 @@ from grit.node import structure
 PACK_FILE_VERSION = 4
 HEADER_LENGTH = 2 * 4 + 1  # Two uint32s. (file version, number of entries) and
                            # one uint8 (encoding of text resources)
+# Version 5 adds a table of aliases after the index, so that resources with
+# byte-identical payloads share a single copy of the data.
+PACK_FILE_VERSION_WITH_ALIASES = 5
+HEADER_LENGTH_WITH_ALIASES = 4 + 4 + 2 + 2  # uint32 (file version), uint8
+                                            # (encoding), uint8 (flags) and
+                                            # 2 bytes padding, uint16s (number
+                                            # of entries and number of aliases)
+INDEX_ENTRY_LENGTH = 2 + 4  # uint16 (resource id) and uint32 (data offset)
+ALIAS_ENTRY_LENGTH = 2 + 2  # uint16 (resource id) and uint16 (index entry)
+# Set in the flags of a version 5 header when the alias table is followed by a
+# uint16 count and the sorted uint16 ids of the gzip-compressed resources.
+# Readers that ignore the flags still find all data through the index.
+FLAG_COMPRESSED_IDS = 0x01
+COMPRESSED_COUNT_LENGTH = 2  # uint16 (number of compressed resources)
+COMPRESSED_ENTRY_LENGTH = 2  # uint16 (resource id)
 BINARY, UTF8, UTF16 = range(3)
 
 
@@ -32,12 +49,16 @@ class WrongFileVersion(Exception):
 
 
 DataPackContents = collections.namedtuple(
-    'DataPackContents', 'resources encoding')
+    'DataPackContents', 'resources encoding compressed_ids')
+# Packs without compressed resources can leave out compressed_ids.
+DataPackContents.__new__.__defaults__ = (frozenset(),)
 
 
 def Format(root, lang='en', output_dir='.'):
   """Writes out the data pack file format (platform agnostic resource file)."""
   data = {}
+  compressed_ids = []
+  compressible_ids = GetCompressedIds(root)
   for node in root.ActiveDescendants():
     with node:
       if isinstance(node, (include.IncludeNode, message.MessageNode,
@@ -45,71 +66,373 @@ def Format(root, lang='en', output_dir='.'):
         id, value = node.GetDataPackPair(lang, UTF8)
         if value is not None:
           data[id] = value
-  return WriteDataPackToString(data, UTF8)
+          if id in compressible_ids:
+            compressed_ids.append(id)
+  for id, value in zip(compressed_ids,
+                       _GzipAll([data[id] for id in compressed_ids])):
+    data[id] = value
+  return WriteDataPackToString(data, UTF8, version=root.GetDataPackVersion(),
+                               compressed_ids=compressed_ids)
+
+
+def _GzipAll(values):
+  """Returns the gzip-compressed versions of |values|, compressing them in
+  parallel.  zlib releases the interpreter lock while compressing, so threads
+  are enough to use several cores.
+  """
+  if len(values) < 2:
+    return map(gzip_string.GzipString, values)
+  from multiprocessing import pool
+  thread_pool = pool.ThreadPool()
+  try:
+    return thread_pool.map(gzip_string.GzipString, values)
+  finally:
+    thread_pool.close()
+    thread_pool.join()
+
+
+def GetCompressedIds(root):
+  """Returns the set of the numeric ids of the resources of |root| that Format
+  gzip-compresses.
+  """
+  id_map = rc_header.GetIds(root)
+  return set(id_map[node.GetTextualIds()[0]]
+             for node in root.ActiveDescendants()
+             if isinstance(node, (include.IncludeNode, message.MessageNode,
+                                  structure.StructureNode)) and
+                node.GetDataPackCompression() == 'gzip')
+
+
+def DecompressResources(resources, compressed_ids):
+  """Returns a copy of the map of id=>data |resources| with the resources of
+  |compressed_ids| replaced by their decompressed contents, for inspection.
+  The compressed ids of a pack are read along with its resources, see
+  DataPackContents.
+  """
+  return dict((id, gzip_string.GunzipString(data)
+                   if id in compressed_ids else data)
+              for id, data in resources.iteritems())
 
 
 def ReadDataPack(input_file):
   """Reads a data pack file and returns a dictionary."""
   data = util.ReadFile(input_file, util.BINARY)
-  original_data = data
+  try:
+    return ReadDataPackFromString(data)
+  except WrongFileVersion:
+    print 'Wrong file version in ', input_file
+    raise
 
+
+def ReadDataPackFromString(data):
+  """Reads a data pack from a string and returns a dictionary.  Resources that
+  are aliases of another resource share the same string object.
+  """
   # Read the header.
-  version, num_entries, encoding = struct.unpack('<IIB', data[:HEADER_LENGTH])
-  if version != PACK_FILE_VERSION:
-    print 'Wrong file version in ', input_file
+  version = struct.unpack('<I', data[:4])[0]
+  if version == PACK_FILE_VERSION:
+    num_entries, encoding = struct.unpack('<IB', data[4:HEADER_LENGTH])
+    num_aliases = 0
+    flags = 0
+    index_offset = HEADER_LENGTH
+  elif version == PACK_FILE_VERSION_WITH_ALIASES:
+    encoding, flags, num_entries, num_aliases = struct.unpack(
+        '<BBxxHH', data[4:HEADER_LENGTH_WITH_ALIASES])
+    index_offset = HEADER_LENGTH_WITH_ALIASES
+  else:
     raise WrongFileVersion
 
   resources = {}
   if num_entries == 0:
     return DataPackContents(resources, encoding)
 
-  # Read the index and data.
-  data = data[HEADER_LENGTH:]
-  kIndexEntrySize = 2 + 4  # Each entry is a uint16 and a uint32.
-  for _ in range(num_entries):
-    id, offset = struct.unpack('<HI', data[:kIndexEntrySize])
-    data = data[kIndexEntrySize:]
-    next_id, next_offset = struct.unpack('<HI', data[:kIndexEntrySize])
-    resources[id] = original_data[offset:next_offset]
+  # Read the index and data.  The index has an extra entry at the end that
+  # marks the end of the last resource's data.
+  index = [struct.unpack_from('<HI', data,
+                              index_offset + i * INDEX_ENTRY_LENGTH)
+           for i in xrange(num_entries + 1)]
+  for i in xrange(num_entries):
+    id, offset = index[i]
+    resources[id] = data[offset:index[i + 1][1]]
+
+  # Read the alias table, which maps ids to entries of the index.
+  alias_offset = index_offset + (num_entries + 1) * INDEX_ENTRY_LENGTH
+  for i in xrange(num_aliases):
+    id, entry = struct.unpack_from('<HH', data,
+                                   alias_offset + i * ALIAS_ENTRY_LENGTH)
+    resources[id] = resources[index[entry][0]]
+
+  compressed_ids = frozenset()
+  if flags & FLAG_COMPRESSED_IDS:
+    compressed_offset = alias_offset + num_aliases * ALIAS_ENTRY_LENGTH
+    num_compressed = struct.unpack_from('<H', data, compressed_offset)[0]
+    compressed_ids = frozenset(struct.unpack_from(
+        '<%dH' % num_compressed, data,
+        compressed_offset + COMPRESSED_COUNT_LENGTH))
+
+  return DataPackContents(resources, encoding, compressed_ids)
+
+
+class DataPackFile(object):
+  """Random access to the resources of a data pack file on disk.  Opening the
+  file only reads its header; resources are found by binary search over the
+  sorted index (and alias table), so looking up one id reads O(log n) index
+  entries plus that resource's data.  Whether a resource is compressed is
+  looked up the same way in the table of compressed ids.
+  """
+
+  def __init__(self, filename):
+    self.filename = filename
+    self.file = open(filename, 'rb')
+    try:
+      header = self.file.read(HEADER_LENGTH_WITH_ALIASES)
+      if len(header) < HEADER_LENGTH:
+        raise WrongFileVersion(filename)
+      version = struct.unpack('<I', header[:4])[0]
+      flags = 0
+      if version == PACK_FILE_VERSION:
+        self.num_entries, self.encoding = struct.unpack(
+            '<IB', header[4:HEADER_LENGTH])
+        self.num_aliases = 0
+        self.index_offset = HEADER_LENGTH
+      elif version == PACK_FILE_VERSION_WITH_ALIASES:
+        (self.encoding, flags, self.num_entries,
+         self.num_aliases) = struct.unpack('<BBxxHH', header[4:])
+        self.index_offset = HEADER_LENGTH_WITH_ALIASES
+      else:
+        raise WrongFileVersion(filename)
+      self.version = version
+      self.alias_offset = (self.index_offset +
+                           (self.num_entries + 1) * INDEX_ENTRY_LENGTH)
+      self.compressed_offset = (self.alias_offset +
+                                self.num_aliases * ALIAS_ENTRY_LENGTH +
+                                COMPRESSED_COUNT_LENGTH)
+      self.num_compressed = 0
+      if flags & FLAG_COMPRESSED_IDS and self.num_entries:
+        self.num_compressed = struct.unpack('<H', self._Read(
+            self.compressed_offset - COMPRESSED_COUNT_LENGTH,
+            COMPRESSED_COUNT_LENGTH))[0]
+    except:
+      self.file.close()
+      raise
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.Close()
+
+  def Close(self):
+    self.file.close()
+
+  def _Read(self, offset, length):
+    self.file.seek(offset)
+    return self.file.read(length)
+
+  def _IndexEntry(self, entry):
+    """Returns the (id, data offset) pair of the index entry |entry|."""
+    return struct.unpack('<HI', self._Read(
+        self.index_offset + entry * INDEX_ENTRY_LENGTH, INDEX_ENTRY_LENGTH))
+
+  def _AliasEntry(self, alias):
+    """Returns the (id, index entry) pair of the alias table entry |alias|."""
+    return struct.unpack('<HH', self._Read(
+        self.alias_offset + alias * ALIAS_ENTRY_LENGTH, ALIAS_ENTRY_LENGTH))
+
+  def _CompressedEntry(self, entry):
+    """Returns the (id,) of entry |entry| of the table of compressed ids."""
+    return struct.unpack('<H', self._Read(
+        self.compressed_offset + entry * COMPRESSED_ENTRY_LENGTH,
+        COMPRESSED_ENTRY_LENGTH))
+
+  @staticmethod
+  def _BinarySearch(count, get_entry, id):
+    """Returns the position of the entry for |id| among |count| entries sorted
+    by id, where get_entry(position) returns (id, value), or None.
+    """
+    lo, hi = 0, count
+    while lo < hi:
+      mid = (lo + hi) // 2
+      mid_id = get_entry(mid)[0]
+      if mid_id < id:
+        lo = mid + 1
+      elif mid_id > id:
+        hi = mid
+      else:
+        return mid
+    return None
+
+  def _FindEntry(self, id):
+    """Returns the index entry holding the data of resource |id|, or None."""
+    entry = self._BinarySearch(self.num_entries, self._IndexEntry, id)
+    if entry is not None:
+      return entry
+    alias = self._BinarySearch(self.num_aliases, self._AliasEntry, id)
+    if alias is not None:
+      return self._AliasEntry(alias)[1]
+    return None
+
+  def _EntrySpan(self, entry):
+    """Returns the (offset, size) of the data of index entry |entry|."""
+    offset = self._IndexEntry(entry)[1]
+    return offset, self._IndexEntry(entry + 1)[1] - offset
+
+  def IsCompressed(self, id):
+    """Returns whether the pack records resource |id| as gzip-compressed."""
+    return self._BinarySearch(self.num_compressed, self._CompressedEntry,
+                              id) is not None
+
+  def GetSize(self, id):
+    """Returns the size in bytes of resource |id|, or None if it is absent."""
+    entry = self._FindEntry(id)
+    if entry is None:
+      return None
+    return self._EntrySpan(entry)[1]
+
+  def GetResource(self, id):
+    """Returns the data of resource |id|, or None if it is absent."""
+    entry = self._FindEntry(id)
+    if entry is None:
+      return None
+    return self._Read(*self._EntrySpan(entry))
+
+  def GetPrefix(self, id, length):
+    """Returns at most the first |length| bytes of resource |id|."""
+    entry = self._FindEntry(id)
+    if entry is None:
+      return None
+    offset, size = self._EntrySpan(entry)
+    return self._Read(offset, min(size, length))
+
+  def ListResources(self):
+    """Returns a list of (id, size, aliased id or None) triples, sorted by id.
+    Only the index and alias table are read.
+    """
+    index_data = self._Read(self.index_offset,
+                            (self.num_entries + 1) * INDEX_ENTRY_LENGTH)
+    index = [struct.unpack_from('<HI', index_data, i * INDEX_ENTRY_LENGTH)
+             for i in xrange(self.num_entries + 1)]
+    listing = [(index[i][0], index[i + 1][1] - index[i][1], None)
+               for i in xrange(self.num_entries)]
+    alias_data = self._Read(self.alias_offset,
+                            self.num_aliases * ALIAS_ENTRY_LENGTH)
+    for i in xrange(self.num_aliases):
+      id, entry = struct.unpack_from('<HH', alias_data, i * ALIAS_ENTRY_LENGTH)
+      listing.append((id, index[entry + 1][1] - index[entry][1],
+                      index[entry][0]))
+    return sorted(listing)
+
+
+def _ComputeAliases(resources):
+  """Returns a map of resource id => id of the lowest-numbered resource with a
+  byte-identical payload, for every resource that has such a duplicate.
+  """
+  ids = sorted(resources.keys())
+  # Iterate in reverse so that the lowest id with a given payload wins.
+  id_by_data = dict((resources[id], id) for id in reversed(ids))
+  return dict((id, id_by_data[resources[id]]) for id in ids
+              if id_by_data[resources[id]] != id)
+
+
+def GetAliasSavings(resources):
+  """Returns a (number of aliases, bytes saved) pair describing how much
+  smaller the resources are when written with PACK_FILE_VERSION_WITH_ALIASES,
+  which stores each distinct payload only once.
+  """
+  aliases = _ComputeAliases(resources)
+  saved = sum(len(resources[id]) + INDEX_ENTRY_LENGTH - ALIAS_ENTRY_LENGTH
+              for id in aliases)
+  saved -= HEADER_LENGTH_WITH_ALIASES - HEADER_LENGTH
+  return len(aliases), saved
 
-  return DataPackContents(resources, encoding)
 
+def WriteDataPackToString(resources, encoding, version=PACK_FILE_VERSION,
+                          compressed_ids=()):
+  """Returns a string with a map of id=>data in the data pack format.
+
+  Args:
+      resources: a map of id=>data.
+      encoding: BINARY, UTF8 or UTF16.
+      version: the data pack file version to write.
+      compressed_ids: the ids of the resources whose data is gzip-compressed,
+                      recorded in the pack so that readers can decompress
+                      them.  Only PACK_FILE_VERSION_WITH_ALIASES can record
+                      them.
 
-def WriteDataPackToString(resources, encoding):
-  """Returns a string with a map of id=>data in the data pack format."""
+  Raises:
+      WrongFileVersion: if |version| is not supported.
+      ValueError: if there are compressed resources and |version| cannot
+                  record them.
+  """
   ids = sorted(resources.keys())
+  compressed_ids = sorted(id for id in set(compressed_ids) if id in resources)
+  if compressed_ids and version != PACK_FILE_VERSION_WITH_ALIASES:
+    raise ValueError('Data pack version %d cannot record compressed '
+                     'resources, use version %d' %
+                     (version, PACK_FILE_VERSION_WITH_ALIASES))
   ret = []
 
-  # Write file header.
-  ret.append(struct.pack('<IIB', PACK_FILE_VERSION, len(ids), encoding))
-  HEADER_LENGTH = 2 * 4 + 1            # Two uint32s and one uint8.
+  if version == PACK_FILE_VERSION:
+    aliases = {}
+    ret.append(struct.pack('<IIB', version, len(ids), encoding))
+    header_length = HEADER_LENGTH
+  elif version == PACK_FILE_VERSION_WITH_ALIASES:
+    aliases = _ComputeAliases(resources)
+    flags = FLAG_COMPRESSED_IDS if compressed_ids else 0
+    ret.append(struct.pack('<IBBxxHH', version, encoding, flags,
+                           len(ids) - len(aliases), len(aliases)))
+    header_length = HEADER_LENGTH_WITH_ALIASES
+  else:
+    raise WrongFileVersion
+  entry_ids = [id for id in ids if id not in aliases]
 
   # Each entry is a uint16 + a uint32s. We have one extra entry for the last
   # item.
-  index_length = (len(ids) + 1) * (2 + 4)
+  index_length = (len(entry_ids) + 1) * INDEX_ENTRY_LENGTH
+  alias_length = len(aliases) * ALIAS_ENTRY_LENGTH
+  compressed_length = 0
+  if compressed_ids:
+    compressed_length = (COMPRESSED_COUNT_LENGTH +
+                         len(compressed_ids) * COMPRESSED_ENTRY_LENGTH)
 
   # Write index.
-  data_offset = HEADER_LENGTH + index_length
-  for id in ids:
+  data_offset = header_length + index_length + alias_length + compressed_length
+  entry_by_id = {}
+  for id in entry_ids:
+    entry_by_id[id] = len(entry_by_id)
     ret.append(struct.pack('<HI', id, data_offset))
     data_offset += len(resources[id])
 
   ret.append(struct.pack('<HI', 0, data_offset))
 
+  # Write the alias table, sorted by id.
+  for id in sorted(aliases.keys()):
+    ret.append(struct.pack('<HH', id, entry_by_id[aliases[id]]))
+
+  # Write the table of compressed ids.
+  if compressed_ids:
+    ret.append(struct.pack('<H%dH' % len(compressed_ids), len(compressed_ids),
+                           *compressed_ids))
+
   # Write data.
-  for id in ids:
+  for id in entry_ids:
     ret.append(resources[id])
   return ''.join(ret)
 
 
-def WriteDataPack(resources, output_file, encoding):
-  """Writes a map of id=>data into output_file as a data pack."""
-  content = WriteDataPackToString(resources, encoding)
+def WriteDataPack(resources, output_file, encoding, version=PACK_FILE_VERSION,
+                  compressed_ids=()):
+  """Writes a map of id=>data into output_file as a data pack, see
+  WriteDataPackToString.
+  """
+  content = WriteDataPackToString(resources, encoding, version=version,
+                                  compressed_ids=compressed_ids)
   with open(output_file, 'wb') as file:
     file.write(content)
 
 
-def RePack(output_file, input_files, whitelist_file=None):
+def RePack(output_file, input_files, whitelist_file=None,
+           version=PACK_FILE_VERSION):
   """Write a new data pack file by combining input pack files.
 
   Args:
@@ -118,18 +441,33 @@ def RePack(output_file, input_files, whitelist_file=None):
       whitelist_file: path to the file that contains the list of resource IDs
                       that should be kept in the output file or None to include
                       all resources.
+      version: the data pack file version to write.  Writing
+               PACK_FILE_VERSION_WITH_ALIASES stores identical resources once,
+               and is needed to keep resources that are compressed.
+
+  Returns:
+      A (number of aliases, bytes saved) pair, see GetAliasSavings(); (0, 0)
+      for versions without aliases.
 
   Raises:
       KeyError: if there are duplicate keys or resource encoding is
       inconsistent.
+      ValueError: if the inputs have compressed resources and |version|
+      cannot record them.
   """
   input_data_packs = [ReadDataPack(filename) for filename in input_files]
   whitelist = None
   if whitelist_file:
     whitelist = util.ReadFile(whitelist_file, util.RAW_TEXT).strip().split('\n')
     whitelist = set(map(int, whitelist))
-  resources, encoding = RePackFromDataPackStrings(input_data_packs, whitelist)
-  WriteDataPack(resources, output_file, encoding)
+  resources, encoding, compressed_ids = RePackFromDataPackStrings(
+      input_data_packs, whitelist)
+  savings = (0, 0)
+  if version == PACK_FILE_VERSION_WITH_ALIASES:
+    savings = GetAliasSavings(resources)
+  WriteDataPack(resources, output_file, encoding, version=version,
+                compressed_ids=compressed_ids)
+  return savings
 
 
 def RePackFromDataPackStrings(inputs, whitelist):
@@ -141,8 +479,8 @@ def RePackFromDataPackStrings(inputs, whitelist):
                  or None to include all resources.
 
   Returns:
-      DataPackContents: a tuple containing the new combined data pack and its
-                        encoding.
+      DataPackContents: a tuple containing the new combined data pack, its
+                        encoding and the ids of its compressed resources.
 
   Raises:
       KeyError: if there are duplicate keys or resource encoding is
@@ -150,6 +488,7 @@ def RePackFromDataPackStrings(inputs, whitelist):
   """
   resources = {}
   encoding = None
+  compressed_ids = set()
   for content in inputs:
     # Make sure we have no dups.
     duplicate_keys = set(content.resources.keys()) & set(resources.keys())
@@ -174,11 +513,13 @@ def RePackFromDataPackStrings(inputs, whitelist):
         print 'RePackFromDataPackStrings Removed Key:', key
     else:
       resources.update(content.resources)
+    compressed_ids.update(id for id in content.compressed_ids
+                          if id in resources)
 
   # Encoding is 0 for BINARY, 1 for UTF8 and 2 for UTF16
   if encoding is None:
     encoding = BINARY
-  return DataPackContents(resources, encoding)
+  return DataPackContents(resources, encoding, frozenset(compressed_ids))
 
 
 # Temporary hack for external programs that import data_pack.
@@ -197,8 +538,12 @@ def main():
     # format, for easier diffing.
     data = ReadDataPack(sys.argv[1])
     print data.encoding
-    for (resource_id, text) in data.resources.iteritems():
+    resources = DecompressResources(data.resources, data.compressed_ids)
+    for (resource_id, text) in resources.iteritems():
       print '%s: %s' % (resource_id, text)
+    num_aliases, saved = GetAliasSavings(data.resources)
+    print '%d duplicate resources (%d bytes) can be aliased' % (num_aliases,
+                                                                 saved)
   else:
     # Just write a simple file.
     data = {1: '', 4: 'this is id 4', 6: 'this is id 6', 10: ''}
@@ -11,9 +11,13 @@ import sys
 if __name__ == '__main__':
   sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
+import StringIO
 import unittest
 
+from grit import grd_reader
+from grit import util
 from grit.format import data_pack
+from grit.format import gzip_string
 
 
 class FormatDataPackUnittest(unittest.TestCase):
@@ -32,6 +36,185 @@ class FormatDataPackUnittest(unittest.TestCase):
     output = data_pack.WriteDataPackToString(input, data_pack.UTF8)
     self.failUnless(output == expected)
 
+  def testWriteDataPackWithAliases(self):
+    expected = (
+        '\x05\x00\x00\x00'                  # version
+        '\x01\x00\x00\x00'                  # encoding & padding
+        '\x03\x00'                          # resource_count
+        '\x01\x00'                          # alias_count
+        '\x01\x00\x28\x00\x00\x00'          # index entry 1
+        '\x04\x00\x28\x00\x00\x00'          # index entry 4
+        '\x06\x00\x34\x00\x00\x00'          # index entry 6
+        '\x00\x00\x40\x00\x00\x00'          # extra entry for the size of last
+        '\x0a\x00\x01\x00'                  # alias table: 10 -> entry 1
+        'this is id 4this is id 6')         # data
+    input = {1: '', 4: 'this is id 4', 6: 'this is id 6', 10: 'this is id 4'}
+    output = data_pack.WriteDataPackToString(
+        input, data_pack.UTF8,
+        version=data_pack.PACK_FILE_VERSION_WITH_ALIASES)
+    self.assertEqual(expected, output)
+
+  def testReadDataPack(self):
+    input = {1: '', 4: 'this is id 4', 6: 'this is id 6', 10: 'this is id 4',
+             11: ''}
+    for version in (data_pack.PACK_FILE_VERSION,
+                    data_pack.PACK_FILE_VERSION_WITH_ALIASES):
+      output = data_pack.WriteDataPackToString(input, data_pack.UTF16,
+                                               version=version)
+      contents = data_pack.ReadDataPackFromString(output)
+      self.assertDictEqual(input, contents.resources)
+      self.assertEqual(data_pack.UTF16, contents.encoding)
+
+  def testWriteDataPackWithCompressedIds(self):
+    expected = (
+        '\x05\x00\x00\x00'                  # version
+        '\x01\x01\x00\x00'                  # encoding, flags & padding
+        '\x02\x00'                          # resource_count
+        '\x01\x00'                          # alias_count
+        '\x01\x00\x28\x00\x00\x00'          # index entry 1
+        '\x04\x00\x29\x00\x00\x00'          # index entry 4
+        '\x00\x00\x2a\x00\x00\x00'          # extra entry for the size of last
+        '\x06\x00\x00\x00'                  # alias table: 6 -> entry 0
+        '\x02\x00'                          # compressed_count
+        '\x01\x00\x06\x00'                  # compressed ids 1 and 6
+        'ab')                               # data
+    input = {1: 'a', 4: 'b', 6: 'a'}
+    output = data_pack.WriteDataPackToString(
+        input, data_pack.UTF8,
+        version=data_pack.PACK_FILE_VERSION_WITH_ALIASES,
+        compressed_ids=[6, 1, 3])
+    self.assertEqual(expected, output)
+    contents = data_pack.ReadDataPackFromString(output)
+    self.assertDictEqual(input, contents.resources)
+    self.assertEqual(frozenset([1, 6]), contents.compressed_ids)
+
+  def testCompressedIdsNeedVersionWithAliases(self):
+    self.assertRaises(ValueError, data_pack.WriteDataPackToString,
+                      {1: 'a'}, data_pack.UTF8, compressed_ids=[1])
+
+  def testGetAliasSavings(self):
+    input = {1: 'abcdef', 2: 'abcdef', 3: 'abcdef', 4: 'xyz'}
+    num_aliases, saved = data_pack.GetAliasSavings(input)
+    self.assertEqual(2, num_aliases)
+    output_v4 = data_pack.WriteDataPackToString(input, data_pack.UTF8)
+    output_v5 = data_pack.WriteDataPackToString(
+        input, data_pack.UTF8,
+        version=data_pack.PACK_FILE_VERSION_WITH_ALIASES)
+    self.assertEqual(len(output_v4) - len(output_v5), saved)
+
+  def testDataPackFile(self):
+    input = {1: '', 4: 'this is id 4', 6: 'this is id 6', 10: 'this is id 4',
+             11: 'eleven'}
+    for version in (data_pack.PACK_FILE_VERSION,
+                    data_pack.PACK_FILE_VERSION_WITH_ALIASES):
+      with util.TempDir({}) as tmp_dir:
+        filename = tmp_dir.GetPath('test.pak')
+        data_pack.WriteDataPack(input, filename, data_pack.UTF8,
+                                version=version)
+        with data_pack.DataPackFile(filename) as pack:
+          self.assertEqual(version, pack.version)
+          self.assertEqual(data_pack.UTF8, pack.encoding)
+          for id, data in input.iteritems():
+            self.assertEqual(data, pack.GetResource(id))
+            self.assertEqual(len(data), pack.GetSize(id))
+          self.assertEqual('this', pack.GetPrefix(6, 4))
+          self.assertFalse(pack.IsCompressed(6))
+          for id in (0, 2, 5, 12):
+            self.assertEqual(None, pack.GetResource(id))
+          listing = pack.ListResources()
+      self.assertEqual([1, 4, 6, 10, 11], [id for id, _, _ in listing])
+      self.assertEqual([0, 12, 12, 12, 6], [size for _, size, _ in listing])
+      if version == data_pack.PACK_FILE_VERSION_WITH_ALIASES:
+        self.assertEqual((10, 12, 4), listing[3])
+
+  def testDataPackFileIsCompressed(self):
+    input = {1: 'one', 4: 'four', 6: 'one', 10: 'ten'}
+    with util.TempDir({}) as tmp_dir:
+      filename = tmp_dir.GetPath('test.pak')
+      data_pack.WriteDataPack(
+          input, filename, data_pack.UTF8,
+          version=data_pack.PACK_FILE_VERSION_WITH_ALIASES,
+          compressed_ids=[4, 6])
+      with data_pack.DataPackFile(filename) as pack:
+        self.assertEqual([False, True, True, False],
+                         [pack.IsCompressed(id) for id in (1, 4, 6, 10)])
+        self.assertFalse(pack.IsCompressed(5))
+        for id, data in input.iteritems():
+          self.assertEqual(data, pack.GetResource(id))
+
+  def _ParseIncludes(self, grit_attrs, includes):
+    grd = grd_reader.Parse(StringIO.StringIO('''<?xml version="1.0"?>
+      <grit latest_public_release="2" current_release="3" base_dir="."
+            %s>
+        <outputs></outputs>
+        <release seq="3">
+          <includes first_id="100">%s</includes>
+        </release>
+      </grit>''' % (grit_attrs, includes)), util.PathFromRoot('grit/testdata'))
+    grd.SetOutputLanguage('en')
+    grd.RunGatherers()
+    return grd
+
+  def _FormatIncludes(self, grit_attrs, includes):
+    grd = self._ParseIncludes(grit_attrs, includes)
+    return data_pack.ReadDataPackFromString(data_pack.Format(grd))
+
+  def testFormatCompressesResources(self):
+    html = util.ReadFile(util.PathFromRoot('grit/testdata/simple.html'),
+                         util.BINARY)
+    contents = self._FormatIncludes('data_pack_version="5"', '''
+        <include name="IDR_PLAIN" file="simple.html" type="BINDATA" />
+        <include name="IDR_GZIPPED" file="simple.html" type="BINDATA"
+                 compress="gzip" />''')
+    self.assertEqual(frozenset([101]), contents.compressed_ids)
+    self.assertEqual(html, contents.resources[100])
+    self.assertEqual(html, gzip_string.GunzipString(contents.resources[101]))
+    self.assertEqual({100: html, 101: html},
+                     data_pack.DecompressResources(contents.resources,
+                                                   contents.compressed_ids))
+
+  def testFormatCompressionDefault(self):
+    contents = self._FormatIncludes(
+        'data_pack_version="5" data_pack_compress="gzip"', '''
+        <include name="IDR_DEFAULT" file="simple.html" type="BINDATA" />
+        <include name="IDR_PLAIN" file="simple.html" type="BINDATA"
+                 compress="false" />''')
+    self.assertEqual(frozenset([100]), contents.compressed_ids)
+
+  def testFormatCompressionNeedsVersionWithAliases(self):
+    grd = self._ParseIncludes('data_pack_compress="gzip"', '''
+        <include name="IDR_DEFAULT" file="simple.html" type="BINDATA" />''')
+    self.assertRaises(ValueError, data_pack.Format, grd)
+
+  def testGetCompressedIds(self):
+    grd = self._ParseIncludes('data_pack_compress="gzip"', '''
+        <include name="IDR_DEFAULT" file="simple.html" type="BINDATA" />
+        <include name="IDR_PLAIN" file="simple.html" type="BINDATA"
+                 compress="false" />''')
+    self.assertEqual(set([100]), data_pack.GetCompressedIds(grd))
+
+  def testDecompressResourcesOnlyDecompressesCompressedIds(self):
+    # Resource 2 is stored as it is, but happens to be gzip data itself.
+    gzipped = gzip_string.GzipString('x')
+    self.assertEqual({1: 'x', 2: gzipped},
+                     data_pack.DecompressResources({1: gzipped, 2: gzipped},
+                                                   set([1])))
+
+  def testRePackKeepsCompressedIds(self):
+    with util.TempDir({}) as tmp_dir:
+      inputs = [tmp_dir.GetPath('1.pak'), tmp_dir.GetPath('2.pak')]
+      data_pack.WriteDataPack(
+          {1: 'one', 2: 'two'}, inputs[0], data_pack.UTF8,
+          version=data_pack.PACK_FILE_VERSION_WITH_ALIASES,
+          compressed_ids=[2])
+      data_pack.WriteDataPack({3: 'three'}, inputs[1], data_pack.UTF8)
+      output = tmp_dir.GetPath('out.pak')
+      data_pack.RePack(output, inputs,
+                       version=data_pack.PACK_FILE_VERSION_WITH_ALIASES)
+      self.assertEqual(frozenset([2]),
+                       data_pack.ReadDataPack(output).compressed_ids)
+      self.assertRaises(ValueError, data_pack.RePack, output, inputs)
+
   def testRePackUnittest(self):
     expected_with_whitelist = {
         1: 'Never gonna', 10: 'give you up', 20: 'Never gonna let',
@@ -50,12 +233,12 @@ class FormatDataPackUnittest(unittest.TestCase):
               in inputs]
 
     # RePack using whitelist
-    output, _ = data_pack.RePackFromDataPackStrings(inputs, whitelist)
+    output = data_pack.RePackFromDataPackStrings(inputs, whitelist).resources
     self.assertDictEqual(expected_with_whitelist, output,
                          'Incorrect resource output')
 
     # RePack a None whitelist
-    output, _ = data_pack.RePackFromDataPackStrings(inputs, None)
+    output = data_pack.RePackFromDataPackStrings(inputs, None).resources
     self.assertDictEqual(expected_without_whitelist, output,
                          'Incorrect resource output')
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Escaping of message text for the string literals of the C, JavaScript,
+JSON and Android XML formatters.
+
+Each escaper is built once, when the module is imported, and escapes a string
+in a single pass.  Escaper.EscapeAll() escapes all the messages of a language
+together, which saves the work of escaping them one at a time.
+'''
+
+import re
+from json import encoder as json_encoder
+
+from grit import util
+
+
+# Bytes a C string literal can contain as they are, i.e. printable ASCII other
+# than the backslash and quotation marks.
+_C_UNSAFE_RE = re.compile(r'[^ !#-&(-\[\]-~]+')
+
+# The C escape of every byte that is not safe.
+_C_ESCAPES = dict((chr(i), '\\%03o' % i) for i in range(256))
+_C_ESCAPES.update({'\t': '\\t', '\n': '\\n', '\r': '\\r', "'": "\\'",
+                   '"': '\\"'})
+
+# An escaped hexadecimal character, (\xHH)+, but only if the initial backslash
+# is not escaped itself.
+_C_HEX_ESCAPES_RE = re.compile(
+    r'(?P<escaped_backslashes>(^|[^\\])(\\\\)*)(?P<hex>((\\x)[0-9a-f]{2})+)')
+
+
+def _HexToOct(match):
+  '''Returns the octal form of the hexadecimal escapes in |match|.'''
+  hex = match.group('hex')
+  result = ''
+  while len(hex):
+    result += '\\%03o' % int(hex[2:4], 16)
+    hex = hex[4:]
+  return match.group('escaped_backslashes') + result
+
+
+def _EscapeCRun(match):
+  return ''.join([_C_ESCAPES[byte] for byte in match.group()])
+
+
+def _EscapeC(text):
+  '''Returns |text| as the UTF-8 encoded content of a C string literal, with
+  non-ASCII characters escaped as octal numbers.  C's grammar allows escaped
+  hexadecimal numbers to be infinite, but octal is always of the form \\OOO.
+
+  Backslashes in |text| are kept, so that messages can contain C escapes of
+  their own.
+  '''
+  data = text.encode('utf-8')
+  if '\\' not in data:
+    return _C_UNSAFE_RE.sub(_EscapeCRun, data)
+  # The backslashes of |text| are unescaped again once the hexadecimal escapes
+  # have been converted, which can only be done in separate passes.
+  data = _C_HEX_ESCAPES_RE.sub(_HexToOct, data.encode('string_escape'))
+  data = data.replace('\\\\', '\\')
+  data = data.replace('"', '\\"')
+  return util.LINEBREAKS.sub(r'\\n', data)
+
+
+def _EscapeJs(text):
+  '''Returns |text| as the content of a double-quoted JavaScript string.'''
+  return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _EscapeJson(text):
+  '''Returns |text| as the content of an ASCII-only JSON string.'''
+  return json_encoder.encode_basestring_ascii(text)[1:-1]
+
+
+def _EscapeAndroidXml(text):
+  '''Returns |text| as the content of an Android <string> element.  < > & are
+  replaced with &lt; &gt; &amp; to make valid XML, and ' " with \\' \\" to
+  conform to Android's string formatting rules.
+  '''
+  return (text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+          .replace("'", "\\'").replace('"', '\\"'))
+
+
+class Escaper(object):
+  '''Escapes text for the string literals of one output format.'''
+
+  def __init__(self, escape, separator, escaped_separator, unbatchable=''):
+    '''
+    Args:
+      escape: Function escaping a single string.
+      separator: Character EscapeAll() joins strings with, which |escape|
+        must escape to |escaped_separator| and nothing else to.
+      escaped_separator: '\\000'
+      unbatchable: Characters besides |separator| that |escape| does not
+        escape independently of the text around them.  Strings containing any
+        of them are escaped one at a time.
+    '''
+    self.Escape = escape
+    self.separator_ = separator
+    self.escaped_separator_ = escaped_separator
+    self.unbatchable_ = re.compile('[%s]' % re.escape(separator + unbatchable))
+
+  def EscapeAll(self, texts):
+    '''Returns the list of the escaped |texts|.
+
+    Args:
+      texts: [u'Say "cheese"', u'Hello']
+
+    Return:
+      [u'Say \\\\"cheese\\\\"', u'Hello'], for example.
+    '''
+    escaped = []
+    batch = []  # Indices of the texts in |escaped| escaped as one string.
+    for text in texts:
+      if self.unbatchable_.search(text):
+        escaped.append(self.Escape(text))
+      else:
+        batch.append(len(escaped))
+        escaped.append(text)
+    if batch:
+      joined = self.separator_.join([escaped[i] for i in batch])
+      parts = self.Escape(joined).split(self.escaped_separator_)
+      assert len(parts) == len(batch)
+      for i, part in zip(batch, parts):
+        escaped[i] = part
+    return escaped
+
+
+C_STRING = Escaper(_EscapeC, '\0', '\\000', unbatchable='\\')
+JS_STRING = Escaper(_EscapeJs, '\0', '\0')
+JSON_STRING = Escaper(_EscapeJson, '\0', '\\u0000', unbatchable='\\')
+ANDROID_XML = Escaper(_EscapeAndroidXml, '\0', '\0')
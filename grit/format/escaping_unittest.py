@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.format.escaping'''
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+
+from grit.format import escaping
+
+
+class EscapingUnittest(unittest.TestCase):
+
+  def testCString(self):
+    self.failUnlessEqual('Say \\"cheese\\", it\\\'s \\303\\251t\\303\\251\\n',
+                         escaping.C_STRING.Escape(u'Say "cheese", it\'s '
+                                                  u'\u00e9t\u00e9\n'))
+    self.failUnlessEqual('\\000\\001\\t\\177',
+                         escaping.C_STRING.Escape(u'\0\x01\t\x7f'))
+    # Backslashes are kept, so that messages can contain C escapes.
+    self.failUnlessEqual('\\t\\xc2\\303\\251\\"',
+                         escaping.C_STRING.Escape(u'\\t\\xc2\u00e9"'))
+
+  def testJsString(self):
+    self.failUnlessEqual(u'C:\\\\dir \\"quoted\\" \'single\'',
+                         escaping.JS_STRING.Escape(
+                             u'C:\\dir "quoted" \'single\''))
+
+  def testJsonString(self):
+    self.failUnlessEqual('\\"\\u00e9\\"\\\\\\n\\u0000',
+                         escaping.JSON_STRING.Escape(u'"\u00e9"\\\n\0'))
+
+  def testAndroidXml(self):
+    self.failUnlessEqual(u'&lt;b&gt; &amp; \\\'q\\\' \\"qq\\" 100%',
+                         escaping.ANDROID_XML.Escape(
+                             u'<b> & \'q\' "qq" 100%'))
+
+  def testEscapeAllMatchesEscape(self):
+    texts = [u'', u'plain', u'"quoted"\n', u'back\\slash', u'\u00e9\0',
+             u'\r\n', 'bytes', u'\\', u'']
+    for escaper in (escaping.C_STRING, escaping.JS_STRING,
+                    escaping.JSON_STRING, escaping.ANDROID_XML):
+      self.failUnlessEqual([escaper.Escape(text) for text in texts],
+                           escaper.EscapeAll(texts))
+      self.failUnlessEqual([], escaper.EscapeAll([]))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+"""Helpers for gzip-compressing and decompressing data pack resources.
+"""
+
+import gzip
+import StringIO
+
+
+# Every gzip stream starts with these two bytes.
+GZIP_MAGIC = '\x1f\x8b'
+
+
+def GzipString(data):
+  """Returns |data| gzip-compressed.  The output does not depend on the
+  current time, so unchanged inputs produce identical data packs.
+  """
+  gzip_output = StringIO.StringIO()
+  gzip_file = gzip.GzipFile(mode='wb', compresslevel=9, fileobj=gzip_output,
+                            mtime=0)
+  gzip_file.write(data)
+  gzip_file.close()
+  return gzip_output.getvalue()
+
+
+def GunzipString(data):
+  """Returns the decompressed contents of the gzip stream |data|."""
+  return gzip.GzipFile(mode='rb', fileobj=StringIO.StringIO(data)).read()
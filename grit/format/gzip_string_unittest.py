@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.format.gzip_string'''
+
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+import zlib
+
+from grit.format import gzip_string
+
+
+class FormatGzipStringUnittest(unittest.TestCase):
+  def testGzipStringRoundTrip(self):
+    input = ('TEST STRING STARTING\n'
+             'ABCDEFGHIJKLMNOPQRSTUVWXYZ\n'
+             'abcdefghijklmnopqrstuvwxyz\n'
+             '0123456789\n'
+             '!@#$%^&*()_+-=[]{}|;:\'",.<>/?\n'
+             'TEST STRING ENDING')
+    compressed = gzip_string.GzipString(input)
+    self.assertTrue(compressed.startswith(gzip_string.GZIP_MAGIC))
+    self.assertEqual(input, gzip_string.GunzipString(compressed))
+    # The output also decodes as a plain gzip stream.
+    self.assertEqual(input, zlib.decompress(compressed, 16 + zlib.MAX_WBITS))
+
+  def testGzipStringIsDeterministic(self):
+    input = 'The same input always compresses to the same bytes.'
+    self.assertEqual(gzip_string.GzipString(input),
+                     gzip_string.GzipString(input))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -8,37 +8,48 @@
 
 import re
 
-from grit import util
+from grit.format import escaping
 
 
 """The required preamble for JS files."""
 _HEADER = '// This file is automatically generated by GRIT.  Do not edit.\n'
 
+# Position numbers of placeholders, e.g. the 1$ of %1$s.
+_PLACEHOLDER_POSITION = re.compile(r'%\d\$([a-z])')
+
 
 def Format(root, lang='en', output_dir='.'):
   from grit.node import empty, message
   yield _HEADER
+  # <messages> nodes are None in |items|, since only a newline is output for
+  # them.
+  items = []
+  en_messages = []
+  loc_messages = []
   for item in root.ActiveDescendants():
     with item:
       if isinstance(item, message.MessageNode):
-        yield _FormatMessage(item, lang)
+        items.append(item)
+        en_message = item.ws_at_start + item.Translate('en') + item.ws_at_end
+        # Remove position numbers from placeholders.
+        en_messages.append(_PLACEHOLDER_POSITION.sub(r'%\1', en_message))
+        loc_messages.append(item.ws_at_start + item.Translate(lang) +
+                            item.ws_at_end)
       elif isinstance(item, empty.MessagesNode):
-        yield '\n'
-
+        items.append(None)
 
-def _FormatMessage(item, lang):
-  """Format a single message."""
+  # Escape backslashes and double quotes.
+  en_messages = iter(escaping.JS_STRING.EscapeAll(en_messages))
+  loc_messages = iter(escaping.JS_STRING.EscapeAll(loc_messages))
+  for item in items:
+    if item is None:
+      yield '\n'
+    else:
+      yield _FormatMessage(en_messages.next(), loc_messages.next())
 
-  en_message = item.ws_at_start + item.Translate('en') + item.ws_at_end
-  # Remove position numbers from placeholders.
-  en_message = re.sub(r'%\d\$([a-z])', r'%\1', en_message)
-  # Escape double quotes.
-  en_message = re.sub(r'\\', r'\\\\', en_message)
-  en_message = re.sub(r'"', r'\"', en_message)
 
-  loc_message = item.ws_at_start + item.Translate(lang) + item.ws_at_end
-  # Escape double quotes.
-  loc_message = re.sub(r'\\', r'\\\\', loc_message)
-  loc_message = re.sub(r'"', r'\"', loc_message)
+def _FormatMessage(en_message, loc_message):
+  """Format a single message, given its escaped English and localized
+  text."""
 
   return '\nlocalizedStrings["%s"] = "%s";' % (en_message, loc_message)
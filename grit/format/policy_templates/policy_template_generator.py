@@ -14,6 +14,9 @@ class PolicyTemplateGenerator:
   definition metafile and merge GUI message string definitions that come
   from a .grd resource tree onto it. After this, it can be used to output
   this data to policy template files using TemplateWriter objects.
+
+  The processed data is not changed once the constructor returns, so a single
+  generator can produce the templates of any number of writers.
   '''
 
   def _ImportMessage(self, msg_txt):
@@ -151,4 +154,8 @@ class PolicyTemplateGenerator:
     Returns:
       The text of the generated template.
     '''
-    return template_writer.WriteTemplate(self._policy_data)
+    # Writers sort and replace the list of policy definitions, so give each
+    # its own.  They do not change the policies themselves.
+    template = dict(self._policy_data)
+    template['policy_definitions'] = list(self._policy_definitions)
+    return template_writer.WriteTemplate(template)
@@ -5,8 +5,10 @@
 
 
 import sys
+import time
 from functools import partial
 
+from grit import literal_reader
 from grit.format.policy_templates import policy_template_generator
 from grit.format.policy_templates import writer_configuration
 from grit.node import misc
@@ -38,36 +40,130 @@ def _TemplateFormatter(writer_module_name, root, lang, output_dir):
 
   Yields the text of the template file.
   '''
-  __import__(writer_module_name)
-  writer_module = sys.modules[writer_module_name]
+  writer_module = _ImportWriterModule(writer_module_name)
   config = writer_configuration.GetConfigurationForBuild(root.defines)
-  policy_data = _ParseGritNodes(root, lang)
-  policy_generator = \
-      policy_template_generator.PolicyTemplateGenerator(config, policy_data)
+  policy_generator = _GetPolicyGenerator(root, lang, config)
   writer = writer_module.GetWriter(config)
   yield policy_generator.GetTemplateText(writer)
 
 
-def _ParseGritNodes(root, lang):
-  '''Collects the necessary information from the grit tree:
-  the message strings and the policy definitions.
+def _ImportWriterModule(writer_module_name):
+  __import__(writer_module_name)
+  return sys.modules[writer_module_name]
+
+
+def RenderTemplates(policy_text, defines, types):
+  '''Generates the policy templates of several writer types from the policy
+  data of one language, processing the data only once.  Unlike the formatter
+  this needs no grit tree, so it can run in another process.
+
+  Args:
+    policy_text: The translated policy templates, see GetPolicyTexts().
+    defines: The defines of the build, e.g. {'_chromium': '1'}
+    types: The writer types to generate templates for, e.g. ['adm', 'json']
+
+  Yields (type, text of the template file, seconds taken) for each type.
+  '''
+  config = writer_configuration.GetConfigurationForBuild(defines)
+  policy_generator = policy_template_generator.PolicyTemplateGenerator(
+      config, literal_reader.Parse(policy_text))
+  return _RenderTemplates(policy_generator, config, types)
+
+
+def RenderTreeTemplates(root, lang, types):
+  '''Like RenderTemplates(), but takes the policy data from the grit tree,
+  through the PolicyTemplateGenerator the formatters of |lang| share.
 
   Args:
     root: The root of the grit tree.
     lang: the language of outputted text, e.g.: 'en'
+    types: The writer types to generate templates for, e.g. ['adm', 'json']
+  '''
+  config = writer_configuration.GetConfigurationForBuild(root.defines)
+  return _RenderTemplates(_GetPolicyGenerator(root, lang, config), config,
+                          types)
+
+
+def _RenderTemplates(policy_generator, config, types):
+  for type in types:
+    start = time.time()
+    writer_module = _ImportWriterModule(
+        'grit.format.policy_templates.writers.%s_writer' % type)
+    text = policy_generator.GetTemplateText(writer_module.GetWriter(config))
+    yield type, text, time.time() - start
+
+
+def _GetPolicyGenerator(root, lang, config):
+  '''Returns the PolicyTemplateGenerator for |lang| and the policy templates
+  metafile active in the current output context, creating it the first time.
+  All the policy template outputs of a language share it, so the policy data
+  is translated, parsed and processed once per language rather than once per
+  output.  The build drops the generators once it is done.
+
+  Args:
+    root: The root of the grit tree.
+    lang: the language of outputted text, e.g.: 'en'
+    config: The configuration for root.defines, see writer_configuration.
+  '''
+  item = GetPolicyTemplateNode(root)
+  key = (item, lang, tuple(sorted(root.defines.items())))
+  policy_generator = root.policy_generators.get(key)
+  if policy_generator is None:
+    policy_generator = policy_template_generator.PolicyTemplateGenerator(
+        config, _ParseGritNode(item, lang))
+    root.policy_generators[key] = policy_generator
+  return policy_generator
+
+
+def _ParseGritNode(item, lang):
+  '''Collects the necessary information from the policy templates metafile:
+  the message strings and the policy definitions.
+
+  Args:
+    item: The policy_template_metafile structure, or None.
+    lang: the language of outputted text, e.g.: 'en'
 
   Returns:
     Policy data.
   '''
-  policy_data = None
+  if item is None:
+    return None
+  with item:
+    return item.gatherer.GetTranslatedData(
+        lang,
+        pseudo_if_not_available=item.PseudoIsAllowed(),
+        fallback_to_english=item.ShouldFallbackToEnglish())
+
+
+def GetPolicyTemplateNode(root):
+  '''Returns the policy_template_metafile structure active in the current
+  output context of the grit tree, or None if there is none.
+  '''
+  policy_item = None
   for item in root.ActiveDescendants():
     with item:
       if (isinstance(item, structure.StructureNode) and
           item.attrs['type'] == 'policy_template_metafile'):
-        assert policy_data is None
-        json_text = item.gatherer.Translate(
-            lang,
-            pseudo_if_not_available=item.PseudoIsAllowed(),
-            fallback_to_english=item.ShouldFallbackToEnglish())
-        policy_data = eval(json_text)
-  return policy_data
+        assert policy_item is None
+        policy_item = item
+  return policy_item
+
+
+def GetPolicyTexts(item, langs):
+  '''Returns the text of the policy templates metafile |item| translated into
+  each of |langs|, all translated at once.
+
+  Args:
+    item: The policy_template_metafile structure, or None.
+    langs: the languages of outputted text, e.g.: ['en', 'fr']
+
+  Return:
+    {'en': u'...', 'fr': u'...'}, with None texts if |item| is None.
+  '''
+  if item is None:
+    return dict((lang, None) for lang in langs)
+  with item:
+    return item.gatherer.TranslateAll(
+        langs,
+        pseudo_if_not_available=item.PseudoIsAllowed(),
+        fallback_to_english=item.ShouldFallbackToEnglish())
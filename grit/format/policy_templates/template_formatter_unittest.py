@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.format.policy_templates.template_formatter'''
+
+
+import os
+import shutil
+import sys
+import tempfile
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+import StringIO
+import unittest
+
+from grit import grd_reader
+from grit.format.policy_templates import template_formatter
+
+
+_POLICY_TEMPLATES = '''{
+  'policy_definitions': [
+    {
+      'name': 'ZetaPolicy',
+      'type': 'main',
+      'supported_on': ['chrome.win:8-', 'chrome.linux:8-'],
+      'features': {'dynamic_refresh': True},
+      'example_value': True,
+      'id': 1,
+      'caption': 'Zeta for $1.',
+      'desc': 'Enables zeta.',
+    },
+    {
+      'name': 'AlphaPolicy',
+      'type': 'string',
+      'supported_on': ['chrome.win:8-', 'chrome.linux:8-'],
+      'features': {'dynamic_refresh': True},
+      'example_value': 'alpha',
+      'id': 2,
+      'caption': 'Alpha.',
+      'desc': 'Sets alpha.',
+    },
+  ],
+  'messages': {
+    'win_supported_winxpsp2': {
+      'text': 'Windows XP SP2 or later',
+      'desc': 'Supported platforms.',
+    },
+  },
+  'placeholders': [],
+}'''
+
+
+class TemplateFormatterUnittest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    with open(os.path.join(self.tmp_dir, 'policy_templates.json'), 'w') as f:
+      f.write(_POLICY_TEMPLATES)
+    self.root = grd_reader.Parse(StringIO.StringIO('''<?xml version="1.0"?>
+      <grit latest_public_release="2" current_release="3" base_dir=".">
+        <outputs></outputs>
+        <release seq="3">
+          <structures>
+            <structure name="IDD_POLICY_SOURCE_FILE"
+                       file="policy_templates.json"
+                       type="policy_template_metafile" />
+          </structures>
+        </release>
+      </grit>'''), self.tmp_dir)
+    self.root.SetDefines({'_chromium': '1'})
+    self.root.SetOutputLanguage('en')
+    self.root.RunGatherers()
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _Format(self, type):
+    return ''.join(template_formatter.GetFormatter(type)(
+        self.root, 'en', self.tmp_dir))
+
+  def testOutputsSharePolicyData(self):
+    json_text = self._Format('json')
+    reg_text = self._Format('reg')
+    self.failUnlessEqual(1, len(self.root.policy_generators))
+    # Each writer sorts the policies its own way without affecting others.
+    self.failUnless(json_text.index('AlphaPolicy') <
+                    json_text.index('ZetaPolicy'))
+    self.failUnless('Chromium' in reg_text)
+    self.failUnlessEqual(json_text, self._Format('json'))
+    self.failUnlessEqual(reg_text, self._Format('reg'))
+    self.failUnlessEqual(1, len(self.root.policy_generators))
+
+  def testPolicyDataIsKeptPerLanguage(self):
+    self._Format('json')
+    ''.join(template_formatter.GetFormatter('json')(
+        self.root, 'fr', self.tmp_dir))
+    self.failUnlessEqual(2, len(self.root.policy_generators))
+
+  def testPolicyDataIsKeptPerMetafile(self):
+    with open(os.path.join(self.tmp_dir, 'other_templates.json'), 'w') as f:
+      f.write(_POLICY_TEMPLATES.replace('AlphaPolicy', 'BetaPolicy'))
+    self.root = grd_reader.Parse(StringIO.StringIO('''<?xml version="1.0"?>
+      <grit latest_public_release="2" current_release="3" base_dir=".">
+        <outputs></outputs>
+        <release seq="3">
+          <structures>
+            <if expr="context == 'main'">
+              <structure name="IDD_POLICY_SOURCE_FILE"
+                         file="policy_templates.json"
+                         type="policy_template_metafile" />
+            </if>
+            <if expr="context == 'other'">
+              <structure name="IDD_OTHER_POLICY_SOURCE_FILE"
+                         file="other_templates.json"
+                         type="policy_template_metafile" />
+            </if>
+          </structures>
+        </release>
+      </grit>'''), self.tmp_dir)
+    self.root.SetDefines({'_chromium': '1'})
+    self.root.SetOutputLanguage('en')
+    texts = []
+    for context in ('main', 'other'):
+      self.root.SetOutputContext(context)
+      self.root.RunGatherers()
+      texts.append(self._Format('json'))
+    main_text, other_text = texts
+    self.failUnless('AlphaPolicy' in main_text)
+    self.failUnless('BetaPolicy' in other_text)
+    self.failUnlessEqual(2, len(self.root.policy_generators))
+
+
+if __name__ == '__main__':
+  unittest.main()
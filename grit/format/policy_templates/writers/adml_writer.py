@@ -3,7 +3,6 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
-from xml.dom import minidom
 from grit.format.policy_templates.writers import xml_formatted_writer
 
 
@@ -47,7 +46,7 @@ class ADMLWriter(xml_formatted_writer.XMLFormattedWriter):
       self.strings_seen[id] = text
       string_elem = self.AddElement(
           self._string_table_elem, 'string', {'id': id})
-      string_elem.appendChild(self._doc.createTextNode(text))
+      self.AddText(string_elem, text)
 
   def WritePolicy(self, policy):
     '''Generates the ADML elements for a Policy.
@@ -92,22 +91,22 @@ class ADMLWriter(xml_formatted_writer.XMLFormattedWriter):
       textbox_elem = self.AddElement(presentation_elem, 'textBox',
                                      {'refId': policy_name})
       label_elem = self.AddElement(textbox_elem, 'label')
-      label_elem.appendChild(self._doc.createTextNode(policy_label))
+      self.AddText(label_elem, policy_label)
     elif policy_type == 'int':
       textbox_elem = self.AddElement(presentation_elem, 'decimalTextBox',
                                      {'refId': policy_name})
-      textbox_elem.appendChild(self._doc.createTextNode(policy_label + ':'))
+      self.AddText(textbox_elem, policy_label + ':')
     elif policy_type in ('int-enum', 'string-enum'):
       for item in policy['items']:
         self._AddString(item['name'], item['caption'])
       dropdownlist_elem = self.AddElement(presentation_elem, 'dropdownList',
                                           {'refId': policy_name})
-      dropdownlist_elem.appendChild(self._doc.createTextNode(policy_label))
+      self.AddText(dropdownlist_elem, policy_label)
     elif policy_type in ('list', 'string-enum-list'):
       self._AddString(policy_name + 'Desc', policy_caption)
       listbox_elem = self.AddElement(presentation_elem, 'listBox',
                                      {'refId': policy_name + 'Desc'})
-      listbox_elem.appendChild(self._doc.createTextNode(policy_label))
+      self.AddText(listbox_elem, policy_label)
     elif policy_type == 'group':
       pass
     elif policy_type == 'external':
@@ -154,15 +153,13 @@ class ADMLWriter(xml_formatted_writer.XMLFormattedWriter):
                       recommended_name)
 
   def BeginTemplate(self):
-    dom_impl = minidom.getDOMImplementation('')
-    self._doc = dom_impl.createDocument(None, 'policyDefinitionResources',
-                                        None)
+    self._doc = xml_formatted_writer.XmlDocument('policyDefinitionResources')
     if self._GetChromiumVersionString() is not None:
       self.AddComment(self._doc.documentElement, self.config['build'] + \
           ' version: ' + self._GetChromiumVersionString())
     policy_definitions_resources_elem = self._doc.documentElement
-    policy_definitions_resources_elem.attributes['revision'] = '1.0'
-    policy_definitions_resources_elem.attributes['schemaVersion'] = '1.0'
+    self.AddAttribute(policy_definitions_resources_elem, 'revision', '1.0')
+    self.AddAttribute(policy_definitions_resources_elem, 'schemaVersion', '1.0')
 
     self.AddElement(policy_definitions_resources_elem, 'displayName')
     self.AddElement(policy_definitions_resources_elem, 'description')
@@ -61,9 +61,9 @@ class AdmlWriterUnittest(xml_writer_base_unittest.XmlWriterBaseTest):
     writer.BeginPolicyGroup(policy_group)
 
     string_elements = \
-        self.writer._string_table_elem.getElementsByTagName('string')
+        self.writer._string_table_elem.GetElementsByTagName('string')
     for elem in string_elements:
-      self.writer._string_table_elem.removeChild(elem)
+      self.writer._string_table_elem.children.remove(elem)
 
   def testEmpty(self):
     self.writer.BeginTemplate()
@@ -3,7 +3,6 @@
 # Use of this source code is governed by a BSD-style license that can be
 # found in the LICENSE file.
 
-from xml.dom import minidom
 from grit.format.policy_templates.writers import xml_formatted_writer
 
 
@@ -93,12 +92,12 @@ class ADMXWriter(xml_formatted_writer.XMLFormattedWriter):
       display_name: Display name of the category.
       parent_category_name: Name of the parent category. Defaults to None.
     '''
-    existing = filter(lambda e: e.getAttribute('name') == name,
-                      parent.getElementsByTagName('category'))
+    existing = filter(lambda e: e.attrs.get('name') == name,
+                      parent.GetElementsByTagName('category'))
     if existing:
       assert len(existing) == 1
-      assert existing[0].getAttribute('name') == name
-      assert existing[0].getAttribute('displayName') == display_name
+      assert existing[0].attrs.get('name') == name
+      assert existing[0].attrs.get('displayName') == display_name
       return
     attributes = {
       'name': name,
@@ -237,10 +236,10 @@ class ADMXWriter(xml_formatted_writer.XMLFormattedWriter):
     Raises:
       Exception: The policy_group_elem does not contain a ADMX "policy" element.
     '''
-    if policy_group_elem.tagName != 'policy':
+    if policy_group_elem.name != 'policy':
       raise Exception('Expected a "policy" element but got a "%s" element'
-                      % policy_group_elem.tagName)
-    elements_list = policy_group_elem.getElementsByTagName('elements');
+                      % policy_group_elem.name)
+    elements_list = policy_group_elem.GetElementsByTagName('elements');
     if len(elements_list) == 0:
       return self.AddElement(policy_group_elem, 'elements')
     elif len(elements_list) == 1:
@@ -350,15 +349,14 @@ class ADMXWriter(xml_formatted_writer.XMLFormattedWriter):
     an ADMX "PolicyDefinitions" element with four child nodes: "policies"
     "policyNamspaces", "resources", "supportedOn" and "categories"
     '''
-    dom_impl = minidom.getDOMImplementation('')
-    self._doc = dom_impl.createDocument(None, 'policyDefinitions', None)
+    self._doc = xml_formatted_writer.XmlDocument('policyDefinitions')
     if self._GetChromiumVersionString() is not None:
       self.AddComment(self._doc.documentElement, self.config['build'] + \
           ' version: ' + self._GetChromiumVersionString())
     policy_definitions_elem = self._doc.documentElement
 
-    policy_definitions_elem.attributes['revision'] = '1.0'
-    policy_definitions_elem.attributes['schemaVersion'] = '1.0'
+    self.AddAttribute(policy_definitions_elem, 'revision', '1.0')
+    self.AddAttribute(policy_definitions_elem, 'schemaVersion', '1.0')
 
     self._AddPolicyNamespaces(policy_definitions_elem,
                               self.config['admx_prefix'],
@@ -15,16 +15,14 @@ if __name__ == '__main__':
 
 
 from grit.format.policy_templates.writers import admx_writer
+from grit.format.policy_templates.writers import xml_formatted_writer
 from grit.format.policy_templates.writers import xml_writer_base_unittest
-from xml.dom import minidom
 
 
 class AdmxWriterUnittest(xml_writer_base_unittest.XmlWriterBaseTest):
 
   def _CreateDocumentElement(self):
-    dom_impl = minidom.getDOMImplementation('')
-    doc = dom_impl.createDocument(None, 'root', None)
-    return doc.documentElement
+    return xml_formatted_writer.XmlDocument('root').documentElement
 
   def setUp(self):
     # Writer configuration. This dictionary contains parameter used by the ADMX
@@ -44,14 +42,14 @@ class AdmxWriterUnittest(xml_writer_base_unittest.XmlWriterBaseTest):
     self.writer.Init()
 
   def _GetPoliciesElement(self, doc):
-    node_list = doc.getElementsByTagName('policies')
-    self.assertTrue(node_list.length == 1)
-    return node_list.item(0)
+    node_list = doc.documentElement.GetElementsByTagName('policies')
+    self.assertTrue(len(node_list) == 1)
+    return node_list[0]
 
   def _GetCategoriesElement(self, doc):
-    node_list = doc.getElementsByTagName('categories')
-    self.assertTrue(node_list.length == 1)
-    return node_list.item(0)
+    node_list = doc.documentElement.GetElementsByTagName('categories')
+    self.assertTrue(len(node_list) == 1)
+    return node_list[0]
 
   def testEmpty(self):
     self.writer.BeginTemplate()
@@ -387,8 +385,7 @@ class AdmxWriterUnittest(xml_writer_base_unittest.XmlWriterBaseTest):
 
     # This test is different than the others because it also tests that space
     # usage inside <string> nodes is correct.
-    dom_impl = minidom.getDOMImplementation('')
-    self.writer._doc = dom_impl.createDocument(None, 'policyDefinitions', None)
+    self.writer._doc = xml_formatted_writer.XmlDocument('policyDefinitions')
     self.writer._active_policies_elem = self.writer._doc.documentElement
     self.writer._active_mandatory_policy_group_name = 'PolicyGroup'
     self.writer.WritePolicy(enum_policy)
@@ -523,8 +520,7 @@ class AdmxWriterUnittest(xml_writer_base_unittest.XmlWriterBaseTest):
         ]
     }
 
-    dom_impl = minidom.getDOMImplementation('')
-    self.writer._doc = dom_impl.createDocument(None, 'policyDefinitions', None)
+    self.writer._doc = xml_formatted_writer.XmlDocument('policyDefinitions')
     self.writer._active_policies_elem = self.writer._doc.documentElement
     self.writer._active_mandatory_policy_group_name = 'PolicyGroup'
     self.writer.WritePolicy(enum_policy_a)
@@ -5,7 +5,6 @@
 
 
 from grit.format.policy_templates.writers import xml_formatted_writer
-from xml.dom import minidom
 from xml.sax import saxutils as xml_escape
 
 
@@ -41,22 +40,18 @@ class AndroidPolicyWriter(xml_formatted_writer.XMLFormattedWriter):
   def AddStringResource(self, name, string):
     '''Add a string resource of the given name.
     '''
-    string_node = self._doc.createElement('string')
-    string_node.setAttribute('name', name)
-    string_node.appendChild(self._doc.createTextNode(_EscapeResource(string)))
-    self._resources.appendChild(string_node)
+    string_node = self.AddElement(self._resources, 'string', {'name': name})
+    self.AddText(string_node, _EscapeResource(string))
 
   def AddStringArrayResource(self, name, string_items):
     '''Add a string-array resource of the given name and
     elements from string_items.
     '''
-    string_array_node = self._doc.createElement('string-array')
-    string_array_node.setAttribute('name', name)
-    self._resources.appendChild(string_array_node)
+    string_array_node = self.AddElement(self._resources, 'string-array',
+                                        {'name': name})
     for item in string_items:
-      string_node = self._doc.createElement('item')
-      string_node.appendChild(self._doc.createTextNode(_EscapeResource(item)))
-      string_array_node.appendChild(string_node)
+      string_node = self.AddElement(string_array_node, 'item')
+      self.AddText(string_node, _EscapeResource(item))
 
   def PreprocessPolicies(self, policy_list):
     return self.FlattenGroupsAndSortPolicies(policy_list)
@@ -88,12 +83,10 @@ class AndroidPolicyWriter(xml_formatted_writer.XMLFormattedWriter):
   def BeginTemplate(self):
     comment_text = 'DO NOT MODIFY THIS FILE DIRECTLY!\n' \
                    'IT IS GENERATED FROM policy_templates.json.'
-    comment_node = self._doc.createComment(comment_text)
-    self._doc.insertBefore(comment_node, self._resources)
+    self.AddComment(self._doc, comment_text)
 
   def Init(self):
-    impl = minidom.getDOMImplementation()
-    self._doc = impl.createDocument(None, 'resources', None)
+    self._doc = xml_formatted_writer.XmlDocument('resources')
     self._resources = self._doc.documentElement
 
   def GetTemplateText(self):
@@ -5,7 +5,6 @@
 
 
 import json
-from xml.dom import minidom
 from grit import lazy_re
 from grit.format.policy_templates.writers import xml_formatted_writer
 
@@ -665,9 +664,8 @@ class DocWriter(xml_formatted_writer.XMLFormattedWriter):
     self._details_div = self.AddElement(self._main_div, 'div')
 
   def Init(self):
-    dom_impl = minidom.getDOMImplementation('')
-    self._doc = dom_impl.createDocument(None, 'html', None)
-    body = self.AddElement(self._doc.documentElement, 'body')
+    self._doc = xml_formatted_writer.XmlElement('html')
+    body = self.AddElement(self._doc, 'body')
     self._main_div = self.AddElement(body, 'div')
     self._indent_level = 0
 
@@ -17,6 +17,7 @@ from xml.dom import minidom
 
 from grit.format.policy_templates.writers import writer_unittest_common
 from grit.format.policy_templates.writers import doc_writer
+from grit.format.policy_templates.writers import xml_formatted_writer
 
 
 class MockMessageDictionary:
@@ -79,10 +80,8 @@ class DocWriterUnittest(writer_unittest_common.WriterUnittestCommon):
     self.writer._STYLE['key1'] = 'style1;'
     self.writer._STYLE['key2'] = 'style2;'
 
-    # Create a DOM document for the tests.
-    dom_impl = minidom.getDOMImplementation('')
-    self.doc = dom_impl.createDocument(None, 'root', None)
-    self.doc_root = self.doc.documentElement
+    # Create a root element for the tests.
+    self.doc_root = xml_formatted_writer.XmlElement('root')
 
   def testSkeleton(self):
     # Test if DocWriter creates the skeleton of the document correctly.
@@ -947,5 +946,41 @@ See <a href="http://policy-explanation.example.com">http://policy-explanation.ex
         self.doc_root.toxml(),
         '<root><p>Paragraph 1</p><p>Paragraph 2</p><p>Paragraph 3</p></root>')
 
+  def testXmlElementMatchesMinidom(self):
+    # Test that XmlElement trees, which DocWriter builds its output with,
+    # are written out exactly like the equivalent minidom trees.
+    root = self.doc_root
+    self.writer.AddComment(root, 'comment')
+    self.writer.AddElement(root, 'empty')
+    self.writer.AddElement(root, 'e', {'b': '"2" & <3>', 'a': '1'},
+                           u'text \xe9 & <b>')
+    parent = self.writer.AddElement(root, 'p')
+    self.writer.AddText(parent, 'one ')
+    self.writer.AddText(parent, '')
+    link = self.writer.AddElement(parent, 'a', {'href': 'http://x'}, 'x')
+    self.writer.AddAttribute(link, 'href', 'http://y')
+    self.writer.AddAttribute(link, 'name', 'n')
+    self.writer.AddText(parent, ' two')
+    self.writer.AddElement(root, 'blank', {}, '')
+
+    doc = minidom.getDOMImplementation('').createDocument(None, 'root', None)
+    expected = doc.documentElement
+    expected.appendChild(doc.createComment('comment'))
+    expected.appendChild(doc.createElement('empty'))
+    e = expected.appendChild(doc.createElement('e'))
+    e.setAttribute('a', '1')
+    e.setAttribute('b', '"2" & <3>')
+    e.appendChild(doc.createTextNode(u'text \xe9 & <b>'))
+    p = expected.appendChild(doc.createElement('p'))
+    p.appendChild(doc.createTextNode('one '))
+    p.appendChild(doc.createTextNode(''))
+    a = p.appendChild(doc.createElement('a'))
+    a.setAttribute('href', 'http://y')
+    a.setAttribute('name', 'n')
+    a.appendChild(doc.createTextNode('x'))
+    p.appendChild(doc.createTextNode(' two'))
+    expected.appendChild(doc.createElement('blank'))
+    self.assertEquals(expected.toxml(), root.toxml())
+
 if __name__ == '__main__':
   unittest.main()
@@ -6,7 +6,6 @@
 
 import base64
 
-from xml.dom import minidom
 from grit.format.policy_templates.writers import plist_writer
 
 
@@ -94,7 +93,7 @@ class IOSPlistWriter(plist_writer.PListWriter):
   # Overridden.
   # |self._plist| is created in super.Init().
   def BeginTemplate(self):
-    self._plist.attributes['version'] = '1.0'
+    self.AddAttribute(self._plist, 'version', '1.0')
     self._root_dict = self.AddElement(self._plist, 'dict')
     self.AddComment(self._root_dict, CHROME_POLICY_COMMENT)
     if self._GetChromiumVersionString() is not None:
@@ -102,7 +101,7 @@ class IOSPlistWriter(plist_writer.PListWriter):
           ' version: ' + self._GetChromiumVersionString() + ' ')
     self._dict = self._AddKeyValuePair(self._root_dict, 'ChromePolicy', 'dict')
 
-    self._encoded_plist.attributes['version'] = '1.0'
+    self.AddAttribute(self._encoded_plist, 'version', '1.0')
     self._encoded_dict = self.AddElement(self._encoded_plist, 'dict')
 
   # Overridden.
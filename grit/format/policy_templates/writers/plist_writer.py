@@ -4,7 +4,6 @@
 # found in the LICENSE file.
 
 
-from xml.dom import minidom
 from grit.format.policy_templates.writers import plist_helper
 from grit.format.policy_templates.writers import xml_formatted_writer
 
@@ -118,7 +117,7 @@ class PListWriter(xml_formatted_writer.XMLFormattedWriter):
       self.AddText(subkeys_type, 'string')
 
   def BeginTemplate(self):
-    self._plist.attributes['version'] = '1'
+    self.AddAttribute(self._plist, 'version', '1')
     dict = self.AddElement(self._plist, 'dict')
     if self._GetChromiumVersionString() is not None:
       self.AddComment(self._plist, self.config['build'] + ' version: ' + \
@@ -134,12 +133,10 @@ class PListWriter(xml_formatted_writer.XMLFormattedWriter):
     self._array = self._AddKeyValuePair(dict, 'pfm_subkeys', 'array')
 
   def CreatePlistDocument(self):
-    dom_impl = minidom.getDOMImplementation('')
-    doctype = dom_impl.createDocumentType(
+    return xml_formatted_writer.XmlDocument(
         'plist',
         '-//Apple//DTD PLIST 1.0//EN',
         'http://www.apple.com/DTDs/PropertyList-1.0.dtd')
-    return dom_impl.createDocument(None, 'plist', doctype)
 
   def Init(self):
     self._doc = self.CreatePlistDocument()
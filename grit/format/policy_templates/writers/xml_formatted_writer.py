@@ -4,20 +4,162 @@
 # found in the LICENSE file.
 
 
+import types
+
 from grit.format.policy_templates.writers import template_writer
 
 
+def _EscapeXml(data):
+  '''Escapes text and attribute values the way xml.dom.minidom does.'''
+  return data.replace('&', '&amp;').replace('<', '&lt;'). \
+              replace('"', '&quot;').replace('>', '&gt;')
+
+
+class XmlComment(object):
+  '''A comment in an XmlElement.'''
+
+  def __init__(self, comment):
+    self.comment = comment
+
+  def _ToXml(self):
+    if '--' in self.comment:
+      raise ValueError("'--' is not allowed in a comment node")
+    return '<!--%s-->' % self.comment
+
+  def WriteXml(self, out):
+    out.append(self._ToXml())
+
+  def WritePrettyXml(self, lines, indent=''):
+    lines.append(indent + self._ToXml())
+
+
+class XmlElement(object):
+  '''A lightweight XML element for writers that only build their output
+  through the methods of XMLFormattedWriter.  It keeps its attributes in a
+  dictionary and its children (XmlElement, XmlComment or text) in a list, and
+  writes itself out in a single pass with the same bytes as the equivalent
+  xml.dom.minidom element.
+  '''
+
+  def __init__(self, name, attrs=None):
+    self.name = name
+    self.attrs = attrs or {}
+    self.children = []
+
+  def GetElementsByTagName(self, name):
+    '''Returns the descendant elements named |name|, in document order.'''
+    elements = []
+    for child in self.children:
+      if isinstance(child, XmlElement):
+        if child.name == name:
+          elements.append(child)
+        elements.extend(child.GetElementsByTagName(name))
+    return elements
+
+  def _StartTag(self):
+    return '<' + self.name + ''.join([
+        ' %s="%s"' % (key, _EscapeXml(value))
+        for key, value in sorted(self.attrs.iteritems())])
+
+  def WriteXml(self, out):
+    '''Appends the XML text of this element to the list |out|.'''
+    out.append(self._StartTag())
+    if not self.children:
+      out.append('/>')
+      return
+    out.append('>')
+    for child in self.children:
+      if isinstance(child, types.StringTypes):
+        out.append(_EscapeXml(child))
+      else:
+        child.WriteXml(out)
+    out.append('</%s>' % self.name)
+
+  def WritePrettyXml(self, lines, indent=''):
+    '''Appends the lines of the XML text of this element to the list |lines|,
+    indented as XMLFormattedWriter.ToPrettyXml() formats them: every element
+    and comment starts a line, and text stays on the line of its element.
+    Elements cannot have both text and other children.
+    '''
+    start_tag = indent + self._StartTag()
+    if not self.children:
+      lines.append(start_tag + '/>')
+      return
+    texts = [child for child in self.children
+             if isinstance(child, types.StringTypes)]
+    if texts:
+      if len(texts) != len(self.children):
+        raise ValueError('<%s> has mixed content' % self.name)
+      text = _EscapeXml(''.join(texts))
+      if text:
+        lines.append('%s>%s</%s>' % (start_tag, text, self.name))
+        return
+    lines.append(start_tag + '>')
+    for child in self.children:
+      if not isinstance(child, types.StringTypes):
+        child.WritePrettyXml(lines, indent + '  ')
+    lines.append('%s</%s>' % (indent, self.name))
+
+  def toxml(self):
+    out = []
+    self.WriteXml(out)
+    return ''.join(out)
+
+
+class XmlDocument(object):
+  '''A document made of an XmlElement and, optionally, a public document type
+  declaration, written out like the equivalent xml.dom.minidom document.
+  '''
+
+  def __init__(self, name, public_id=None, system_id=None):
+    '''
+    Args:
+      name: The name of the document element, and of the document type.
+      public_id: '-//Apple//DTD PLIST 1.0//EN', or None for no document type.
+      system_id: 'http://www.apple.com/DTDs/PropertyList-1.0.dtd'
+    '''
+    self.documentElement = XmlElement(name)
+    self.public_id = public_id
+    self.system_id = system_id
+    # XmlComments before the document element.
+    self.comments = []
+
+  def GetPrologLines(self, encoding=None):
+    '''Returns the XML declaration, the document type declaration and the
+    comments before the document element.
+    '''
+    if encoding:
+      lines = ['<?xml version="1.0" encoding="%s"?>' % encoding]
+    else:
+      lines = ['<?xml version="1.0" ?>']
+    if self.public_id:
+      lines.append("<!DOCTYPE %s  PUBLIC '%s'  '%s'>" % (
+          self.documentElement.name, self.public_id, self.system_id))
+    for comment in self.comments:
+      comment.WritePrettyXml(lines)
+    return lines
+
+  def toxml(self, encoding=None):
+    out = self.GetPrologLines(encoding)
+    self.documentElement.WriteXml(out)
+    xml = ''.join(out)
+    if encoding:
+      return xml.encode(encoding)
+    return xml
+
+
 class XMLFormattedWriter(template_writer.TemplateWriter):
-  '''Helper class for generating XML-based templates.
+  '''Helper class for generating XML-based templates.  The writers build
+  XmlDocuments, which are much cheaper to build and write out than
+  xml.dom.minidom documents.
   '''
 
   def AddElement(self, parent, name, attrs=None, text=None):
     '''
-    Adds a new XML Element as a child to an existing element or the Document.
+    Adds a new XML Element as a child to an existing element.
 
     Args:
-      parent: An XML element or the document, where the new element will be
-        added.
+      parent: The XmlElement the new element will be added to.
       name: The name of the new element.
       attrs: A dictionary of the attributes' names and values for the new
         element.
@@ -29,63 +171,48 @@ class XMLFormattedWriter(template_writer.TemplateWriter):
     if attrs == None:
       attrs = {}
 
-    doc = parent.ownerDocument
-    element = doc.createElement(name)
-    for key, value in sorted(attrs.iteritems()):
-      element.setAttribute(key, value)
+    element = XmlElement(name, dict(attrs))
     if text:
-      element.appendChild(doc.createTextNode(text))
-    parent.appendChild(element)
+      element.children.append(text)
+    parent.children.append(element)
     return element
 
   def AddText(self, parent, text):
     '''Adds text to a parent node.
     '''
-    doc = parent.ownerDocument
-    parent.appendChild(doc.createTextNode(text))
+    if not isinstance(text, types.StringTypes):
+      raise TypeError('node contents must be a string')
+    parent.children.append(text)
 
   def AddAttribute(self, parent, name, value):
     '''Adds a new attribute to the parent Element. If an attribute with the
     given name already exists then it will be replaced.
     '''
-    doc = parent.ownerDocument
-    attribute = doc.createAttribute(name)
-    attribute.value = value
-    parent.setAttributeNode(attribute)
+    parent.attrs[name] = value
 
   def AddComment(self, parent, comment):
-    '''Adds a comment node.'''
-    parent.appendChild(parent.ownerDocument.createComment(comment))
+    '''Adds a comment node.  Comments added to an XmlDocument go before its
+    document element.
+    '''
+    if isinstance(parent, XmlDocument):
+      parent.comments.append(XmlComment(comment))
+    else:
+      parent.children.append(XmlComment(comment))
 
-  def ToPrettyXml(self, doc, **kwargs):
-    # return doc.toprettyxml(indent='  ')
-    # The above pretty-printer does not print the doctype and adds spaces
-    # around texts, e.g.:
+  def ToPrettyXml(self, doc, encoding=None):
+    # doc.toprettyxml(indent='  ') of xml.dom.minidom does not print the
+    # doctype and adds spaces around texts, e.g.:
     #  <string>
     #    value of the string
     #  </string>
     # This is problematic both for the OSX Workgroup Manager (plist files) and
     # the Windows Group Policy Editor (admx files). What they need instead:
     #  <string>value of string</string>
-    # So we use the poor man's pretty printer here. It assumes that there are
-    # no mixed-content nodes.
-    # Get all the XML content in a one-line string.
-    xml = doc.toxml(**kwargs)
-    # Determine where the line breaks will be. (They will only be between tags.)
-    lines = xml[1:len(xml) - 1].split('><')
-    indent = ''
-    res = ''
-    # Determine indent for each line.
-    for i, line in enumerate(lines):
-      if line[0] == '/':
-        # If the current line starts with a closing tag, decrease indent before
-        # printing.
-        indent = indent[2:]
-      lines[i] = indent + '<' + line + '>'
-      if (line[0] not in ['/', '?', '!'] and '</' not in line and
-          line[len(line) - 1] != '/'):
-        # If the current line starts with an opening tag and does not conatin a
-        # closing tag, increase indent after the line is printed.
-        indent += '  '
-    # Reconstruct XML text from the lines.
-    return '\n'.join(lines)
+    # So each element and comment goes on its own line, indented by its depth,
+    # and text stays on the line of its element.
+    lines = doc.GetPrologLines(encoding)
+    doc.documentElement.WritePrettyXml(lines)
+    xml = '\n'.join(lines)
+    if encoding:
+      return xml.encode(encoding)
+    return xml
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.format.policy_templates.writers.xml_formatted_writer'''
+
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+
+import unittest
+from xml.dom import minidom
+
+from grit.format.policy_templates.writers import xml_formatted_writer
+
+
+class XmlFormattedWriterUnittest(unittest.TestCase):
+
+  def setUp(self):
+    self.writer = xml_formatted_writer.XMLFormattedWriter([], {})
+
+  def _CreateDocument(self):
+    doc = xml_formatted_writer.XmlDocument(
+        'plist', '-//Apple//DTD PLIST 1.0//EN',
+        'http://www.apple.com/DTDs/PropertyList-1.0.dtd')
+    self.writer.AddComment(doc, 'leading\ncomment')
+    root = doc.documentElement
+    self.writer.AddAttribute(root, 'version', '1.0')
+    dict = self.writer.AddElement(root, 'dict')
+    self.writer.AddComment(dict, ' comment ')
+    self.writer.AddElement(dict, 'key', {}, u'\xe9 & <b>')
+    empty = self.writer.AddElement(dict, 'string')
+    self.writer.AddText(empty, '')
+    self.writer.AddElement(dict, 'true')
+    array = self.writer.AddElement(dict, 'array')
+    self.writer.AddElement(array, 'string', {'a': '"1"'}, 'x/')
+    return doc
+
+  def testToXmlMatchesMinidom(self):
+    dom_impl = minidom.getDOMImplementation('')
+    doctype = dom_impl.createDocumentType(
+        'plist', '-//Apple//DTD PLIST 1.0//EN',
+        'http://www.apple.com/DTDs/PropertyList-1.0.dtd')
+    expected = dom_impl.createDocument(None, 'plist', doctype)
+    expected.insertBefore(expected.createComment('leading\ncomment'),
+                          expected.documentElement)
+    root = expected.documentElement
+    root.setAttribute('version', '1.0')
+    dict = root.appendChild(expected.createElement('dict'))
+    dict.appendChild(expected.createComment(' comment '))
+    key = dict.appendChild(expected.createElement('key'))
+    key.appendChild(expected.createTextNode(u'\xe9 & <b>'))
+    empty = dict.appendChild(expected.createElement('string'))
+    empty.appendChild(expected.createTextNode(''))
+    dict.appendChild(expected.createElement('true'))
+    array = dict.appendChild(expected.createElement('array'))
+    string = array.appendChild(expected.createElement('string'))
+    string.setAttribute('a', '"1"')
+    string.appendChild(expected.createTextNode('x/'))
+
+    doc = self._CreateDocument()
+    self.assertEquals(expected.toxml(), doc.toxml())
+    self.assertEquals(expected.toxml(encoding='UTF-8'),
+                      doc.toxml(encoding='UTF-8'))
+
+  def testToPrettyXml(self):
+    self.assertEquals(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<!DOCTYPE plist  PUBLIC \'-//Apple//DTD PLIST 1.0//EN\'  '
+            '\'http://www.apple.com/DTDs/PropertyList-1.0.dtd\'>\n'
+        '<!--leading\ncomment-->\n'
+        '<plist version="1.0">\n'
+        '  <dict>\n'
+        '    <!-- comment -->\n'
+        '    <key>\xc3\xa9 &amp; &lt;b&gt;</key>\n'
+        '    <string>\n'
+        '    </string>\n'
+        '    <true/>\n'
+        '    <array>\n'
+        '      <string a="&quot;1&quot;">x/</string>\n'
+        '    </array>\n'
+        '  </dict>\n'
+        '</plist>',
+        self.writer.ToPrettyXml(self._CreateDocument(), encoding='UTF-8'))
+
+  def testMixedContent(self):
+    doc = xml_formatted_writer.XmlDocument('root')
+    parent = self.writer.AddElement(doc.documentElement, 'p', {}, 'text')
+    self.writer.AddElement(parent, 'b')
+    self.assertRaises(ValueError, self.writer.ToPrettyXml, doc)
+
+
+if __name__ == '__main__':
+  unittest.main()
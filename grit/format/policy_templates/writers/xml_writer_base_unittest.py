@@ -7,7 +7,6 @@
 """Unittests for grit.format.policy_templates.writers.admx_writer."""
 
 
-import re
 import unittest
 
 
@@ -22,14 +21,10 @@ class XmlWriterBaseTest(unittest.TestCase):
 
     Return: XML of the chrildren of the parent node.
     '''
-    raw_pretty_xml = ''.join(
-        child.toprettyxml(indent='  ') for child in parent.childNodes)
-    # Python 2.6.5 which is present in Lucid has bug in its pretty print
-    # function which produces new lines around string literals. This has been
-    # fixed in Precise which has Python 2.7.3 but we have to keep compatibility
-    # with both for now.
-    text_re = re.compile('>\n\s+([^<>\s].*?)\n\s*</', re.DOTALL)    
-    return text_re.sub('>\g<1></', raw_pretty_xml)
+    lines = []
+    for child in parent.children:
+      child.WritePrettyXml(lines)
+    return '\n'.join(lines)
 
   def AssertXMLEquals(self, output, expected_output):
     '''Asserts if the passed XML arguements are equal.
@@ -20,6 +20,9 @@ def Format(root, lang='en', output_dir='.'):
 
   yield _FormatHeader(root, lang, output_dir)
 
+  # The substitutions only depend on the language, so they are looked up once
+  # per output rather than once per message.
+  substitute = _GetSubstitute(root)
   for item in root.ActiveDescendants():
     if isinstance(item, empty.MessagesNode):
       # Write one STRINGTABLE per <messages> container.
@@ -28,11 +31,11 @@ def Format(root, lang='en', output_dir='.'):
       for subitem in item.ActiveDescendants():
         if isinstance(subitem, message.MessageNode):
           with subitem:
-            yield FormatMessage(subitem, lang)
+            yield _FormatMessage(subitem, lang, substitute)
       yield 'END\n\n'
     elif isinstance(item, include.IncludeNode):
       with item:
-        yield FormatInclude(item, lang, output_dir)
+        yield _FormatIncludeNode(root, item, lang, output_dir)
     elif isinstance(item, structure.StructureNode):
       with item:
         yield FormatStructure(item, lang, output_dir)
@@ -364,16 +367,39 @@ def _FormatHeader(root, lang, output_dir):
 # end _FormatHeader() function
 
 
+def _GetSubstitute(root):
+  '''Returns the function applying the substitutions of |root|'s current
+  output language to a string, or None if |root| has no substitutions.
+  '''
+  if hasattr(root, 'GetSubstituter'):
+    return root.GetSubstituter().Substitute
+  return None
+
+
+def _EscapeMessage(message):
+  '''Escapes a message for a string table: quotation marks are doubled up,
+  as the RC format wants, and linebreaks are replaced with a \\n escape.
+  '''
+  message = message.replace('"', '""')
+  if '\r' in message:
+    # '\r\n' is a single linebreak, which the regular expression handles.
+    return util.LINEBREAKS.sub(r'\\n', message)
+  return message.replace('\n', '\\n')
+
+
 def FormatMessage(item, lang):
   '''Returns a single message of a string table.'''
-  message = item.ws_at_start + item.Translate(lang) + item.ws_at_end
-  # Escape quotation marks (RC format uses doubling-up
-  message = message.replace('"', '""')
-  # Replace linebreaks with a \n escape
-  message = util.LINEBREAKS.sub(r'\\n', message)
-  if hasattr(item.GetRoot(), 'GetSubstituter'):
-    substituter = item.GetRoot().GetSubstituter()
-    message = substituter.Substitute(message)
+  return _FormatMessage(item, lang, _GetSubstitute(item.GetRoot()))
+
+
+def _FormatMessage(item, lang, substitute):
+  '''Returns a single message of a string table, using the substitution
+  function |substitute| (or none if it is None).
+  '''
+  message = _EscapeMessage(
+      item.ws_at_start + item.Translate(lang) + item.ws_at_end)
+  if substitute:
+    message = substitute(message)
 
   name_attr = item.GetTextualIds()[0]
 
@@ -454,6 +480,19 @@ def FormatInclude(item, lang, output_dir, type=None, process_html=False):
     return '%-18s %-18s "%s"\n' % (item.attrs['name'], type, filename)
 
 
+def _FormatIncludeNode(root, item, lang, output_dir):
+  '''Returns the line for the <include> |item|.  The line does not depend on
+  the language, so it is formatted (and any HTML flattened) once per output
+  directory and then reused by every .rc output of the tree.
+  '''
+  key = (item, output_dir)
+  line = root.rc_include_lines.get(key)
+  if line is None:
+    line = FormatInclude(item, lang, output_dir)
+    root.rc_include_lines[key] = line
+  return line
+
+
 def _DoNotFormat(item, lang, output_dir):
   return ''
 
@@ -6,6 +6,8 @@
 '''Item formatters for RC headers.
 '''
 
+import json
+
 from grit import exception
 from grit import util
 from grit.extern import FP
@@ -76,27 +78,101 @@ def FormatDefines(root, output_all_resource_defines=True,
             yield rc_header_format.format(textual_id=tid,numeric_id=tids[tid])
 
 
-_cached_ids = {}
-
-
 def GetIds(root):
   '''Return a dictionary mapping textual ids to numeric ids for the given tree.
 
   Args:
     root: A GritNode.
   '''
-  # TODO(benrg): Since other formatters use this, it might make sense to move it
-  # and _ComputeIds to GritNode and store the cached ids as an attribute. On the
-  # other hand, GritNode has too much random stuff already.
-  if root not in _cached_ids:
-    _cached_ids[root] = _ComputeIds(root)
-  return _cached_ids[root]
+  return root.GetIdTable().GetIds()
 
 
-def _ComputeIds(root):
+class IdTable(object):
+  '''The numeric ids assigned to the textual ids of a tree, and the textual
+  ids the numeric ids were assigned to.
+  '''
+
+  def __init__(self, assignments):
+    '''
+    Args:
+      assignments: [(textual_id, numeric_id), ...] in the order the ids were
+        assigned in.
+    '''
+    self.assignments_ = assignments
+    self.tids_ = {}  # Maps textual id to numeric id
+    self.ids_ = {}  # Maps numeric id to the first textual id assigned it
+    for tid, id in assignments:
+      self.tids_[tid] = id
+      self.ids_.setdefault(id, tid)
+
+  def GetIds(self):
+    '''Returns a dictionary mapping textual ids to numeric ids.'''
+    return self.tids_
+
+  def GetNumericId(self, tid):
+    '''Returns the numeric id of the textual id |tid|, or None if it has none.
+
+    Args:
+      tid: 'IDS_HELLO'
+
+    Return:
+      16000
+    '''
+    return self.tids_.get(tid)
+
+  def GetTextualId(self, id):
+    '''Returns the textual id the numeric id |id| was assigned to, or None if
+    there is none.  If it was assigned to several (using offsets), the first
+    one is returned.
+
+    Args:
+      id: 16000
+
+    Return:
+      'IDS_HELLO'
+    '''
+    return self.ids_.get(id)
+
+  def Write(self, filename, signature=None):
+    '''Writes the table to |filename|, from where ReadIdTable() reads it.
+
+    Args:
+      filename: 'out/app_ids.json'
+      signature: Any value JSON can represent that identifies the inputs the
+        ids were assigned from.
+    '''
+    data = json.dumps({'signature': json.dumps(signature, sort_keys=True),
+                       'ids': self.assignments_})
+    with util.AtomicOutputFile(filename) as f:
+      f.write(data)
+
+
+def ReadIdTable(filename, signature=None):
+  '''Returns the IdTable written to |filename| by IdTable.Write(), or None if
+  |signature| is given and it was written with a different one.  Raises
+  ValueError if |filename| is not a file written by IdTable.Write().
+  '''
+  with open(filename, 'rb') as f:
+    data = json.load(f)
+  try:
+    if (signature is not None and
+        data['signature'] != json.dumps(signature, sort_keys=True)):
+      return None
+    assignments = [(tid, long(id)) for tid, id in data['ids']]
+  except (KeyError, TypeError):
+    raise ValueError('%s is not an id table' % filename)
+  if not all(isinstance(tid, basestring) for tid, _ in assignments):
+    raise ValueError('%s is not an id table' % filename)
+  return IdTable(assignments)
+
+
+def ComputeIdTable(root):
+  '''Assigns numeric ids to the textual ids of the tree |root| and returns
+  them as an IdTable.  Use root.GetIdTable() instead, which does this once.
+  '''
   from grit.node import empty, include, message, misc, structure
 
-  ids = {}  # Maps numeric id to textual id
+  assignments = []
   tids = {}  # Maps textual id to numeric id
   id_reasons = {}  # Maps numeric id to text id and a human-readable explanation
   group = None
@@ -197,8 +273,8 @@ def _ComputeIds(root):
         print ('WARNING: Numeric resource IDs should be greater than 100 to\n'
                'avoid conflicts with system-defined resource IDs.')
 
-      ids[id] = tid
+      assignments.append((tid, id))
       tids[tid] = id
       id_reasons[id] = reason
 
-  return tids
+  return IdTable(assignments)
@@ -130,6 +130,71 @@ class RcHeaderFormatterUnittest(unittest.TestCase):
       </grit>'''), '.')
     self.assertRaises(exception.IdRangeOverlap, self.FormatAll, grd)
 
+  def testIdTable(self):
+    grd = grd_reader.Parse(StringIO.StringIO('''<?xml version="1.0" encoding="UTF-8"?>
+      <grit latest_public_release="2" source_lang_id="en" current_release="3" base_dir=".">
+        <release seq="3">
+          <includes first_id="300" comment="bingo">
+            <include type="gif" name="ID_LOGO" file="images/logo.gif" />
+            <include type="gif" name="ID_LOGO2" file="images/logo2.gif" />
+          </includes>
+          <messages first_id="10000">
+            <message name="IDS_FIRST">One</message>
+          </messages>
+        </release>
+      </grit>'''), '.')
+    id_table = grd.GetIdTable()
+    self.failUnless(id_table is grd.GetIdTable())
+    self.failUnlessEqual(rc_header.GetIds(grd), id_table.GetIds())
+    self.failUnlessEqual(301, id_table.GetNumericId('ID_LOGO2'))
+    self.failUnlessEqual(None, id_table.GetNumericId('IDS_NONE'))
+    self.failUnlessEqual('ID_LOGO2', id_table.GetTextualId(301))
+    self.failUnlessEqual('IDS_FIRST', id_table.GetTextualId(10000))
+    self.failUnlessEqual(None, id_table.GetTextualId(1))
+    # With offsets, several textual ids can get the same numeric id.
+    id_table = rc_header.IdTable([('IDS_A', 5), ('IDS_B', 5)])
+    self.failUnlessEqual('IDS_A', id_table.GetTextualId(5))
+
+    grd.GetNodeById('ID_LOGO').parent.attrs['first_id'] = '400'
+    self.failUnlessEqual(300, rc_header.GetIds(grd)['ID_LOGO'])
+    grd.InvalidateIdTable()
+    self.failUnlessEqual(400, rc_header.GetIds(grd)['ID_LOGO'])
+
+  def testWriteAndReadIdTable(self):
+    grd = util.ParseGrdForUnittest('''
+        <messages first_id="10000">
+          <message name="IDS_FIRST">One</message>
+          <message name="IDS_SECOND">Two</message>
+        </messages>''')
+    id_table = grd.GetIdTable()
+    tmp_dir = util.TempDir({})
+    try:
+      filename = tmp_dir.GetPath('ids.json')
+      id_table.Write(filename, {'files': [('a.grd', (1.5, 10))]})
+      read_table = rc_header.ReadIdTable(filename,
+                                         {'files': [('a.grd', (1.5, 10))]})
+      self.failUnlessEqual(id_table.GetIds(), read_table.GetIds())
+      self.failUnlessEqual('IDS_SECOND', read_table.GetTextualId(10001))
+      self.failUnless(rc_header.ReadIdTable(filename) is not None)
+      self.failUnlessEqual(None, rc_header.ReadIdTable(
+          filename, {'files': [('a.grd', (2.5, 10))]}))
+    finally:
+      tmp_dir.CleanUp()
+
+  def testReadMalformedIdTable(self):
+    tmp_dir = util.TempDir({})
+    try:
+      filename = tmp_dir.GetPath('ids.json')
+      for contents in ('not json', '[1, 2]', '{}', '{"signature": "{}"}',
+                       '{"signature": "{}", "ids": 5}',
+                       '{"signature": "{}", "ids": [["IDS_A", null]]}',
+                       '{"signature": "{}", "ids": [[1, 2]]}'):
+        with open(filename, 'wb') as f:
+          f.write(contents)
+        self.failUnlessRaises(ValueError, rc_header.ReadIdTable, filename, {})
+    finally:
+      tmp_dir.CleanUp()
+
   def testEmit(self):
     grd = grd_reader.Parse(StringIO.StringIO('''<?xml version="1.0" encoding="UTF-8"?>
       <grit latest_public_release="2" source_lang_id="en" current_release="3" base_dir=".">
@@ -230,6 +230,41 @@ END'''.strip()
     self.failUnless(file_contents.find('</if>') == -1)
 
 
+  def testRcIncludeFlattenedHtmlFileInTwoOutputs(self):
+    input_file = util.PathFromRoot('grit/testdata/include_test.html')
+    output_file = '%s/HTML_FILE1_include_test.html' % tempfile.gettempdir()
+    root = util.ParseGrdForUnittest('''
+      <includes>
+        <include name="HTML_FILE1" flattenhtml="true" file="%s" type="BINDATA" />
+      </includes>''' % input_file)
+
+    outputs = []
+    for lang in ('en', 'fr'):
+      buf = StringIO.StringIO()
+      build.RcBuilder.ProcessNode(
+          root, DummyOutput('rc_all', lang, output_file), buf)
+      outputs.append(util.StripBlankLinesAndComments(buf.getvalue()))
+    self.assertEqual(outputs[0], outputs[1])
+    self.failUnless(outputs[1].endswith('"HTML_FILE1_include_test.html"'))
+
+  def testMessageEscaping(self):
+    root = util.ParseGrdForUnittest('''
+      <messages>
+        <message name="IDS_QUOTES">Say "cheese"</message>
+        <message name="IDS_LINEBREAKS">One</message>
+      </messages>''')
+    root.GetNodeById('IDS_LINEBREAKS').Translate = (
+        lambda lang: u'One\r\nTwo\nThree\rFour "Five"')
+    buf = StringIO.StringIO()
+    build.RcBuilder.ProcessNode(root, DummyOutput('rc_all', 'en'), buf)
+    output = util.StripBlankLinesAndComments(buf.getvalue())
+    self.assertEqual(_PREAMBLE + u'''\
+STRINGTABLE
+BEGIN
+  IDS_QUOTES      "Say ""cheese"""
+  IDS_LINEBREAKS  "One\\nTwo\\nThree\\nFour ""Five"""
+END''', output)
+
   def testStructureNodeOutputfile(self):
     input_file = util.PathFromRoot('grit/testdata/simple.html')
     root = util.ParseGrdForUnittest('''\
@@ -25,13 +25,22 @@ def main(argv):
   parser.add_option('--whitelist', action='store', dest='whitelist',
                     default=None, help='Full path to the whitelist used to'
                     'filter output pak file resource IDs')
+  parser.add_option('--pack-version', action='store', dest='version',
+                    type='int',
+                    default=grit.format.data_pack.PACK_FILE_VERSION,
+                    help='Data pack file version to write; version 5 stores '
+                    'resources with identical contents only once')
   options, file_paths = parser.parse_args(argv)
 
   if len(file_paths) < 2:
     parser.error('Please specify output and at least one input filenames')
 
-  grit.format.data_pack.RePack(file_paths[0], file_paths[1:],
-                               whitelist_file=options.whitelist)
+  num_aliases, saved = grit.format.data_pack.RePack(
+      file_paths[0], file_paths[1:], whitelist_file=options.whitelist,
+      version=options.version)
+  if options.version == grit.format.data_pack.PACK_FILE_VERSION_WITH_ALIASES:
+    print 'Aliased %d duplicate resources, saving %d bytes' % (num_aliases,
+                                                                saved)
 
 if '__main__' == __name__:
   main(sys.argv[1:])
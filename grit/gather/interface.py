@@ -144,6 +144,25 @@ class GathererBase(object):
     '''
     raise NotImplementedError()
 
+  def TranslateAll(self, langs, pseudo_if_not_available=True,
+                   skeleton_gatherer=None, fallback_to_english=False):
+    '''Returns the resource translated into each of the languages 'langs',
+    as a dictionary mapping each language to what Translate() would return
+    for it.  Subclasses can override this to share work between languages.
+
+    Args:
+      langs: ['en', 'fr']
+      pseudo_if_not_available: True | False
+      skeleton_gatherer: other_gatherer
+      fallback_to_english: True | False
+
+    Return:
+      {'en': u'...', 'fr': u'...'}
+    '''
+    return dict((lang, self.Translate(lang, pseudo_if_not_available,
+                                      skeleton_gatherer, fallback_to_english))
+                for lang in langs)
+
   def SubstituteMessages(self, substituter):
     '''Applies substitutions to all messages in the gatherer.
 
@@ -157,15 +176,21 @@ class GathererBase(object):
     pass
 
   # TODO(benrg): Move this elsewhere, since it isn't part of the interface.
+  def _GetRealInputPath(self):
+    '''Returns the path the input file is read from.  Only valid if the
+    gatherer was given a filename rather than a file object.
+    '''
+    path = self.GetInputPath()
+    # Hack: some unit tests supply an absolute path and no root node.
+    if not os.path.isabs(path):
+      path = self.grd_node.ToRealPath(path)
+    return path
+
   def _LoadInputFile(self):
     '''A convenience function for subclasses that loads the contents of the
     input file.
     '''
     if isinstance(self.rc_file, types.StringTypes):
-      path = self.GetInputPath()
-      # Hack: some unit tests supply an absolute path and no root node.
-      if not os.path.isabs(path):
-        path = self.grd_node.ToRealPath(path)
-      return util.ReadFile(path, self.encoding)
+      return util.ReadFile(self._GetRealInputPath(), self.encoding)
     else:
       return self.rc_file.read()
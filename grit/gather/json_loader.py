@@ -4,6 +4,7 @@
 # found in the LICENSE file.
 
 
+from grit import literal_reader
 from grit.gather import interface
 
 
@@ -15,11 +16,7 @@ class JsonLoader(interface.GathererBase):
     self._data.
     '''
     self._json_text = self._LoadInputFile()
-    self._data = None
-
-    globs = {}
-    exec('data = ' + self._json_text, globs)
-    self._data = globs['data']
+    self._data = literal_reader.Parse(self._json_text)
 
   def GetData(self):
     '''Returns the parsed JSON data.'''
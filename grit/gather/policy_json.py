@@ -6,16 +6,126 @@
 '''Support for "policy_templates.json" format used by the policy template
 generator as a source for generating ADM,ADMX,etc files.'''
 
+import re
 import types
 import sys
 
 from grit.gather import skeleton_gatherer
+from grit import literal_reader
 from grit import util
 from grit import tclib
 from xml.dom import minidom
 from xml.parsers.expat import ExpatError
 
 
+# The markup _TokenizeMessage() understands: text, the predefined entities,
+# and <ph name="...">, <ex>, </ex>, </ph> tags.
+_TOKEN_RE = re.compile(r'''
+  (?P<text>[^<&]+) |
+  &(?P<entity>lt|gt|amp|quot|apos); |
+  <ph\s+name\s*=\s*(?:"(?P<name>[A-Za-z0-9_]*)"|'(?P<name2>[A-Za-z0-9_]*)')
+    \s*(?P<empty>/)?> |
+  <(?P<tag>ex|/ex|/ph)>
+  ''', re.VERBOSE)
+
+_ENTITIES = {'lt': u'<', 'gt': u'>', 'amp': u'&', 'quot': u'"', 'apos': u"'"}
+
+# Text an XML parser would reject or change (line ends are normalized), which
+# is left to minidom.
+_UNUSUAL_TEXT_RE = re.compile(
+    u'[\x00-\x08\x0b-\x1f\ud800-\udfff\ufffe\uffff]|]]>')
+
+
+def _EscapeXmlText(text):
+  '''Escapes text the way minidom's toxml() does.'''
+  return text.replace('&', '&amp;').replace('<', '&lt;'). \
+              replace('"', '&quot;').replace('>', '&gt;')
+
+
+def _TokenizeMessage(string):
+  '''Splits a message string written in the restricted markup of policy
+  messages into text and placeholders, without an XML parser.
+
+  Args:
+    string: 'Hello <ph name="USER">$1<ex>Joi</ex></ph>!'
+
+  Return:
+    [u'Hello ', tclib.Placeholder('USER', '$1', 'Joi'), u'!'], or None if
+    |string| uses any markup besides the above, or might not be well-formed.
+  '''
+  if not isinstance(string, unicode):
+    try:
+      string = string.decode('utf-8')
+    except UnicodeDecodeError:
+      return None
+  if _UNUSUAL_TEXT_RE.search(string):
+    return None
+
+  parts = []
+  text = []  # Text of the message since the last placeholder.
+  ph_name = None  # Name of the placeholder we are in, if any.
+  ph_text = []
+  example = None  # Example text of the placeholder, or None if not in <ex>.
+  example_text = []
+  pos = 0
+  while pos < len(string):
+    match = _TOKEN_RE.match(string, pos)
+    if not match:
+      return None
+    pos = match.end()
+    kind = match.lastgroup
+    if kind in ('text', 'entity'):
+      value = match.group('text') or _ENTITIES.get(match.group('entity'))
+      if example is not None:
+        example.append(_EscapeXmlText(value))
+      elif ph_name is not None:
+        ph_text.append(value)
+      else:
+        text.append(value)
+    elif match.group('tag') == 'ex':
+      if ph_name is None or example is not None:
+        return None
+      example = example_text
+    elif match.group('tag') == '/ex':
+      if example is None:
+        return None
+      example = None
+    elif match.group('tag') == '/ph':
+      if ph_name is None or example is not None:
+        return None
+      parts.append((ph_name, ph_text, example_text))
+      ph_name = None
+    else:
+      if ph_name is not None:
+        return None
+      if text:
+        parts.append(''.join(text))
+        text = []
+      name = match.group('name')
+      if name is None:
+        name = match.group('name2')
+      if match.group('empty'):
+        parts.append((name, [], []))
+      else:
+        ph_name = name
+        ph_text = []
+        example_text = []
+  if ph_name is not None:
+    return None
+  if text:
+    parts.append(''.join(text))
+
+  for i, part in enumerate(parts):
+    if isinstance(part, tuple):
+      name, ph_text, example_text = part
+      if not example_text:
+        # In such cases the original text is okay for an example.
+        example_text = ph_text
+      parts[i] = tclib.Placeholder(name, ''.join(ph_text).strip(),
+                                   ''.join(example_text).strip())
+  return parts
+
+
 class PolicyJson(skeleton_gatherer.SkeletonGatherer):
   '''Collects and translates the following strings from policy_templates.json:
     - captions,descriptions and labels of policies
@@ -25,6 +135,12 @@ class PolicyJson(skeleton_gatherer.SkeletonGatherer):
      format that is used in .grd files.
   '''
 
+  def __init__(self, *args, **kwargs):
+    super(PolicyJson, self).__init__(*args, **kwargs)
+    # Maps the arguments of GetTranslatedData() to the translated text and
+    # the data parsed from it.
+    self.translated_data_ = {}
+
   def _ParsePlaceholder(self, placeholder, msg):
     '''Extracts a placeholder from a DOM node and adds it to a tclib Message.
 
@@ -62,6 +178,22 @@ class PolicyJson(skeleton_gatherer.SkeletonGatherer):
       desc: The description of the message (for the translators).
     '''
     msg = tclib.Message(description=desc)
+    parts = _TokenizeMessage(string)
+    if parts is None:
+      # Let minidom deal with (and report errors in) anything unusual.
+      self._ParseMessageXml(string, msg)
+    else:
+      for part in parts:
+        if isinstance(part, tclib.Placeholder):
+          msg.AppendPlaceholder(part)
+        else:
+          msg.AppendText(part)
+    self.skeleton_.append(self.uberclique.MakeClique(msg))
+
+  def _ParseMessageXml(self, string, msg):
+    '''Parses a given string as XML and adds its text and placeholders to
+    |msg|.
+    '''
     xml = '<msg>' + string + '</msg>'
     try:
       node = minidom.parseString(xml).childNodes[0]
@@ -79,7 +211,6 @@ class PolicyJson(skeleton_gatherer.SkeletonGatherer):
           raise Exception("Not implemented.")
       else:
         raise Exception("Not implemented.")
-    self.skeleton_.append(self.uberclique.MakeClique(msg))
 
   def _ParseNode(self, node):
     '''Traverses the subtree of a DOM node, and register a tclib message for
@@ -230,12 +361,13 @@ class PolicyJson(skeleton_gatherer.SkeletonGatherer):
     if self.have_parsed_:
       return
     self.have_parsed_ = True
+    self.translated_data_ = {}
 
     self.text_ = self._LoadInputFile()
     if util.IsExtraVerbose():
       print self.text_
 
-    self.data = eval(self.text_)
+    self.data = literal_reader.Parse(self.text_)
 
     self._AddNontranslateableChunk('{\n')
     self._AddNontranslateableChunk("  'policy_definitions': [\n")
@@ -244,6 +376,23 @@ class PolicyJson(skeleton_gatherer.SkeletonGatherer):
     self._AddMessages()
     self._AddNontranslateableChunk('\n}')
 
+  def GetTranslatedData(self, lang, pseudo_if_not_available=True,
+                        fallback_to_english=False):
+    '''Returns the policy data translated into |lang|, i.e. the parsed result
+    of Translate().  The data is shared between callers, which must not modify
+    it, and is only parsed again once the translated text changes, e.g. when
+    translations are added to the cliques.
+    '''
+    key = (lang, pseudo_if_not_available, fallback_to_english)
+    text = self.Translate(lang,
+                          pseudo_if_not_available=pseudo_if_not_available,
+                          fallback_to_english=fallback_to_english)
+    cached = self.translated_data_.get(key)
+    if cached is None or cached[0] != text:
+      cached = (text, literal_reader.Parse(text))
+      self.translated_data_[key] = cached
+    return cached[1]
+
   def Escape(self, text):
     # \ -> \\
     # ' -> \'
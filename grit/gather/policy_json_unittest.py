@@ -14,6 +14,8 @@ if __name__ == '__main__':
 import unittest
 import StringIO
 
+from grit import clique
+from grit import tclib
 from grit.gather import policy_json
 
 class PolicyJsonUnittest(unittest.TestCase):
@@ -169,6 +171,56 @@ with a newline?''',
     self.failUnless(ph.GetPresentation() == 'PRODUCT_NAME')
     self.failUnless(ph.GetExample() == 'Google Chrome')
 
+  def testTokenizeMessage(self):
+    parts = policy_json._TokenizeMessage(
+        'Use &lt;b&gt; in <ph name="NAME">$1<ex>a &amp; b</ex></ph>'
+        '<ph name="COUNT">%d</ph>.')
+    self.failUnlessEqual(4, len(parts))
+    self.failUnlessEqual(u'Use <b> in ', parts[0])
+    self.failUnlessEqual('NAME', parts[1].GetPresentation())
+    self.failUnlessEqual('$1', parts[1].GetOriginal())
+    # Examples keep their markup escaped, as minidom's toxml() would.
+    self.failUnlessEqual('a &amp; b', parts[1].GetExample())
+    self.failUnlessEqual('%d', parts[2].GetExample())
+    self.failUnlessEqual(u'.', parts[3])
+
+  def testUnusualMarkupFallsBackToXmlParser(self):
+    self.failUnless(policy_json._TokenizeMessage('<b>bold</b>') is None)
+    self.failUnless(policy_json._TokenizeMessage('&#65;') is None)
+    gatherer = policy_json.PolicyJson(StringIO.StringIO('{}'))
+    gatherer.SetUberClique(clique.UberClique())
+    gatherer._ParseMessage('x &#65; <ph name="X">$1</ph>', 'desc')
+    msg = gatherer.GetCliques()[0].GetMessage()
+    self.failUnlessEqual('x A X', msg.GetPresentableContent())
+    self.assertRaises(Exception, gatherer._ParseMessage, 'a < b', 'desc')
+
+  def testGetTranslatedData(self):
+    original = ("{'policy_definitions': [{'name': 'Policy1', "
+                "'caption': 'nothing special'}], 'messages': {}}")
+    gatherer = policy_json.PolicyJson(StringIO.StringIO(original))
+    gatherer.Parse()
+    data = gatherer.GetTranslatedData('en')
+    self.failUnlessEqual(eval(gatherer.Translate('en')), data)
+    self.failUnless(data is gatherer.GetTranslatedData('en'))
+    self.failIf(data is gatherer.GetTranslatedData('en',
+                                                   fallback_to_english=True))
+
+  def testGetTranslatedDataSeesNewTranslations(self):
+    original = ("{'policy_definitions': [{'name': 'Policy1', "
+                "'caption': 'nothing special'}], 'messages': {}}")
+    gatherer = policy_json.PolicyJson(StringIO.StringIO(original))
+    gatherer.SetUberClique(clique.UberClique())
+    gatherer.Parse()
+    caption = gatherer.GetCliques()[0]
+    data = gatherer.GetTranslatedData('fr', fallback_to_english=True)
+    self.failUnlessEqual('nothing special',
+                         data['policy_definitions'][0]['caption'])
+    caption.AddTranslation(
+        tclib.Translation(text='rien de special', id=caption.GetId()), 'fr')
+    data = gatherer.GetTranslatedData('fr', fallback_to_english=True)
+    self.failUnlessEqual('rien de special',
+                         data['policy_definitions'][0]['caption'])
+
   def testGetDescription(self):
     gatherer = policy_json.PolicyJson({})
     self.assertEquals(
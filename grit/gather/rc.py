@@ -7,11 +7,14 @@
 '''
 
 
+import bisect
 import re
+import types
 
 from grit import exception
 from grit import lazy_re
 from grit import tclib
+from grit import util
 
 from grit.gather import regexp
 
@@ -38,6 +41,106 @@ _ESCAPE_CHARS = {
 # How to unescape certain strings
 _UNESCAPE_CHARS = dict([[value, key] for key, value in _ESCAPE_CHARS.items()])
 
+# Matches the first word of a line of an RC file, which is the name of the
+# resource if the line starts a section.
+_FIRST_WORD = lazy_re.compile(r'\s*(\w+)')
+
+# Matches resource names that SectionIndex can look up; names containing
+# other characters are found by scanning the file.
+_INDEXABLE_NAME = lazy_re.compile(r'\w+$')
+
+
+class SectionIndex(object):
+  '''Locates every resource section of an RC file, so that the sections of a
+  file with many resources can be read without rescanning it for each one.
+
+  A section starts at the first line beginning with the name of the resource.
+  A section in BEGIN/END form ends with the END line that closes its outermost
+  block; a section in brace form (like RCDATA) ends with the first line at
+  which its braces balance.  A section that never ends runs to the end of the
+  file.
+  '''
+
+  def __init__(self, text):
+    self.text_ = text
+    # Offset of the start of each line, and of the end of the text.
+    self.line_offsets_ = [0]
+    # Maps the first word of a line to the number of the first line that
+    # starts with it.
+    self.first_lines_ = {}
+    # Lines containing an opening brace.
+    self.open_brace_lines_ = []
+    # Maps a BEGIN/END nesting level to the END lines after which the
+    # nesting is back at that level, and the same for braces.
+    self.block_ends_ = {}
+    self.brace_ends_ = {}
+    # Nesting levels at the start of each line.
+    self.block_levels_ = []
+    self.brace_levels_ = []
+
+    block_level = 0
+    brace_level = 0
+    for line_no, line in enumerate(text.splitlines(True)):
+      self.line_offsets_.append(self.line_offsets_[-1] + len(line))
+      self.block_levels_.append(block_level)
+      self.brace_levels_.append(brace_level)
+
+      m = _FIRST_WORD.match(line)
+      if m:
+        self.first_lines_.setdefault(m.group(1), line_no)
+
+      stripped = line.strip()
+      if stripped == 'BEGIN':
+        block_level += 1
+      elif stripped == 'END':
+        block_level -= 1
+        self.block_ends_.setdefault(block_level, []).append(line_no)
+
+      open_braces = line.count('{')
+      if open_braces:
+        self.open_brace_lines_.append(line_no)
+      brace_level += open_braces - line.count('}')
+      self.brace_ends_.setdefault(brace_level, []).append(line_no)
+
+  def _Span(self, start, end):
+    '''Returns the text of lines |start| to |end| inclusive, or to the end of
+    the file if |end| is None.'''
+    if end is None:
+      return self.text_[self.line_offsets_[start]:]
+    return self.text_[self.line_offsets_[start]:self.line_offsets_[end + 1]]
+
+  @staticmethod
+  def _FirstAtOrAfter(lines, line_no):
+    '''Returns the first of the sorted line numbers |lines| that is not
+    before |line_no|, or None.'''
+    ix = bisect.bisect_left(lines, line_no)
+    if ix < len(lines):
+      return lines[ix]
+    return None
+
+  def GetSection(self, name):
+    '''Returns the text of the BEGIN/END section for resource |name|, or
+    None if there is no such section.'''
+    start = self.first_lines_.get(name)
+    if start is None:
+      return None
+    end = self._FirstAtOrAfter(
+        self.block_ends_.get(self.block_levels_[start], []), start)
+    return self._Span(start, end)
+
+  def GetBracedSection(self, name):
+    '''Returns the text of the brace-delimited section for resource |name|,
+    or None if there is no such section.'''
+    start = self.first_lines_.get(name)
+    if start is None:
+      return None
+    end = None
+    first_open = self._FirstAtOrAfter(self.open_brace_lines_, start)
+    if first_open is not None:
+      end = self._FirstAtOrAfter(
+          self.brace_ends_.get(self.brace_levels_[start], []), first_open)
+    return self._Span(start, end)
+
 
 
 class Section(regexp.RegexpGatherer):
@@ -69,7 +172,32 @@ class Section(regexp.RegexpGatherer):
       for c in self.GetCliques():
         c.AddToShortcutGroup(group_name)
 
+  def _FindSection(self, braced):
+    '''Returns the text of this gatherer's section using the index of its
+    input file, or None if it could not be looked up that way.'''
+    if (not isinstance(self.rc_file, types.StringTypes) or
+        not _INDEXABLE_NAME.match(self.extkey)):
+      return None
+    # While the build's file cache is enabled, all the sections read from
+    # one file share its index.
+    index = util.ReadFileDerived(self._GetRealInputPath(), self.encoding,
+                                 SectionIndex)
+    if braced:
+      out = index.GetBracedSection(self.extkey)
+    else:
+      out = index.GetSection(self.extkey)
+    if out is None:
+      raise exception.SectionNotFound('%s in file %s' % (self.extkey,
+                                                         self.rc_file))
+    return out
+
   def ReadSection(self):
+    assert self.extkey
+    out = self._FindSection(braced=False)
+    if out is not None:
+      self.text_ = out.strip()
+      return
+
     rc_text = self._LoadInputFile()
 
     out = ''
@@ -284,6 +412,13 @@ class RCData(Section):
   def Parse(self):
     '''Implementation for resource types w/braces (not BEGIN/END)
     '''
+    assert self.extkey
+    out = self._FindSection(braced=True)
+    if out is not None:
+      self.text_ = out
+      self._RegExpParse(self.dialog_re_, out)
+      return
+
     rc_text = self._LoadInputFile()
 
     out = ''
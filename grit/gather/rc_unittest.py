@@ -15,6 +15,8 @@ import unittest
 import StringIO
 
 from grit.gather import rc
+from grit import exception
+from grit import tclib
 from grit import util
 
 
@@ -55,6 +57,50 @@ END
     self.part_we_want = self.part_we_want.replace(' ', '')
     self.failUnless(out_text.strip() == self.part_we_want.strip())
 
+  def testSectionIndex(self):
+    index = rc.SectionIndex('''IDC_SOMETHINGELSE BINGO
+BEGIN
+    BLA BLA
+END
+%s
+IDR_DATA RCDATA
+{ 1,
+  { 2 }, 3 }
+IDR_UNTERMINATED BINGO
+BEGIN
+''' % self.part_we_want)
+    self.failUnlessEqual(self.part_we_want + '\n',
+                         index.GetSection('IDC_KLONKACC'))
+    self.failUnlessEqual('IDR_DATA RCDATA\n{ 1,\n  { 2 }, 3 }\n',
+                         index.GetBracedSection('IDR_DATA'))
+    self.failUnlessEqual('IDR_UNTERMINATED BINGO\nBEGIN\n',
+                         index.GetSection('IDR_UNTERMINATED'))
+    self.failUnlessEqual(None, index.GetSection('IDC_KLONK'))
+
+  def testSectionIndexIsShared(self):
+    path = util.PathFromRoot(r'grit/testdata/klonk.rc')
+    indexed = []
+    old_section_index = rc.SectionIndex
+    class CountingSectionIndex(old_section_index):
+      def __init__(self, text):
+        indexed.append(text)
+        old_section_index.__init__(self, text)
+    rc.SectionIndex = CountingSectionIndex
+    try:
+      with util.ReadFileCacheScope():
+        dialog = rc.Dialog(path, 'IDD_ABOUTBOX', encoding='utf-16')
+        dialog.Parse()
+        accelerators = rc.Accelerators(path, 'IDC_KLONKACC',
+                                       encoding='utf-16')
+        accelerators.Parse()
+        missing = rc.Dialog(path, 'IDD_NOSUCHDIALOG', encoding='utf-16')
+        self.assertRaises(exception.SectionNotFound, missing.Parse)
+    finally:
+      rc.SectionIndex = old_section_index
+    self.failUnlessEqual(1, len(indexed))
+    self.failUnless(dialog.GetText().startswith('IDD_ABOUTBOX'))
+    self.failUnless(accelerators.GetText().startswith('IDC_KLONKACC'))
+
 
   def testDialog(self):
     dlg = rc.Dialog(StringIO.StringIO('''IDD_ABOUTBOX DIALOGEX 22, 17, 230, 75
@@ -111,6 +157,32 @@ END
                     transl.count('110978'))
     self.failUnless(transl.count('Yipee skippy'))
 
+  def testTranslateAll(self):
+    dlg = rc.Dialog(StringIO.StringIO('''IDD_ABOUTBOX DIALOGEX 22, 17, 230, 75
+CAPTION "OK"
+BEGIN
+    DEFPUSHBUTTON   "OK",IDOK,195,6,30,11,WS_GROUP
+    LTEXT           "Say ""[hi]""",IDC_STATIC,49,20,119,8
+END
+'''), 'IDD_ABOUTBOX')
+    dlg.Parse()
+    clique = dlg.GetCliques()[2]
+    clique.AddTranslation(tclib.Translation(
+        text='Sag "hallo"', id=clique.GetMessage().GetId()), 'de')
+    translations = dlg.TranslateAll(['en', 'de', 'fr'])
+    self.failUnlessEqual(['de', 'en', 'fr'], sorted(translations))
+    for lang in ('en', 'de', 'fr'):
+      self.failUnlessEqual(dlg.Translate(lang), translations[lang])
+    self.failUnless('"Sag ""hallo"""' in translations['de'])
+    self.failUnlessEqual(dlg.GetText().strip(), translations['en'].strip())
+
+    # The template is recompiled when messages are substituted.
+    substituter = util.Substituter()
+    substituter.AddSubstitutions({'hi': 'hey'})
+    dlg.SubstituteMessages(substituter)
+    self.failIf(dlg.GetCliques()[2] is clique)
+    self.failIf('Sag' in dlg.Translate('de'))
+
   def testMenu(self):
     menu = rc.Menu(StringIO.StringIO('''IDC_KLONK MENU
 BEGIN
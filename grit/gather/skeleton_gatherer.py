@@ -11,6 +11,7 @@ import types
 
 from grit.gather import interface
 from grit import clique
+from grit import exception
 from grit import tclib
 
 
@@ -39,6 +40,9 @@ class SkeletonGatherer(interface.GathererBase):
     # Number to use for the next placeholder name.  Used only if single_message
     # is not None
     self.ph_counter_ = 1
+    # Maps the skeleton gatherer used to translate (or None) to the skeleton
+    # compiled into a template for it; see _GetTemplate().
+    self.templates_ = {}
 
   def GetText(self):
     '''Returns the original text of the section'''
@@ -67,35 +71,70 @@ class SkeletonGatherer(interface.GathererBase):
     resource section.'''
     return [x for x in self.skeleton_ if isinstance(x, clique.MessageClique)]
 
+  def _GetTemplate(self, skeleton_gatherer):
+    '''Returns the skeleton compiled into a template: a list in which each run
+    of nontranslateable parts is joined into a single string, and each clique
+    marks where a translated message goes.  Nontranslateable parts are taken
+    from 'skeleton_gatherer' if given.  Templates are recompiled whenever the
+    skeleton changes.
+    '''
+    static_parts = self.skeleton_
+    if skeleton_gatherer:
+      static_parts = skeleton_gatherer.skeleton_
+    compiled = self.templates_.get(skeleton_gatherer)
+    if (compiled and compiled[0] is self.skeleton_ and
+        compiled[1] is static_parts and compiled[2] == len(self.skeleton_) and
+        compiled[3] == len(static_parts)):
+      return compiled[4]
+
+    assert len(static_parts) == len(self.skeleton_)
+    template = []
+    run = []
+    for part, static_part in zip(self.skeleton_, static_parts):
+      if isinstance(part, types.StringTypes):
+        # Make sure the skeleton is like the original
+        assert isinstance(static_part, types.StringTypes)
+        run.append(static_part)
+      else:
+        assert not isinstance(static_part, types.StringTypes)
+        if run:
+          template.append(''.join(run))
+          run = []
+        template.append(part)
+    if run:
+      template.append(''.join(run))
+
+    self.templates_[skeleton_gatherer] = (self.skeleton_, static_parts,
+                                          len(self.skeleton_),
+                                          len(static_parts), template)
+    return template
+
   def Translate(self, lang, pseudo_if_not_available=True,
                 skeleton_gatherer=None, fallback_to_english=False):
+    return self.TranslateAll([lang], pseudo_if_not_available,
+                             skeleton_gatherer, fallback_to_english)[lang]
+
+  def TranslateAll(self, langs, pseudo_if_not_available=True,
+                   skeleton_gatherer=None, fallback_to_english=False):
     if len(self.skeleton_) == 0:
       raise exception.NotReady()
-    if skeleton_gatherer:
-      assert len(skeleton_gatherer.skeleton_) == len(self.skeleton_)
-
-    out = []
-    for ix in range(len(self.skeleton_)):
-      if isinstance(self.skeleton_[ix], types.StringTypes):
-        if skeleton_gatherer:
-          # Make sure the skeleton is like the original
-          assert(isinstance(skeleton_gatherer.skeleton_[ix], types.StringTypes))
-          out.append(skeleton_gatherer.skeleton_[ix])
-        else:
-          out.append(self.skeleton_[ix])
-      else:
-        if skeleton_gatherer:  # Make sure the skeleton is like the original
-          assert(not isinstance(skeleton_gatherer.skeleton_[ix],
-                                types.StringTypes))
-        msg = self.skeleton_[ix].MessageForLanguage(lang,
-                                                    pseudo_if_not_available,
-                                                    fallback_to_english)
-
-        def MyEscape(text):
-          return self.Escape(text)
-        text = msg.GetRealContent(escaping_function=MyEscape)
-        out.append(text)
-    return ''.join(out)
+    template = self._GetTemplate(skeleton_gatherer)
+    cliques = []
+    for part in template:
+      if not isinstance(part, types.StringTypes) and part not in cliques:
+        cliques.append(part)
+
+    translations = {}
+    for lang in langs:
+      # A clique may fill several slots; it is translated and escaped once.
+      texts = dict((part, part.RealContentForLanguage(
+                        lang, pseudo_if_not_available, fallback_to_english,
+                        escaping_function=self.Escape))
+                   for part in cliques)
+      translations[lang] = ''.join([
+          part if isinstance(part, types.StringTypes) else texts[part]
+          for part in template])
+    return translations
 
   def Parse(self):
     '''Parses the section.  Implemented by subclasses.  Idempotent.'''
@@ -109,6 +148,7 @@ class SkeletonGatherer(interface.GathererBase):
       self.single_message_.AppendPlaceholder(ph)
     else:
       self.skeleton_.append(chunk)
+      self.templates_ = {}
 
   def _AddTranslateableChunk(self, chunk):
     '''Adds a translateable chunk.  It will be unescaped before being added.'''
@@ -124,6 +164,7 @@ class SkeletonGatherer(interface.GathererBase):
       self.skeleton_.append(self.uberclique.MakeClique(
         tclib.Message(text=unescaped_text)))
       self.translatable_chunk_ = True
+      self.templates_ = {}
 
   def SubstituteMessages(self, substituter):
     '''Applies substitutions to all messages in the tree.
@@ -145,3 +186,4 @@ class SkeletonGatherer(interface.GathererBase):
           continue
       new_skel.append(chunk)
     self.skeleton_ = new_skel
+    self.templates_ = {}
@@ -141,9 +141,12 @@ _NONTRANSLATEABLES = lazy_re.compile(r'''
 _ELEMENT = lazy_re.compile(r'''
   # Optional closing /, element name
   <\s*(?P<closing>/)?\s*(?P<element>[a-zA-Z0-9]+)\s*
-  # Attributes and/or replaceables inside the tag, if any
+  # Attributes and/or replaceables inside the tag, if any.  An attribute name
+  # must be followed by a character that cannot continue it, otherwise a
+  # tag that fails to match is retried with every way of splitting its
+  # attribute names, which takes exponential time.
   (?P<atts>(
-    \s*([a-zA-Z_][-:.a-zA-Z_0-9]*) # Attribute name
+    \s*([a-zA-Z_][-:.a-zA-Z_0-9]*)(?![-:.a-zA-Z_0-9]) # Attribute name
     (\s*=\s*(\'[^\']*\'|"[^"]*"|[-a-zA-Z0-9./,:;+*%?!&$\(\)_#=~\'"@]*))?
     |
     \s*\[(\$?\~)?([A-Z0-9-_]+?)(\~\$?)?\]
@@ -212,6 +215,12 @@ _MESSAGE_NO_BREAK_COMMENT = re.compile(r'<!--\s*message-no-break\s*-->',
                                        re.DOTALL)
 
 
+def _EscapeHtmlWithQuotes(text):
+  # We escape " characters to increase the chance that attributes will be
+  # properly escaped.
+  return util.EscapeHtml(text, True)
+
+
 _DEBUG = 0
 def _DebugPrint(text):
   if _DEBUG:
@@ -227,9 +236,6 @@ class HtmlChunks(object):
   def InTranslateable(self):
     return self.last_translateable != -1
 
-  def Rest(self):
-    return self.text_[self.current:]
-
   def StartTranslateable(self):
     assert not self.InTranslateable()
     if self.current != 0:
@@ -252,7 +258,7 @@ class HtmlChunks(object):
     self.last_nontranslateable = self.current
 
   def AdvancePast(self, match):
-    self.current += match.end()
+    self.current = match.end()
 
   def AddChunk(self, translateable, text):
     '''Adds a chunk to self, removing linebreaks and duplicate whitespace
@@ -340,17 +346,21 @@ class HtmlChunks(object):
     # Whether no-break was the last chunk seen
     self.last_nobreak = False
 
-    while self.current < len(self.text_):
+    # Patterns are matched at self.current rather than against a slice of the
+    # rest of the document, so that each step costs the same however large
+    # the document is.  Match positions are therefore absolute.
+    text_length = len(self.text_)
+    while self.current < text_length:
       _DebugPrint('REST: %s' % self.text_[self.current:self.current+60])
 
-      m = _MESSAGE_NO_BREAK_COMMENT.match(self.Rest())
+      m = _MESSAGE_NO_BREAK_COMMENT.match(self.text_, self.current)
       if m:
         self.AdvancePast(m)
         self.last_nobreak = True
         continue
 
       # Try to match whitespace
-      m = _WHITESPACE.match(self.Rest())
+      m = _WHITESPACE.match(self.text_, self.current)
       if m:
         # Whitespace is neutral, it just advances 'current' and does not switch
         # between translateable/nontranslateable.  If we are in a
@@ -361,22 +371,22 @@ class HtmlChunks(object):
         # to end with whitespace.
         if (not self.InTranslateable() and
             self.last_nontranslateable == self.current - 1):
-          self.last_nontranslateable = self.current + m.end() - 1
+          self.last_nontranslateable = m.end() - 1
         self.AdvancePast(m)
         continue
 
       # Then we try to match nontranslateables
-      m = _NONTRANSLATEABLES.match(self.Rest())
+      m = _NONTRANSLATEABLES.match(self.text_, self.current)
       if m:
         if self.InTranslateable():
           self.EndTranslateable()
-        self.last_nontranslateable = self.current + m.end() - 1
+        self.last_nontranslateable = m.end() - 1
         self.AdvancePast(m)
         continue
 
       # Now match all other HTML element tags (opening, closing, or empty, we
       # don't care).
-      m = _ELEMENT.match(self.Rest())
+      m = _ELEMENT.match(self.text_, self.current)
       if m:
         element_name = m.group('element').lower()
         if element_name in _BLOCK_TAGS:
@@ -391,27 +401,32 @@ class HtmlChunks(object):
           # attribute, and handle them correctly.  Note that all of the
           # "special" elements are block tags, so no need to check for this
           # if the tag is not a block tag.
-          sm = _SPECIAL_ELEMENT.match(self.Rest())
+          sm = _SPECIAL_ELEMENT.match(self.text_, self.current)
           if sm:
             # Get the appropriate group name
             for group in sm.groupdict().keys():
               if sm.groupdict()[group]:
                 break
 
+            value_start, value_end = sm.span(group)
+            if value_start == -1:
+              # An empty attribute value leaves every value group unmatched;
+              # the chunk boundary then falls just before the tag.
+              value_start = value_end = self.current - 1
+
             # First make a nontranslateable chunk up to and including the
             # quote before the translateable attribute value
-            self.AddChunk(False, self.text_[
-              self.chunk_start : self.current + sm.start(group)])
+            self.AddChunk(False, self.text_[self.chunk_start : value_start])
             # Then a translateable for the translateable bit
-            self.AddChunk(True, self.Rest()[sm.start(group) : sm.end(group)])
+            self.AddChunk(True, self.text_[value_start : value_end])
             # Finally correct the data invariant for the parser
-            self.chunk_start = self.current + sm.end(group)
+            self.chunk_start = value_end
 
-          self.last_nontranslateable = self.current + m.end() - 1
+          self.last_nontranslateable = m.end() - 1
         elif self.InTranslateable():
           # We're in a translateable and the tag is an inline tag, so we
           # need to include it in the translateable.
-          self.last_translateable = self.current + m.end() - 1
+          self.last_translateable = m.end() - 1
         self.AdvancePast(m)
         continue
 
@@ -512,27 +527,27 @@ def HtmlToMessage(html, include_block_tags=False, description=''):
   last_nobreak = False
 
   while current < len(html):
-    m = _MESSAGE_NO_BREAK_COMMENT.match(html[current:])
+    m = _MESSAGE_NO_BREAK_COMMENT.match(html, current)
     if m:
       last_nobreak = True
-      current += m.end()
+      current = m.end()
       continue
 
-    m = _NBSP.match(html[current:])
+    m = _NBSP.match(html, current)
     if m:
       parts.append((MakeNameClosure('SPACE'), m.group()))
-      current += m.end()
+      current = m.end()
       continue
 
-    m = _REPLACEABLE.match(html[current:])
+    m = _REPLACEABLE.match(html, current)
     if m:
       # Replaceables allow - but placeholders don't, so replace - with _
       ph_name = MakeNameClosure('X_%s_X' % m.group('name').replace('-', '_'))
       parts.append((ph_name, m.group()))
-      current += m.end()
+      current = m.end()
       continue
 
-    m = _SPECIAL_ELEMENT.match(html[current:])
+    m = _SPECIAL_ELEMENT.match(html, current)
     if m:
       if not include_block_tags:
         if last_nobreak:
@@ -544,15 +559,19 @@ def HtmlToMessage(html, include_block_tags=False, description=''):
       for group in m.groupdict().keys():
         if m.groupdict()[group]:
           break
+      value_start, value_end = m.span(group)
+      if value_start == -1:
+        # An empty attribute value leaves every value group unmatched.
+        value_start = value_end = current - 1
       parts.append((MakeNameClosure(element_name, 'begin'),
-                    html[current : current + m.start(group)]))
+                    html[current : value_start]))
       parts.append(m.group(group))
       parts.append((MakeNameClosure(element_name, 'end'),
-                    html[current + m.end(group) : current + m.end()]))
-      current += m.end()
+                    html[value_end : m.end()]))
+      current = m.end()
       continue
 
-    m = _ELEMENT.match(html[current:])
+    m = _ELEMENT.match(html, current)
     if m:
       element_name = m.group('element').lower()
       if not include_block_tags and not element_name in _INLINE_TAGS:
@@ -571,7 +590,7 @@ def HtmlToMessage(html, include_block_tags=False, description=''):
         else:
           type = 'begin'
       parts.append((MakeNameClosure(element_name, type), m.group()))
-      current += m.end()
+      current = m.end()
       continue
 
     if len(parts) and isinstance(parts[-1], types.StringTypes):
@@ -662,16 +681,9 @@ class TrHtml(interface.GathererBase):
       if isinstance(item, types.StringTypes):
         out.append(item)
       else:
-        msg = item.MessageForLanguage(lang,
-                                      pseudo_if_not_available,
-                                      fallback_to_english)
-        for content in msg.GetContent():
-          if isinstance(content, tclib.Placeholder):
-            out.append(content.GetOriginal())
-          else:
-            # We escape " characters to increase the chance that attributes
-            # will be properly escaped.
-            out.append(util.EscapeHtml(content, True))
+        out.append(item.RealContentForLanguage(
+            lang, pseudo_if_not_available, fallback_to_english,
+            escaping_function=_EscapeHtmlWithQuotes))
 
     return ''.join(out)
 
@@ -504,13 +504,21 @@ bla
                     u'\u00a9\u00a0 &amp; &quot;&lt;hello&gt;&quot;')
 
   def testRegressionCjkHtmlFile(self):
-    # TODO(joi) Fix this problem where unquoted attributes that
-    # have a value that is CJK characters causes the regular expression
-    # match never to return.  (culprit is the _ELEMENT regexp(
-    if False:
-      html = self.HtmlFromFileWithManualCheck(util.PathFromRoot(
-        r'grit/testdata/ko_oem_enable_bug.html'))
-      self.failUnless(True)
+    # Unquoted attributes that have a value that is CJK characters used to
+    # make the _ELEMENT regexp take exponential time to fail.
+    html = self.HtmlFromFileWithManualCheck(util.PathFromRoot(
+      r'grit/testdata/ko_oem_enable_bug.html'))
+    self.failUnlessEqual(1, len(html.GetCliques()))
+
+  def testChunkingLargeDocument(self):
+    # Patterns are matched at positions within the document, so chunk
+    # offsets must stay correct far from its start.
+    html = ('<p>Hello <b>there</b>, <input type="button" value="Go"> '
+            '<!-- comment --> you</p>\n')
+    single = tr_html.HtmlChunks().Parse(html, False)
+    chunks = tr_html.HtmlChunks().Parse(html * 500, False)
+    repeated = single[1:-1] + [(False, '</p>\n<p>', '')]
+    self.failUnlessEqual(single[:1] + repeated * 499 + single[1:], chunks)
 
   def testRegressionCpuHang(self):
     # If this regression occurs, the unit test will never return
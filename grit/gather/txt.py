@@ -32,6 +32,6 @@ class TxtFile(interface.GathererBase):
 
   def Translate(self, lang, pseudo_if_not_available=True,
                 skeleton_gatherer=None, fallback_to_english=False):
-    return self.clique_.MessageForLanguage(lang,
-                                           pseudo_if_not_available,
-                                           fallback_to_english).GetRealContent()
+    return self.clique_.RealContentForLanguage(lang,
+                                               pseudo_if_not_available,
+                                               fallback_to_english)
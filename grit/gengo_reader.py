@@ -15,6 +15,36 @@ _MSG_RE = re.compile(
 
 _PH_RE = re.compile(r'\[\[\[(?P<phname>[^\|]+)\|[^\]]*\]\]\]')
 
+# Every message starts with this marker, so text before it can be dropped.
+_BEGIN_MARKER = '[[[.BEGIN.'
+
+# Number of bytes read from the file at a time.
+_CHUNK_SIZE = 64 * 1024
+
+
+def _SplitPlaceholders(text, start, end):
+  '''Splits text[start:end], the body of a message, into parts, as passed
+  to the callback of Parse().
+
+  Args:
+    text: u'[[[.BEGIN.123.]]]Bonjour [[[USERNAME|Joi]]]![[[.END.]]]'
+    start: 17
+    end: 44
+
+  Return:
+    [(False, u'Bonjour '), (True, u'USERNAME'), (False, u'!')]
+  '''
+  parts = []
+  pos = start
+  for match in _PH_RE.finditer(text, start, end):
+    if match.start() > pos:
+      parts.append((False, text[pos:match.start()]))
+    parts.append((True, match.group('phname')))
+    pos = match.end()
+  if pos < end:
+    parts.append((False, text[pos:end]))
+  return parts
+
 
 def Parse(gengo_file, callback_function):
   '''Parse po_file, making a call to callback_function for every translation
@@ -28,6 +58,9 @@ def Parse(gengo_file, callback_function):
   The PO reader does not support conditionals or target platform specifications,
   so the 'defs' and 'target_platform' parameters are ignored.
 
+  The file is read and decoded in chunks; only the message being read is kept
+  in memory.
+
   Args:
     po_file:            open('fr.po')
     callback_function:  def Callback(msg_id, parts): pass
@@ -35,28 +68,24 @@ def Parse(gengo_file, callback_function):
   Return:
     None
   '''
-  def MakeTextPart(text):
-    return (False, text)
-
-  contents = codecs.decode(gengo_file.read(), 'utf-8')
-  messages = _MSG_RE.findall(contents)
-  for (message_id, message) in messages:
-    parts = []
-    while True:
-      match = _PH_RE.search(message)
-      if match:
-        ph_name = match.group('phname')
-        len_before = match.start()
-        normal_text_before = message[:len_before]
-        if len(normal_text_before):
-          parts.append(MakeTextPart(normal_text_before))
-        parts.append((True, ph_name))
-        message = message[match.end():]
-      else:
-        if len(message):
-          parts.append(MakeTextPart(message))
-        break
-    callback_function(message_id, parts)
+  decoder = codecs.getincrementaldecoder('utf-8')()
+  pending = u''
+  while True:
+    chunk = gengo_file.read(_CHUNK_SIZE)
+    pending += decoder.decode(chunk, not chunk)
+    pos = 0
+    for match in _MSG_RE.finditer(pending):
+      callback_function(match.group('msgid'),
+                        _SplitPlaceholders(pending, match.start('msgbody'),
+                                           match.end('msgbody')))
+      pos = match.end()
+    if not chunk:
+      break
+    # Keep the unfinished message, or what may be the start of its marker.
+    begin = pending.find(_BEGIN_MARKER, pos)
+    if begin == -1:
+      begin = max(pos, len(pending) - len(_BEGIN_MARKER) + 1)
+    pending = pending[begin:]
 
 
 if __name__ == '__main__':
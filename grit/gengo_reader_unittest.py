@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.gengo_reader'''
+
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import StringIO
+import unittest
+
+from grit import gengo_reader
+
+
+_GENGO_FILE = ('Header text\n'
+               '[[[.BEGIN.123.]]]Bonjour [[[USERNAME|Joi]]] !\n'
+               'Deuxi\xc3\xa8me ligne[[[.END.]]]\n'
+               '[[[.BEGIN.456.]]][[[A|1]]][[[B|2]]][[[.END.]]]\n')
+
+
+class GengoReaderUnittest(unittest.TestCase):
+  def _Parse(self, text):
+    messages = []
+    gengo_reader.Parse(StringIO.StringIO(text),
+                       lambda id, parts: messages.append((id, parts)))
+    return messages
+
+  def testParsing(self):
+    self.failUnlessEqual([
+        (u'123', [(False, u'Bonjour '), (True, u'USERNAME'),
+                  (False, u' !\nDeuxi\xe8me ligne')]),
+        (u'456', [(True, u'A'), (True, u'B')]),
+      ], self._Parse(_GENGO_FILE))
+
+  def testMessagesSpanningChunks(self):
+    expected = self._Parse(_GENGO_FILE)
+    old_chunk_size = gengo_reader._CHUNK_SIZE
+    try:
+      for chunk_size in range(1, len(_GENGO_FILE) + 1):
+        gengo_reader._CHUNK_SIZE = chunk_size
+        self.failUnlessEqual(expected, self._Parse(_GENGO_FILE))
+    finally:
+      gengo_reader._CHUNK_SIZE = old_chunk_size
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -147,19 +147,22 @@ class GrdReaderUnittest(unittest.TestCase):
     </messages>
   </release>
 </grit>'''
-    pseudo_file = StringIO.StringIO(input)
     grit_root_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)),
                                  '..')
     fake_input_path = os.path.join(grit_root_dir, "grit/testdata/test.grd")
 
-    root = grd_reader.Parse(pseudo_file, os.path.split(fake_input_path)[0])
-    root.AssignFirstIds(fake_input_path, {})
-    messages_node = root.children[0].children[0]
-    self.assertTrue(isinstance(messages_node, empty.MessagesNode))
-    self.assertEqual('100', messages_node.attrs["first_id"])
-    messages_node = root.children[0].children[1]
-    self.assertTrue(isinstance(messages_node, empty.MessagesNode))
-    self.assertEqual('10000', messages_node.attrs["first_id"])
+    # With the file cache enabled, the trees share the first ids of the file.
+    with util.ReadFileCacheScope():
+      for i in range(2):
+        root = grd_reader.Parse(StringIO.StringIO(input),
+                                os.path.split(fake_input_path)[0])
+        root.AssignFirstIds(fake_input_path, {})
+        messages_node = root.children[0].children[0]
+        self.assertTrue(isinstance(messages_node, empty.MessagesNode))
+        self.assertEqual('100', messages_node.attrs["first_id"])
+        messages_node = root.children[0].children[1]
+        self.assertTrue(isinstance(messages_node, empty.MessagesNode))
+        self.assertEqual('10000', messages_node.attrs["first_id"])
 
   def testUseNameForIdAndPpIfdef(self):
     input = u'''<?xml version="1.0" encoding="UTF-8"?>
@@ -20,6 +20,14 @@ import grit.extern.FP
 
 # Tool info factories; these import only within each factory to avoid
 # importing most of the GRIT code until required.
+def ToolFactoryBatch():
+  import grit.tool.batch
+  return grit.tool.batch.BatchBuilder()
+
+def ToolFactoryBench():
+  import grit.tool.bench
+  return grit.tool.bench.BenchmarkTool()
+
 def ToolFactoryBuild():
   import grit.tool.build
   return grit.tool.build.RcBuilder()
@@ -44,6 +52,10 @@ def ToolFactoryNewGrd():
   import grit.tool.newgrd
   return grit.tool.newgrd.NewGrd()
 
+def ToolFactoryPack():
+  import grit.tool.pack
+  return grit.tool.pack.PackTool()
+
 def ToolFactoryResizeDialog():
   import grit.tool.resize
   return grit.tool.resize.ResizeDialog()
@@ -72,6 +84,10 @@ def ToolFactoryXtb():
   import grit.tool.xtb
   return grit.tool.xtb.OutputXtbUntranslated()
 
+def ToolFactoryServe():
+  import grit.tool.serve
+  return grit.tool.serve.BuildServer()
+
 def ToolAndroid2Grd():
   import grit.tool.android2grd
   return grit.tool.android2grd.Android2Grd()
@@ -84,6 +100,9 @@ _HIDDEN = 3  # optional key - presence indicates tool is hidden
 # Maps tool names to the tool's module.  Done as a list of (key, value) tuples
 # instead of a map to preserve ordering.
 _TOOLS = [
+  ['batch', { _FACTORY : ToolFactoryBatch, _REQUIRES_INPUT : False }],
+  ['bench', { _FACTORY : ToolFactoryBench, _REQUIRES_INPUT : False,
+              _HIDDEN : True }],
   ['build', { _FACTORY : ToolFactoryBuild, _REQUIRES_INPUT : True }],
   ['buildinfo', { _FACTORY : ToolFactoryBuildInfo, _REQUIRES_INPUT : True }],
   ['count', { _FACTORY : ToolFactoryCount, _REQUIRES_INPUT : True }],
@@ -91,9 +110,11 @@ _TOOLS = [
       _FACTORY: ToolFactoryMenuTranslationsFromParts,
       _REQUIRES_INPUT : True, _HIDDEN : True }],
   ['newgrd', { _FACTORY  : ToolFactoryNewGrd, _REQUIRES_INPUT : False }],
+  ['pack', { _FACTORY : ToolFactoryPack, _REQUIRES_INPUT : False }],
   ['rc2grd', { _FACTORY : ToolFactoryRc2Grd, _REQUIRES_INPUT : False }],
   ['resize', {
       _FACTORY : ToolFactoryResizeDialog, _REQUIRES_INPUT : True }],
+  ['serve', { _FACTORY : ToolFactoryServe, _REQUIRES_INPUT : False }],
   ['sdiff', { _FACTORY : ToolFactoryDiffStructures,
               _REQUIRES_INPUT : False }],
   ['test', {
@@ -144,6 +165,11 @@ Global options:
   -p FNAME  Specifies that GRIT should profile its execution and output the
             results to the file FNAME.
 
+  --server SOCKET
+            Sends 'build' requests to the 'grit serve' build server listening
+            on SOCKET, building in-process if no server is running.  Defaults
+            to the value of the GRIT_SERVER_SOCKET environment variable.
+
 Tools:
 
   TOOL can be one of the following:
@@ -166,10 +192,11 @@ class Options(object):
     self.output_stream = sys.stdout
     self.profile_dest = None
     self.psyco = False
+    self.server = None
 
   def ReadOptions(self, args):
     """Reads options from the start of args and returns the remainder."""
-    (opts, args) = getopt.getopt(args, 'g:qdvxc:i:p:h:', ('psyco',))
+    (opts, args) = getopt.getopt(args, 'g:qdvxc:i:p:h:', ('psyco', 'server='))
     for (key, val) in opts:
       if key == '-d': self.disconnected = True
       elif key == '-c': self.client = val
@@ -185,6 +212,7 @@ class Options(object):
         util.extra_verbose = True
       elif key == '-p': self.profile_dest = val
       elif key == '--psyco': self.psyco = True
+      elif key == '--server': self.server = val
 
     if not self.input:
       if 'GRIT_INPUT' in os.environ:
@@ -192,6 +220,9 @@ class Options(object):
       else:
         self.input = 'resource.grd'
 
+    if not self.server:
+      self.server = os.environ.get('GRIT_SERVER_SOCKET')
+
     return args
 
   def __repr__(self):
@@ -264,6 +295,10 @@ def Main(args):
     if options.hash:
       grit.extern.FP.UseUnsignedFingerPrintFromModule(options.hash)
 
+    if tool == 'build' and options.server and not options.profile_dest:
+      import grit.tool.serve
+      return grit.tool.serve.RunBuild(options.server, options, args[1:])
+
     toolobject = _GetToolInfo(tool)[_FACTORY]()
     if options.profile_dest:
       import hotshot
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Fast and safe reader for Python literals, such as policy_templates.json
+and the files loaded by the json_loader gatherer.  The result equals what
+eval() would give, but no code from the text is run.
+'''
+
+import ast
+import operator
+import re
+
+
+# A single token of a literal, together with the whitespace and comments
+# before it.  Anything not recognised is matched by 'error', and the end of
+# the text by no named group at all.
+_TOKEN_RE = re.compile(r'''
+  \s*(?:\#[^\n]*\s*)*(?:
+  (?P<string>[uUbB]?(?:
+    \'\'\'(?:[^\\']+|\\.|'(?!''))*\'\'\' |
+    """(?:[^\\"]+|\\.|"(?!""))*""" |
+    (?!\'\'\')'(?:[^\\'\n]+|\\.)*' |
+    (?!""")"(?:[^\\"\n]+|\\.)*")) |
+  (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?
+    (?![0-9A-Za-z_.])) |
+  (?P<name>[A-Za-z_][A-Za-z0-9_]*) |
+  (?P<punctuation>[][{}(),:]) |
+  (?P<error>.) |
+  \Z)
+  ''', re.VERBOSE | re.DOTALL)
+
+_NAMES = {
+  'True': True, 'False': False, 'None': None,
+  # JSON spells them differently.
+  'true': True, 'false': False, 'null': None,
+}
+
+_CLOSING = {'{': '}', '[': ']', '(': ')'}
+
+_MISSING = object()
+
+# The unary operators _SafeEval() applies.
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+class _Unsupported(Exception):
+  '''Raised for anything the tokenizer does not handle, which is then left
+  to the Python parser.
+  '''
+  pass
+
+
+def _DecodeString(token, source_is_unicode):
+  '''Returns the value of a string literal token, as eval() would.
+
+  Args:
+    token: "'It\\'s'"
+    source_is_unicode: Whether the text being read was a unicode string, and
+      has been UTF-8 encoded for reading.
+  '''
+  prefix = token[0]
+  if prefix in 'uUbB':
+    token = token[1:]
+  quote_length = 3 if token[:3] in ("'''", '"""') else 1
+  content = token[quote_length:-quote_length]
+  if prefix in 'uU':
+    # The Python parser's decoding of non-ASCII bytes and escapes in unicode
+    # literals depends on how the source is encoded, so leave those to it.
+    if '\\' in content:
+      raise _Unsupported()
+    try:
+      return content.decode('utf-8' if source_is_unicode else 'ascii')
+    except UnicodeDecodeError:
+      raise _Unsupported()
+  if '\\' in content:
+    content = content.decode('string_escape')
+  return content
+
+
+def _Parse(text):
+  '''Builds the value of the literal |text| in a single pass over its tokens,
+  raising _Unsupported for anything but the plainest literals.
+  '''
+  source_is_unicode = isinstance(text, unicode)
+  if source_is_unicode:
+    # Byte string literals in unicode source are UTF-8 encoded by eval().
+    text = text.encode('utf-8')
+  stack = []  # (container, key, opener) of the enclosing containers.
+  # The items of the list or tuple being built, or the keys and values of
+  # the dict being built, one after the other.
+  container = None
+  opener = None  # The bracket container was opened with.
+  key = _MISSING  # The key of the dict entry being built.
+  value = _MISSING  # The value that was just read.
+  for match in _TOKEN_RE.finditer(text):
+    kind = match.lastgroup
+    if kind is None:
+      continue
+    token = match.group(kind)
+    if kind == 'string':
+      string = _DecodeString(token, source_is_unicode)
+      if value is _MISSING:
+        value = string
+      elif isinstance(value, basestring) and type(value) == type(string):
+        # Adjacent string literals are concatenated.
+        value += string
+      else:
+        raise _Unsupported()
+    elif value is not _MISSING:
+      if kind != 'punctuation' or token in '{[(':
+        raise _Unsupported()
+      if token == ':':
+        if opener != '{' or key is not _MISSING:
+          raise _Unsupported()
+        key = value
+      else:
+        if opener == '{':
+          if key is _MISSING:
+            raise _Unsupported()
+          container.append(key)
+          container.append(value)
+          key = _MISSING
+        elif opener is None:
+          raise _Unsupported()
+        else:
+          container.append(value)
+        if token != ',':
+          value = _Close(container, opener, token, True)
+          container, key, opener = stack.pop()
+          continue
+      value = _MISSING
+    elif kind == 'number':
+      if '.' in token or 'e' in token or 'E' in token:
+        value = float(token)
+      else:
+        value = int(token)
+    elif kind == 'name':
+      if token not in _NAMES:
+        raise _Unsupported()
+      value = _NAMES[token]
+    elif token in '{[(':
+      stack.append((container, key, opener))
+      container = []
+      key = _MISSING
+      opener = token
+    elif token in '}])' and opener is not None and key is _MISSING:
+      value = _Close(container, opener, token, False)
+      container, key, opener = stack.pop()
+    else:
+      raise _Unsupported()
+  if stack or value is _MISSING:
+    raise _Unsupported()
+  return value
+
+
+def _Close(container, opener, closer, last_item_read):
+  '''Returns the value of |container| once |closer| has been read.
+
+  Args:
+    container: The items read; keys and values alternate for dicts.
+    opener: '{', '[' or '('
+    closer: The closing bracket read, which must match |opener|.
+    last_item_read: Whether an item came just before |closer|, rather than a
+      comma or the opening bracket.
+  '''
+  if _CLOSING[opener] != closer:
+    raise _Unsupported()
+  if opener == '{':
+    return _MakeDict(container)
+  if opener == '[':
+    return container
+  if len(container) == 1 and last_item_read:
+    return container[0]
+  return tuple(container)
+
+
+def _MakeDict(items):
+  '''Returns the dict of the keys and values in |items|, e.g. {1: 2, 3: 4}
+  for [1, 2, 3, 4].
+  '''
+  result = {}
+  for i in range(0, len(items), 2):
+    result[items[i]] = items[i + 1]
+  return result
+
+
+def _ValueOf(node):
+  '''Returns the value of the literal expression |node|, and raises
+  ValueError if it is not a literal.
+  '''
+  if isinstance(node, ast.Str):
+    return node.s
+  if isinstance(node, ast.Num):
+    return node.n
+  if isinstance(node, ast.Name) and node.id in _NAMES:
+    return _NAMES[node.id]
+  if isinstance(node, ast.List):
+    return [_ValueOf(item) for item in node.elts]
+  if isinstance(node, ast.Tuple):
+    return tuple(_ValueOf(item) for item in node.elts)
+  if isinstance(node, ast.Set):
+    return set(_ValueOf(item) for item in node.elts)
+  if isinstance(node, ast.Dict):
+    items = []
+    for key, value in zip(node.keys, node.values):
+      items.append(_ValueOf(key))
+      items.append(_ValueOf(value))
+    return _MakeDict(items)
+  if (isinstance(node, ast.UnaryOp) and
+      type(node.op) in _UNARY_OPERATORS):
+    return _UNARY_OPERATORS[type(node.op)](_ValueOf(node.operand))
+  raise ValueError('Not a literal: %s' % type(node).__name__)
+
+
+def _SafeEval(text):
+  '''Returns eval(text) if |text| is a literal, and raises ValueError if it
+  is not.  The syntax tree is evaluated here, so no code is ever run.
+  '''
+  # eval() ignores leading blanks, but the parser does not.
+  tree = ast.parse(text.lstrip(' \t'), mode='eval')
+  return _ValueOf(tree.body)
+
+
+def Parse(text):
+  '''Returns the value of the Python literal (or JSON value) |text|.
+
+  Dictionaries, lists, tuples, strings, numbers, True, False and None are
+  understood, as are comments and JSON's true, false and null.
+
+  Args:
+    text: "{'name': 'Policy', 'id': 5}"
+
+  Return:
+    {'name': 'Policy', 'id': 5}
+
+  Raises:
+    SyntaxError or ValueError if |text| is not a literal.
+  '''
+  try:
+    return _Parse(text)
+  except _Unsupported:
+    # Anything unusual is left to the Python parser, which also reports
+    # errors properly.
+    return _SafeEval(text)
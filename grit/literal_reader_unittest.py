@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.literal_reader'''
+
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+
+from grit import literal_reader
+
+
+def _Canonical(value):
+  '''Returns |value| with its dicts replaced by sorted lists of their items,
+  so that the repr() of values that are equal only differs if the types of
+  their parts do.
+  '''
+  if isinstance(value, dict):
+    return sorted((_Canonical(k), _Canonical(v)) for k, v in value.items())
+  if isinstance(value, (list, tuple)):
+    return type(value)(_Canonical(item) for item in value)
+  return value
+
+
+class LiteralReaderUnittest(unittest.TestCase):
+  def _CheckSameAsEval(self, text):
+    value = literal_reader.Parse(text)
+    self.failUnlessEqual(eval(text), value)
+    self.failUnlessEqual(repr(_Canonical(eval(text))), repr(_Canonical(value)))
+
+  def testLiterals(self):
+    self._CheckSameAsEval('''{
+      # A comment.
+      'name': 'Policy',
+      "id": -5, 'ratio': 1.5e3,
+      'supported_on': ['chrome.win:8-', 'chrome.linux:8-',],
+      'features': {'dynamic_refresh': True, 'per_profile': None},
+      'pair': (1, 'two'), 'single': (3), 'one': (4,), 'empty': (),
+    }''')
+
+  def testStrings(self):
+    self._CheckSameAsEval(r"""['it\'s', "say \"hi\"", '\x41\101\n\q',
+                              '''multi
+                              line''', 'con' "cat" '''enated''', u'uni']""")
+    # Byte strings in unicode text are UTF-8 encoded, as eval() does.
+    self._CheckSameAsEval(u"['\xe9\\xe9', u'\xe9']")
+    self._CheckSameAsEval("['\xc3\xa9']")
+
+  def testJsonNames(self):
+    self.failUnlessEqual({'a': [True, False, None]},
+                         literal_reader.Parse('{"a": [true, false, null]}'))
+
+  def testUnusualLiteralsAreLeftToPython(self):
+    self._CheckSameAsEval(r"[r'\d', 0x1f, 017, 5L, u'\u00e9', {1, 2}]")
+
+  def testOnlyLiteralsAreAllowed(self):
+    self.assertRaises(ValueError, literal_reader.Parse, '__import__("os")')
+    self.assertRaises(ValueError, literal_reader.Parse, '{"a": b}')
+    self.assertRaises(ValueError, literal_reader.Parse, '[1, 2 + 3]')
+    self.assertRaises(ValueError, literal_reader.Parse, '[(1).__class__]')
+    self.assertRaises(SyntaxError, literal_reader.Parse, '{"a": 1')
+    self.assertRaises(SyntaxError, literal_reader.Parse, '[1 2]')
+
+
+if __name__ == '__main__':
+  unittest.main()
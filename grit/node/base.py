@@ -586,6 +586,19 @@ class Node(object):
     '''
     self._whitelist_marked_as_skip = mark_skipped
 
+  def GetDataPackCompression(self):
+    '''Returns how this node's data pack resource should be compressed, either
+    'gzip' or 'false'.  Nodes with compress="default" use the build-wide
+    setting of the <grit> node.
+    '''
+    compress = self.attrs.get('compress', 'false')
+    if compress == 'default':
+      compress = self.GetRoot().attrs.get('data_pack_compress', 'false')
+    if compress not in ('gzip', 'false'):
+      raise exception.UnexpectedAttribute(
+          "Attribute 'compress' must be one of 'gzip', 'false' or 'default'")
+    return compress
+
   def ExpandVariables(self):
     '''Whether we need to expand variables on a given node.'''
     return False
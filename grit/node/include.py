@@ -50,6 +50,7 @@ class IncludeNode(base.Node):
             'allowexternalscript': 'false',
             'relativepath': 'false',
             'use_base_dir': 'true',
+            'compress': 'default',
            }
 
   def GetInputPath(self):
@@ -102,7 +103,7 @@ class IncludeNode(base.Node):
         self.attrs['name'] + '_' + os.path.basename(filename))
 
     if self._last_flat_filename == flat_filename:
-      return
+      return os.path.basename(flat_filename)
 
     with open(flat_filename, 'wb') as outfile:
       outfile.write(self._GetFlattenedData())
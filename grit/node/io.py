@@ -12,6 +12,7 @@ import grit.format.rc_header
 
 from grit import gengo_reader
 from grit import po_reader
+from grit import util
 from grit import xtb_reader
 from grit.node import base
 
@@ -19,6 +20,12 @@ from grit.node import base
 class FileNode(base.Node):
   '''A <file> element.'''
 
+  # When not None, maps (absolute path, signature, defines, target platform)
+  # to the (language, translations) parsed from a translation file, so that
+  # .grd files built in the same process parse shared translation files only
+  # once.  Enabled by 'grit batch'.
+  parsed_translations_cache = None
+
   def __init__(self):
     super(FileNode, self).__init__()
     self.re = None
@@ -45,26 +52,25 @@ class FileNode(base.Node):
     target_platform = getattr(root, 'target_platform', '')
 
     path = self.ToRealPath(self.GetInputPath())
-    xtb_file = open(path)
+    callback = self.UberClique().GenerateXtbParserCallback(
+        self.attrs['lang'], debug=debug)
+    cache = FileNode.parsed_translations_cache
     try:
-      if path.endswith('.po') or path.endswith('.pot'):
-        lang = self.attrs['lang']
-        po_reader.Parse(xtb_file,
-                        self.UberClique().GenerateXtbParserCallback(
-                            self.attrs['lang'], debug=debug),
-                        defs=defs,
-                        target_platform=target_platform)
-      elif path.endswith('.gengo'):
-        lang = self.attrs['lang']
-        gengo_reader.Parse(xtb_file,
-                           self.UberClique().GenerateXtbParserCallback(
-                              self.attrs['lang'], debug=debug))
+      if cache is None:
+        lang = self._ParseTranslationFile(path, callback, defs,
+                                          target_platform)
       else:
-        lang = xtb_reader.Parse(xtb_file,
-                                self.UberClique().GenerateXtbParserCallback(
-                                    self.attrs['lang'], debug=debug),
-                                defs=defs,
-                                target_platform=target_platform)
+        key = (os.path.abspath(path), util.FileSignature(path),
+               tuple(sorted(defs.items())), target_platform)
+        if key not in cache:
+          translations = []
+          lang = self._ParseTranslationFile(
+              path, lambda id, structure: translations.append((id, structure)),
+              defs, target_platform)
+          cache[key] = (lang, translations)
+        lang, translations = cache[key]
+        for id, structure in translations:
+          callback(id, structure)
     except:
       print "Exception during parsing of %s" % self.GetInputPath()
       raise
@@ -78,6 +84,22 @@ class FileNode(base.Node):
             'The translation file you reference must contain messages in the language '
             'specified\nby the \'lang\' attribute.')
 
+  def _ParseTranslationFile(self, path, callback, defs, target_platform):
+    '''Parses the translation file at |path|, calling |callback| for each
+    translation, and returns the language of the file.
+    '''
+    with open(path) as xtb_file:
+      if path.endswith('.po') or path.endswith('.pot'):
+        po_reader.Parse(xtb_file, callback, defs=defs,
+                        target_platform=target_platform)
+        return self.attrs['lang']
+      elif path.endswith('.gengo'):
+        gengo_reader.Parse(xtb_file, callback)
+        return self.attrs['lang']
+      else:
+        return xtb_reader.Parse(xtb_file, callback, defs=defs,
+                                target_platform=target_platform, fast=True)
+
   def GetInputPath(self):
     return os.path.expandvars(self.attrs['path'])
 
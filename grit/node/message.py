@@ -196,10 +196,9 @@ class MessageNode(base.ContentNode):
     '''Returns a translated version of this message.
     '''
     assert self.clique
-    msg = self.clique.MessageForLanguage(lang,
-                                         self.PseudoIsAllowed(),
-                                         self.ShouldFallbackToEnglish()
-                                         ).GetRealContent()
+    msg = self.clique.RealContentForLanguage(lang,
+                                             self.PseudoIsAllowed(),
+                                             self.ShouldFallbackToEnglish())
     return msg.replace('[GRITLANGCODE]', lang)
 
   def NameOrOffset(self):
@@ -34,15 +34,25 @@ _RTL_LANGS = (
 )
 
 
+def _EvalFirstIds(text):
+  """Returns the dictionary defined by the text of a first_ids file."""
+  return eval(text)
+
+
 def _ReadFirstIdsFromFile(filename, defines):
   """Read the starting resource id values from |filename|.  We also
   expand variables of the form <(FOO) based on defines passed in on
   the command line.
 
   Returns a tuple, the absolute path of SRCDIR followed by the
-  first_ids dictionary.
+  first_ids dictionary.  The id lists of the dictionary must not be modified,
+  as they are shared by all the .grd files read while the util.ReadFile()
+  cache is enabled, e.g. by 'grit batch'.
   """
-  first_ids_dict = eval(util.ReadFile(filename, util.RAW_TEXT))
+  # The file is evaluated once per run, and the dictionary is copied to
+  # rename its keys.
+  first_ids_dict = dict(util.ReadFileDerived(filename, util.RAW_TEXT,
+                                             _EvalFirstIds))
   src_root_dir = os.path.abspath(os.path.join(os.path.dirname(filename),
                                               first_ids_dict['SRCDIR']))
 
@@ -172,6 +182,15 @@ class GritNode(base.Node):
     self.defines = {}
     self.substituter = None
     self.target_platform = sys.platform
+    # Processed policy template data shared by the policy template outputs of
+    # a build, see policy_templates.template_formatter.  Cleared by the build
+    # once it is done.
+    self.policy_generators = {}
+    # The .rc lines of <include> nodes by (node, output directory), see
+    # grit.format.rc.
+    self.rc_include_lines = {}
+    # The rc_header.IdTable of the tree, see GetIdTable().
+    self.id_table = None
 
   def _IsValidChild(self, child):
     from grit.node import empty
@@ -182,11 +201,16 @@ class GritNode(base.Node):
     if name not in ['base_dir', 'first_ids_file', 'source_lang_id',
                     'latest_public_release', 'current_release',
                     'enc_check', 'tc_project', 'grit_version',
-                    'output_all_resource_defines', 'rc_header_format']:
+                    'output_all_resource_defines', 'rc_header_format',
+                    'data_pack_version', 'data_pack_compress']:
       return False
     if name in ['latest_public_release', 'current_release'] and value.strip(
       '0123456789') != '':
       return False
+    if name == 'data_pack_version' and value not in ['4', '5']:
+      return False
+    if name == 'data_pack_compress' and value not in ['gzip', 'false']:
+      return False
     return True
 
   def MandatoryAttributes(self):
@@ -201,7 +225,9 @@ class GritNode(base.Node):
       'enc_check' : constants.ENCODING_CHECK,
       'tc_project' : 'NEED_TO_SET_tc_project_ATTRIBUTE',
       'output_all_resource_defines': 'true',
-      'rc_header_format': None
+      'rc_header_format': None,
+      'data_pack_version': '4',
+      'data_pack_compress': 'false',
     }
 
   def EndParsing(self):
@@ -310,6 +336,12 @@ class GritNode(base.Node):
   def AssignRcHeaderFormat(self, rc_header_format):
     self.attrs['rc_header_format'] = rc_header_format
 
+  def GetDataPackVersion(self):
+    """Returns the file format version to write data packs in.  Version 5
+    stores resources with identical contents only once.
+    """
+    return int(self.attrs['data_pack_version'])
+
   def GetInputFiles(self):
     """Returns the list of files that are read to produce the output."""
 
@@ -436,6 +468,30 @@ class GritNode(base.Node):
       rc.RcSubstitutions(self.substituter, self.output_language)
     return self.substituter
 
+  def GetIdTable(self):
+    '''Returns the rc_header.IdTable of the numeric ids of the resources of
+    the tree.  The ids are assigned the first time they are needed, and kept
+    until InvalidateIdTable() is called.  Whitelists only select the
+    resources that are output, not their ids, so all of them share a table.
+    '''
+    if self.id_table is None:
+      from grit.format import rc_header
+      self.id_table = rc_header.ComputeIdTable(self)
+    return self.id_table
+
+  def SetIdTable(self, id_table):
+    '''Makes the tree use the ids of |id_table|, e.g. one read back by
+    rc_header.ReadIdTable(), instead of assigning them itself.
+    '''
+    self.id_table = id_table
+
+  def InvalidateIdTable(self):
+    '''Forgets the ids of the resources, so that they are assigned again when
+    next needed.  Call it after changing nodes or attributes of the tree that
+    the ids depend on.
+    '''
+    self.id_table = None
+
   def AssignFirstIds(self, filename_or_stream, defines):
     """Assign first ids to each grouping node based on values from the
     first_ids file (if specified on the <grit> node).
@@ -453,6 +509,7 @@ class GritNode(base.Node):
     src_root_dir, first_ids = _ReadFirstIdsFromFile(first_ids_filename,
                                                     defines)
     from grit.node import empty
+    used_ids = {}  # Maps node names to the number of their first ids used.
     for node in self.Preorder():
       if isinstance(node, empty.GroupingNode):
         abs_filename = os.path.abspath(filename_or_stream)
@@ -479,11 +536,14 @@ class GritNode(base.Node):
           print '-' * 78
           raise e
 
+        used = used_ids.get(node.name, 0)
         try:
-          node.attrs['first_id'] = str(id_list.pop(0))
+          node.attrs['first_id'] = str(id_list[used])
         except IndexError, e:
           raise Exception('Please update %s and add a first id for %s (%s).'
                           % (first_ids_filename, filename, node.name))
+        used_ids[node.name] = used + 1
+    self.InvalidateIdTable()
 
   def RunGatherers(self, debug=False):
     '''Call RunPreSubstitutionGatherer() on every node of the tree, then apply
@@ -9,7 +9,30 @@ import re
 import sys
 
 
-_PH_RE = re.compile(r'(^|.*?[^\\])%{(?P<phname>[^}]+?)}')
+# A %{NAME} placeholder that is not escaped with a backslash.
+_PH_RE = re.compile(r'(?<!\\)%{(?P<phname>[^}]+)}')
+
+
+def _SplitPlaceholders(text):
+  '''Splits the text of a message into parts, as passed to the callback of
+  Parse().
+
+  Args:
+    text: u'Bonjour %{USERNAME}!'
+
+  Return:
+    [(False, u'Bonjour '), (True, u'USERNAME'), (False, u'!')]
+  '''
+  parts = []
+  pos = 0
+  for match in _PH_RE.finditer(text):
+    if match.start() > pos:
+      parts.append((False, text[pos:match.start()]))
+    parts.append((True, match.group('phname')))
+    pos = match.end()
+  if pos < len(text):
+    parts.append((False, text[pos:]))
+  return parts
 
 
 def Parse(po_file, callback_function, defs=None, debug=False,
@@ -25,6 +48,9 @@ def Parse(po_file, callback_function, defs=None, debug=False,
   The PO reader does not support conditionals or target platform specifications,
   so the 'defs' and 'target_platform' parameters are ignored.
 
+  The file is read a line at a time.  A msgstr may be continued by quoted
+  strings on the lines following it, which are concatenated.
+
   Args:
     po_file:            open('fr.po')
     callback_function:  def Callback(msg_id, parts): pass
@@ -36,36 +62,25 @@ def Parse(po_file, callback_function, defs=None, debug=False,
   Return:
     None
   '''
-  def MakeTextPart(text):
-    return (False, text)
   msg_id = None
-  for line in po_file.readlines():
+  # The unquoted strings of the msgstr being read, if any.
+  msgstr = None
+  for line in po_file:
     line = codecs.decode(line, 'utf-8')
+    if msgstr is not None:
+      if line.lstrip().startswith('"'):
+        msgstr.append(line.strip()[1:-1])
+        continue
+      callback_function(msg_id, _SplitPlaceholders(''.join(msgstr)))
+      msg_id = None
+      msgstr = None
     if not msg_id:
       if line.startswith('#: id: '):
         msg_id = line[7:].strip()
-    else:
-      if line.startswith('msgstr'):
-        quoted_text = line[6:].strip()
-        unquoted_text = quoted_text[1:-1]
-        parts = []
-        while True:
-          match = _PH_RE.match(unquoted_text)
-          if match:
-            ph_name = match.group('phname')
-            len_before = match.end() - len(ph_name) - 3
-            normal_text_before = unquoted_text[:len_before]
-            if len(normal_text_before):
-              parts.append(MakeTextPart(normal_text_before))
-            parts.append((True, ph_name))
-            unquoted_text = unquoted_text[match.end():]
-          else:
-            if len(unquoted_text):
-              parts.append(MakeTextPart(unquoted_text))
-            break
-        callback_function(msg_id, parts)
-        msg_id = None
-        parts = []
+    elif line.startswith('msgstr'):
+      msgstr = [line[6:].strip()[1:-1]]
+  if msgstr is not None:
+    callback_function(msg_id, _SplitPlaceholders(''.join(msgstr)))
 
 
 if __name__ == '__main__':
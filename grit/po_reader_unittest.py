@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for grit.po_reader'''
+
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import StringIO
+import unittest
+
+from grit import po_reader
+
+
+class PoReaderUnittest(unittest.TestCase):
+  def _Parse(self, text):
+    messages = []
+    po_reader.Parse(StringIO.StringIO(text),
+                    lambda id, parts: messages.append((id, parts)))
+    return messages
+
+  def testParsing(self):
+    messages = self._Parse('#: id: 123\n'
+                           'msgid "Hello %{USERNAME}"\n'
+                           'msgstr "Bonjour %{USERNAME}, \\\\%{NOT_A_PH}"\n'
+                           '\n'
+                           '#: id: 456\n'
+                           'msgid "Bingo"\n'
+                           'msgstr "Bing\xc3\xb4"\n')
+    self.failUnlessEqual([
+        (u'123', [(False, u'Bonjour '), (True, u'USERNAME'),
+                  (False, u', \\\\%{NOT_A_PH}')]),
+        (u'456', [(False, u'Bing\xf4')]),
+      ], messages)
+
+  def testMultilineMsgstr(self):
+    messages = self._Parse('#: id: 123\n'
+                           'msgid ""\n'
+                           '"Hello %{USERNAME}"\n'
+                           'msgstr ""\n'
+                           '"Bonjour "\n'
+                           '  "%{USERNAME}!"\n'
+                           '#: id: 456\n'
+                           'msgstr "Bingo"')
+    self.failUnlessEqual([
+        (u'123', [(False, u'Bonjour '), (True, u'USERNAME'), (False, u'!')]),
+        (u'456', [(False, u'Bingo')]),
+      ], messages)
+
+  def testAdjacentPlaceholders(self):
+    messages = self._Parse('#: id: 1\nmsgstr "%{A}%{B} x"\n')
+    self.failUnlessEqual(
+        [(u'1', [(True, u'A'), (True, u'B'), (False, u' x')])], messages)
+
+
+if __name__ == '__main__':
+  unittest.main()
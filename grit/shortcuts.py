@@ -34,12 +34,12 @@ class ShortcutGroup(object):
         return
 
     self.cliques.append(c)
-    for (lang, msg) in c.clique.items():
+    for lang in c.clique:
       if lang not in self.keys_by_lang:
         self.keys_by_lang[lang] = {}
       keymap = self.keys_by_lang[lang]
 
-      content = msg.GetRealContent()
+      content = c.RealContentForLanguage(lang)
       keys = [groups[1] for groups in self.SHORTCUT_RE.findall(content)]
       for key in keys:
         key = key.upper()
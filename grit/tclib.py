@@ -27,17 +27,29 @@ def Identity(i):
 
 class BaseMessage(object):
   '''Base class with methods shared by Message and Translation.
+
+  There is one of these per message per language, so instances use slots
+  rather than a dictionary, and keep their placeholders in a tuple that is
+  shared with the message they were created from where possible.
   '''
 
-  def __init__(self, text='', placeholders=[], description='', meaning=''):
+  __slots__ = ('parts', 'placeholders', 'placeholder_index', 'meaning',
+               'dirty', 'id', 'description')
+
+  def __init__(self, text='', placeholders=[], description='', meaning='',
+               parts=None):
     self.parts = []
-    self.placeholders = []
+    self.placeholders = ()
+    # Maps placeholder presentations to placeholders.  Built on first use.
+    self.placeholder_index = None
     self.meaning = meaning
     self.dirty = True  # True if self.id is (or might be) wrong
     self.id = 0
     self.SetDescription(description)
 
-    if text != '':
+    if parts is not None:
+      self._SetParts(parts, placeholders)
+    elif text != '':
       if not placeholders or placeholders == []:
         self.AppendText(text)
       else:
@@ -54,15 +66,53 @@ class BaseMessage(object):
         tags.sort(cmp=lambda x,y: len(x) - len(y) or cmp(x, y), reverse=True)
         tag_re = '(' + '|'.join(tags) + ')'
         chunked_text = re.split(tag_re, text)
+        parts = []
         for chunk in chunked_text:
           if chunk: # ignore empty chunk
             if tag_map.has_key(chunk):
-              self.AppendPlaceholder(tag_map[chunk][0])
+              parts.append(tag_map[chunk][0])
               tag_map[chunk][1] += 1 # increase placeholder use count
             else:
-              self.AppendText(chunk)
+              parts.append(chunk)
         for key in tag_map.keys():
           assert tag_map[key][1] != 0
+        self._SetParts(parts, placeholders)
+
+  def _SetParts(self, parts, placeholders):
+    '''Makes |parts| the content of this message, collecting its placeholders
+    in order of first use.
+
+    Args:
+      parts: ['Hello ', tclib.Placeholder('USERNAME', '%s', 'Joi'), '!']
+      placeholders: placeholders to share, see _SharePlaceholders()
+    '''
+    found = {}
+    ordered = []
+    for part in parts:
+      if isinstance(part, Placeholder):
+        other = found.get(part.presentation)
+        if other is None:
+          found[part.presentation] = part
+          ordered.append(part)
+        else:
+          assert other.original == part.original
+      else:
+        assert isinstance(part, types.StringTypes)
+        assert part != ''
+    self.parts = list(parts)
+    self.placeholders = tuple(ordered)
+    self.placeholder_index = None
+    self._SharePlaceholders(placeholders)
+
+  def _SharePlaceholders(self, placeholders):
+    '''Makes this message use the tuple |placeholders| (typically those of
+    the message it translates) instead of its own copy, if the two hold the
+    same placeholders in the same order.'''
+    if (isinstance(placeholders, tuple) and
+        len(placeholders) == len(self.placeholders) and
+        all(mine is theirs
+            for mine, theirs in zip(self.placeholders, placeholders))):
+      self.placeholders = placeholders
 
   def GetRealContent(self, escaping_function=Identity):
     '''Returns the original content, i.e. what your application and users
@@ -89,14 +139,13 @@ class BaseMessage(object):
 
   def AppendPlaceholder(self, placeholder):
     assert isinstance(placeholder, Placeholder)
-    dup = False
-    for other in self.GetPlaceholders():
-      if other.presentation == placeholder.presentation:
-        assert other.original == placeholder.original
-        dup = True
-
-    if not dup:
-      self.placeholders.append(placeholder)
+    index = self.GetPlaceholderIndex()
+    other = index.get(placeholder.presentation)
+    if other is None:
+      index[placeholder.presentation] = placeholder
+      self.placeholders += (placeholder,)
+    else:
+      assert other.original == placeholder.original
     self.parts.append(placeholder)
     self.dirty = True
 
@@ -119,7 +168,9 @@ class BaseMessage(object):
     return self.description
 
   def SetDescription(self, description):
-    self.description = _FOLD_WHITESPACE.sub(' ', description)
+    if description:
+      description = _FOLD_WHITESPACE.sub(' ', description)
+    self.description = description
 
   def GetMeaning(self):
     return self.meaning
@@ -137,8 +188,22 @@ class BaseMessage(object):
       self.GetPresentableContent().encode('utf-8'), self.meaning)
 
   def GetPlaceholders(self):
+    return list(self.placeholders)
+
+  def GetSharedPlaceholders(self):
+    '''Returns the tuple of this message's placeholders, which translations
+    created with it as their |placeholders| share instead of keeping a copy.
+    '''
     return self.placeholders
 
+  def GetPlaceholderIndex(self):
+    '''Returns a dictionary mapping the presentation of each of this
+    message's placeholders to the placeholder.  Do not modify it.'''
+    if self.placeholder_index is None:
+      self.placeholder_index = dict((ph.presentation, ph)
+                                    for ph in self.placeholders)
+    return self.placeholder_index
+
   def FillTclibBaseMessage(self, msg):
     msg.SetDescription(self.description.encode('utf-8'))
 
@@ -156,6 +221,8 @@ class BaseMessage(object):
 class Message(BaseMessage):
   '''A message.'''
 
+  __slots__ = ('assigned_id',)
+
   def __init__(self, text='', placeholders=[], description='', meaning='',
                assigned_id=None):
     super(Message, self).__init__(text, placeholders, description, meaning)
@@ -179,10 +246,18 @@ class Message(BaseMessage):
 
 
 class Translation(BaseMessage):
-  '''A translation.'''
+  '''A translation.
 
-  def __init__(self, text='', id='', placeholders=[], description='', meaning=''):
-    super(Translation, self).__init__(text, placeholders, description, meaning)
+  Pass |parts|, a list of strings and Placeholder objects, instead of |text|
+  to build a translation from content that is already split up.
+  '''
+
+  __slots__ = ()
+
+  def __init__(self, text='', id='', placeholders=[], description='',
+               meaning='', parts=None):
+    super(Translation, self).__init__(text, placeholders, description, meaning,
+                                      parts)
     self.id = id
 
   def GetId(self):
@@ -203,6 +278,8 @@ class Placeholder(grit.extern.tclib.Placeholder):
   '''Modifies constructor to accept a Unicode string
   '''
 
+  __slots__ = ('presentation', 'original', 'example')
+
   # Must match placeholder presentation names
   _NAME_RE = lazy_re.compile('^[A-Za-z0-9_]+$')
 
@@ -175,5 +175,37 @@ class TclibUnittest(unittest.TestCase):
       self.fail('tclib.Message() should handle placeholders that are '
                 'substrings of each other')
 
+  def testTranslationSharesPlaceholders(self):
+    phs = [tclib.Placeholder('USERNAME', '%s', 'Joi')]
+    msg = tclib.Message(text='Hello USERNAME', placeholders=phs)
+    transl = tclib.Translation(text='Bonjour USERNAME',
+                               placeholders=msg.GetSharedPlaceholders())
+    self.failUnless(
+        transl.GetSharedPlaceholders() is msg.GetSharedPlaceholders())
+    self.failUnlessEqual(phs, transl.GetPlaceholders())
+    self.failUnlessEqual('Bonjour %s', transl.GetRealContent())
+    # A list is never shared, since its owner could still change it.
+    transl = tclib.Translation(text='Hola USERNAME', placeholders=phs)
+    self.failIf(transl.GetSharedPlaceholders() is phs)
+    self.failUnlessEqual(phs, transl.GetPlaceholders())
+    self.failIf(hasattr(msg, '__dict__'))
+    self.failIf(hasattr(transl, '__dict__'))
+    self.failIf(hasattr(phs[0], '__dict__'))
+
+  def testTranslationFromParts(self):
+    user = tclib.Placeholder('USERNAME', '%s', 'Joi')
+    count = tclib.Placeholder('COUNT', '%d', '3')
+    transl = tclib.Translation(parts=[count, ' for ', user, ' and ', user])
+    self.failUnlessEqual('COUNT for USERNAME and USERNAME',
+                         transl.GetPresentableContent())
+    self.failUnlessEqual('%d for %s and %s', transl.GetRealContent())
+    self.failUnlessEqual([count, user], transl.GetPlaceholders())
+    self.failUnlessEqual({'USERNAME': user, 'COUNT': count},
+                         transl.GetPlaceholderIndex())
+    self.failUnlessEqual(
+        tclib.Translation(text='COUNT for USERNAME and USERNAME',
+                          placeholders=[user, count]).GetId(),
+        transl.GetId())
+
 if __name__ == '__main__':
   unittest.main()
@@ -24,9 +24,12 @@ class TestSuiteAll(unittest.TestSuite):
     # Imports placed here to prevent circular imports.
     # pylint: disable-msg=C6204
     import grit.clique_unittest
+    import grit.gengo_reader_unittest
     import grit.grd_reader_unittest
     import grit.grit_runner_unittest
     import grit.lazy_re_unittest
+    import grit.literal_reader_unittest
+    import grit.po_reader_unittest
     import grit.shortcuts_unittests
     import grit.tclib_unittest
     import grit.util_unittest
@@ -35,12 +38,15 @@ class TestSuiteAll(unittest.TestSuite):
     import grit.format.c_format_unittest
     import grit.format.chrome_messages_json_unittest
     import grit.format.data_pack_unittest
+    import grit.format.escaping_unittest
+    import grit.format.gzip_string_unittest
     import grit.format.html_inline_unittest
     import grit.format.js_map_format_unittest
     import grit.format.rc_header_unittest
     import grit.format.rc_unittest
     import grit.format.resource_map_unittest
     import grit.format.policy_templates.policy_template_generator_unittest
+    import grit.format.policy_templates.template_formatter_unittest
     import grit.format.policy_templates.writers.adm_writer_unittest
     import grit.format.policy_templates.writers.adml_writer_unittest
     import grit.format.policy_templates.writers.admx_writer_unittest
@@ -52,6 +58,7 @@ class TestSuiteAll(unittest.TestSuite):
     import grit.format.policy_templates.writers.plist_writer_unittest
     import grit.format.policy_templates.writers.reg_writer_unittest
     import grit.format.policy_templates.writers.template_writer_unittest
+    import grit.format.policy_templates.writers.xml_formatted_writer_unittest
     import grit.format.policy_templates.writers.xml_writer_base_unittest
     import grit.gather.admin_template_unittest
     import grit.gather.chrome_html_unittest
@@ -71,19 +78,26 @@ class TestSuiteAll(unittest.TestSuite):
     import grit.node.structure_unittest #
     import grit.node.custom.filename_unittest
     import grit.tool.android2grd_unittest
+    import grit.tool.batch_unittest
+    import grit.tool.bench_unittest
     import grit.tool.build_unittest
     import grit.tool.buildinfo_unittest
+    import grit.tool.pack_unittest
     import grit.tool.postprocess_unittest
     import grit.tool.preprocess_unittest
     import grit.tool.rc2grd_unittest
+    import grit.tool.serve_unittest
     import grit.tool.transl2tc_unittest
     import grit.tool.xmb_unittest
 
     test_classes = [
         grit.clique_unittest.MessageCliqueUnittest,
+        grit.gengo_reader_unittest.GengoReaderUnittest,
         grit.grd_reader_unittest.GrdReaderUnittest,
         grit.grit_runner_unittest.OptionArgsUnittest,
         grit.lazy_re_unittest.LazyReUnittest,
+        grit.literal_reader_unittest.LiteralReaderUnittest,
+        grit.po_reader_unittest.PoReaderUnittest,
         grit.shortcuts_unittests.ShortcutsUnittest,
         grit.tclib_unittest.TclibUnittest,
         grit.util_unittest.UtilUnittest,
@@ -93,6 +107,8 @@ class TestSuiteAll(unittest.TestSuite):
         grit.format.chrome_messages_json_unittest.
             ChromeMessagesJsonFormatUnittest,
         grit.format.data_pack_unittest.FormatDataPackUnittest,
+        grit.format.escaping_unittest.EscapingUnittest,
+        grit.format.gzip_string_unittest.FormatGzipStringUnittest,
         grit.format.html_inline_unittest.HtmlInlineUnittest,
         grit.format.js_map_format_unittest.JsMapFormatUnittest,
         grit.format.rc_header_unittest.RcHeaderFormatterUnittest,
@@ -100,6 +116,8 @@ class TestSuiteAll(unittest.TestSuite):
         grit.format.resource_map_unittest.FormatResourceMapUnittest,
         grit.format.policy_templates.policy_template_generator_unittest.
             PolicyTemplateGeneratorUnittest,
+        grit.format.policy_templates.template_formatter_unittest.
+            TemplateFormatterUnittest,
         grit.format.policy_templates.writers.adm_writer_unittest.
             AdmWriterUnittest,
         grit.format.policy_templates.writers.adml_writer_unittest.
@@ -122,6 +140,8 @@ class TestSuiteAll(unittest.TestSuite):
             RegWriterUnittest,
         grit.format.policy_templates.writers.template_writer_unittest.
             TemplateWriterUnittests,
+        grit.format.policy_templates.writers.xml_formatted_writer_unittest.
+            XmlFormattedWriterUnittest,
         grit.format.policy_templates.writers.xml_writer_base_unittest.
             XmlWriterBaseTest,
         grit.gather.admin_template_unittest.AdmGathererUnittest,
@@ -145,11 +165,15 @@ class TestSuiteAll(unittest.TestSuite):
         grit.node.structure_unittest.StructureUnittest,
         grit.node.custom.filename_unittest.WindowsFilenameUnittest,
         grit.tool.android2grd_unittest.Android2GrdUnittest,
+        grit.tool.batch_unittest.BatchUnittest,
+        grit.tool.bench_unittest.BenchUnittest,
         grit.tool.build_unittest.BuildUnittest,
         grit.tool.buildinfo_unittest.BuildInfoUnittest,
+        grit.tool.pack_unittest.PackUnittest,
         grit.tool.postprocess_unittest.PostProcessingUnittest,
         grit.tool.preprocess_unittest.PreProcessingUnittest,
         grit.tool.rc2grd_unittest.Rc2GrdUnittest,
+        grit.tool.serve_unittest.ServeUnittest,
         grit.tool.transl2tc_unittest.TranslationToTcUnittest,
         grit.tool.xmb_unittest.XmbUnittest,
         # add test classes here, in alphabetical order...
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''The 'grit batch' tool, which builds many .grd files in one process.
+'''
+
+import getopt
+import json
+import os
+
+from grit import util
+from grit.node import io
+from grit.tool import interface
+
+
+def ReadManifest(filename):
+  '''Reads a batch manifest, a JSON list of objects each naming a .grd file
+  ('input') and the 'grit build' arguments to build it with ('args').
+
+  Args:
+    filename: 'grd_manifest.json'
+
+  Return:
+    [('app.grd', ['-o', 'out/app', '-D', 'foo']), ...]
+  '''
+  entries = []
+  for entry in json.loads(util.ReadFile(filename, 'utf-8')):
+    entries.append((entry['input'].encode('utf-8'),
+                    [arg.encode('utf-8') for arg in entry.get('args', [])]))
+  return entries
+
+
+def _EnableSharedCaches():
+  '''Makes .grd files built in this process share file reads and parsed
+  translation files.  The first ids file is always shared.
+  '''
+  util.EnableReadFileCache()
+  io.FileNode.parsed_translations_cache = {}
+
+
+def _BuildEntry(entry, verbose=False, extra_verbose=False):
+  '''Builds a single manifest entry and returns its exit status.'''
+  from grit import grit_runner
+  from grit.tool import build
+  input, args = entry
+  opts = grit_runner.Options()
+  opts.input = input
+  opts.verbose = verbose
+  opts.extra_verbose = extra_verbose
+  # '-E' settings only apply to the .grd file they were given for.
+  old_environ = dict(os.environ)
+  try:
+    return build.RcBuilder().Run(opts, args) or 0
+  except SystemExit, e:
+    return e.code or 0
+  finally:
+    os.environ.clear()
+    os.environ.update(old_environ)
+
+
+def _PoolWorkerInit():
+  _EnableSharedCaches()
+
+
+def _PoolBuildEntry(job):
+  entry, verbose, extra_verbose = job
+  return _BuildEntry(entry, verbose, extra_verbose)
+
+
+class BatchBuilder(interface.Tool):
+  '''Builds several .grd files in a single process, sharing the first ids
+file, translation files and other file reads between them.
+
+Usage: grit batch [-j JOBS] MANIFEST
+
+MANIFEST is a JSON file containing a list of objects, one per .grd file, e.g.
+
+  [{"input": "app.grd", "args": ["-o", "out/app", "-D", "foo"]},
+   {"input": "ui.grd", "args": ["-o", "out/ui"]}]
+
+where "args" are the arguments 'grit build' would be given for that file.
+Paths are relative to the current directory.
+
+Options:
+
+  -j JOBS           Spread the .grd files over JOBS worker processes, each of
+                    which shares caches between the files it builds.  Defaults
+                    to 1, building everything in this process.
+'''
+
+  def ShortDescription(self):
+    return 'Builds several .grd files in one process.'
+
+  def Run(self, opts, args):
+    self.SetOptions(opts)
+    jobs = 1
+    (own_opts, args) = getopt.getopt(args, 'j:')
+    for (key, val) in own_opts:
+      if key == '-j':
+        jobs = int(val)
+    if len(args) != 1:
+      print 'Usage: grit batch [-j JOBS] MANIFEST'
+      return 2
+
+    entries = ReadManifest(args[0])
+    jobs = min(jobs, len(entries))
+    if jobs > 1:
+      import multiprocessing
+      pool = multiprocessing.Pool(jobs, _PoolWorkerInit)
+      try:
+        statuses = pool.map(
+            _PoolBuildEntry,
+            [(entry, opts.verbose, opts.extra_verbose) for entry in entries],
+            chunksize=1)
+      finally:
+        pool.close()
+        pool.join()
+    else:
+      _EnableSharedCaches()
+      try:
+        statuses = [_BuildEntry(entry, opts.verbose, opts.extra_verbose)
+                    for entry in entries]
+      finally:
+        util.EnableReadFileCache(False)
+        io.FileNode.parsed_translations_cache = None
+
+    failed = [entry[0] for entry, status in zip(entries, statuses) if status]
+    for input in failed:
+      print 'Building %s failed.' % input
+    return 2 if failed else 0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for the 'grit batch' tool.'''
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+
+from grit import grit_runner
+from grit import util
+from grit.node import io
+from grit.tool import batch
+
+
+class BatchUnittest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _WriteManifest(self, entries):
+    manifest = os.path.join(self.tmp_dir, 'manifest.json')
+    with open(manifest, 'w') as f:
+      json.dump(entries, f)
+    return manifest
+
+  def _OutputDir(self, name):
+    return os.path.join(self.tmp_dir, name)
+
+  def testReadManifest(self):
+    manifest = self._WriteManifest([
+        {'input': 'a.grd', 'args': ['-o', 'out', '-D', 'foo']},
+        {'input': 'b.grd'}])
+    self.failUnlessEqual([('a.grd', ['-o', 'out', '-D', 'foo']),
+                          ('b.grd', [])],
+                         batch.ReadManifest(manifest))
+
+  def testBuildsAllEntries(self):
+    substitute = util.PathFromRoot('grit/testdata/substitute.grd')
+    no_ids = util.PathFromRoot('grit/testdata/substitute_no_ids.grd')
+    manifest = self._WriteManifest([
+        {'input': substitute, 'args': ['-o', self._OutputDir('a')]},
+        {'input': substitute, 'args': ['-o', self._OutputDir('b')]},
+        {'input': no_ids,
+         'args': ['-o', self._OutputDir('c'),
+                  '-f', util.PathFromRoot('grit/testdata/resource_ids')]}])
+    opts = grit_runner.Options()
+    self.failUnlessEqual(0, batch.BatchBuilder().Run(opts, [manifest]))
+    for name in ('a', 'b', 'c'):
+      self.failUnless(os.path.isfile(
+          os.path.join(self._OutputDir(name), 'resource.h')))
+    # Caches only live for the duration of the batch.
+    self.failUnless(io.FileNode.parsed_translations_cache is None)
+
+  def testSharedTranslations(self):
+    substitute = util.PathFromRoot('grit/testdata/substitute.grd')
+    batch._EnableSharedCaches()
+    try:
+      for name in ('a', 'b'):
+        self.failUnlessEqual(0, batch._BuildEntry(
+            (substitute, ['-o', self._OutputDir(name)])))
+      self.failUnlessEqual(1, len(io.FileNode.parsed_translations_cache))
+    finally:
+      util.EnableReadFileCache(False)
+      io.FileNode.parsed_translations_cache = None
+    with open(os.path.join(self._OutputDir('a'),
+                           'sv_generated_resources.rc')) as a:
+      with open(os.path.join(self._OutputDir('b'),
+                             'sv_generated_resources.rc')) as b:
+        self.failUnlessEqual(a.read(), b.read())
+
+  def testParallelBuild(self):
+    substitute = util.PathFromRoot('grit/testdata/substitute.grd')
+    manifest = self._WriteManifest([
+        {'input': substitute, 'args': ['-o', self._OutputDir(name)]}
+        for name in ('a', 'b', 'c')])
+    opts = grit_runner.Options()
+    self.failUnlessEqual(0, batch.BatchBuilder().Run(opts,
+                                                     ['-j', '2', manifest]))
+    for name in ('a', 'b', 'c'):
+      self.failUnless(os.path.isfile(
+          os.path.join(self._OutputDir(name), 'resource.h')))
+
+
+if __name__ == '__main__':
+  unittest.main()
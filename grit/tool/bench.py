@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''The 'grit bench' tool, which times GRIT's hot paths on synthetic inputs.
+'''
+
+import getopt
+import glob
+import hashlib
+import StringIO
+import sys
+import time
+import types
+
+from grit import util
+from grit.tool import interface
+
+
+# How many times larger than the base input each successive run of a scaling
+# benchmark is.
+_SCALES = (1, 2, 4, 8, 16)
+
+
+def BestTime(func, repeat):
+  '''Returns the shortest of |repeat| wall-clock timings of calling |func|.'''
+  best = None
+  for _ in range(repeat):
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    if best is None or elapsed < best:
+      best = elapsed
+  return best
+
+
+def _DefaultHtmlFiles():
+  return sorted(glob.glob(util.PathFromRoot('grit/testdata/*.html')))
+
+
+def DeepSize(root):
+  '''Returns the number of bytes taken by |root| and every object reachable
+  from it through containers, instance dictionaries and slots.  Classes,
+  modules and functions are not counted, and shared objects are counted once.
+  '''
+  seen = set()
+  size = 0
+  pending = [root]
+  while pending:
+    obj = pending.pop()
+    if id(obj) in seen or isinstance(obj, (type, types.ClassType,
+                                           types.ModuleType,
+                                           types.FunctionType,
+                                           types.BuiltinFunctionType)):
+      continue
+    seen.add(id(obj))
+    size += sys.getsizeof(obj)
+    if isinstance(obj, dict):
+      pending.extend(obj.iterkeys())
+      pending.extend(obj.itervalues())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+      pending.extend(obj)
+    else:
+      if hasattr(obj, '__dict__'):
+        pending.append(obj.__dict__)
+      for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get('__slots__', ()):
+          if hasattr(obj, slot):
+            pending.append(getattr(obj, slot))
+  return size
+
+
+class BenchmarkTool(interface.Tool):
+  '''Times some of GRIT's most expensive operations, so that changes to them
+can be measured.  Scaling benchmarks run on inputs of growing size and print
+the time taken per kilobyte of input; a constant figure means linear scaling.
+A digest of the output is printed too, so that runs of different versions of
+GRIT can be checked to produce identical results.
+
+Usage: grit bench [-r REPEAT] BENCHMARK [ARGS...]
+
+Benchmarks:
+
+  tr_html     Splits HTML FILEs (by default the .html files in grit/testdata),
+              concatenated into ever larger documents, into chunks.  Usage:
+              grit bench tr_html [FILE...]
+
+  messages    Builds cliques for COUNT messages (default 2000), half of them
+              with placeholders, with translations into LANGS languages
+              (default 20), and prints the memory they take.  Usage:
+              grit bench messages [COUNT [LANGS]]
+
+  xtb         Times building COUNT messages (default 2000), most of them with
+              placeholders, and then loading their translations from XTB
+              files for LANGS languages (default 5).  Also times parsing
+              the XTB files with the SAX and the pyexpat parser.  Usage:
+              grit bench xtb [COUNT [LANGS]]
+
+  output      Formats COUNT messages (default 5000) as .rc, Android, C,
+              JavaScript and Chrome extension JSON output, and prints the
+              throughput of writing the formatted text with a codecs stream
+              and with a buffered encoding stream, in the encoding each
+              output is built with.  Usage:
+              grit bench output [COUNT]
+
+Options:
+
+  -r REPEAT         Times each run REPEAT times and reports the fastest.
+                    Defaults to 3.
+'''
+
+  def __init__(self):
+    super(BenchmarkTool, self).__init__()
+    self.repeat = 3
+
+  def ShortDescription(self):
+    return 'Times GRIT\'s hot paths on growing inputs.'
+
+  def Run(self, opts, args):
+    self.SetOptions(opts)
+    benchmarks = {
+      'messages': self.BenchMessages,
+      'output': self.BenchOutput,
+      'tr_html': self.BenchTrHtml,
+      'xtb': self.BenchXtb,
+    }
+    (own_opts, args) = getopt.getopt(args, 'r:')
+    for (key, val) in own_opts:
+      if key == '-r':
+        self.repeat = int(val)
+    if not args or args[0] not in benchmarks:
+      print 'Usage: grit bench [-r REPEAT] %s [ARGS...]' % '|'.join(
+          sorted(benchmarks))
+      return 2
+    return benchmarks[args[0]](args[1:])
+
+  def ReportScaling(self, func, inputs):
+    '''Times |func| on each of |inputs| and prints one line per input.
+
+    Args:
+      func: Function taking one input and returning its output as a string.
+      inputs: [(size_in_bytes, input), ...]
+    '''
+    self.Out('%10s %10s %10s  %s\n' % ('KB', 'ms', 'us/KB', 'digest'))
+    for size, input in inputs:
+      elapsed = BestTime(lambda: func(input), self.repeat)
+      digest = hashlib.md5(func(input)).hexdigest()
+      kilobytes = size / 1024.0
+      self.Out('%10.1f %10.2f %10.2f  %s\n' % (
+          kilobytes, elapsed * 1000, elapsed * 1e6 / kilobytes, digest))
+
+  def BenchTrHtml(self, args):
+    from grit.gather import tr_html
+    files = args or _DefaultHtmlFiles()
+    base = ''.join(util.ReadFile(f, util.RAW_TEXT) for f in files)
+
+    def Chunk(text):
+      chunks = tr_html.HtmlChunks().Parse(text, False)
+      return repr(chunks)
+
+    self.ReportScaling(Chunk, [(len(base) * scale, base * scale)
+                               for scale in _SCALES])
+    return 0
+
+  def BenchMessages(self, args):
+    from grit import clique
+    from grit import tclib
+    count = int(args[0]) if args else 2000
+    langs = ['lang%d' % i for i in range(int(args[1]) if len(args) > 1
+                                         else 20)]
+
+    def Build():
+      uberclique = clique.UberClique()
+      for i in range(count):
+        if i % 2:
+          placeholders = [tclib.Placeholder('USER', '%s', 'Joi'),
+                          tclib.Placeholder('COUNT', '%d', '3')]
+          text = 'Message %d for USER has COUNT items' % i
+        else:
+          placeholders = []
+          text = 'Message %d without placeholders' % i
+        c = uberclique.MakeClique(tclib.Message(text=text,
+                                                placeholders=placeholders))
+        for lang in langs:
+          c.AddTranslation(tclib.Translation(
+              text='%s %s' % (lang, text), id=c.GetId(),
+              placeholders=c.GetMessage().GetSharedPlaceholders()), lang)
+      return uberclique
+
+    elapsed = BestTime(Build, self.repeat)
+    size = DeepSize(Build())
+    messages = count * (len(langs) + 1)
+    self.Out('%d messages in %.2f ms, %d bytes (%.1f bytes per message)\n' % (
+        messages, elapsed * 1000, size, float(size) / messages))
+    return 0
+
+  def BenchXtb(self, args):
+    from grit import clique
+    from grit import tclib
+    from grit import xtb_reader
+    count = int(args[0]) if args else 2000
+    langs = ['lang%d' % i for i in range(int(args[1]) if len(args) > 1
+                                         else 5)]
+    names = ['USER', 'COUNT', 'FILE', 'LINK_START', 'LINK_END']
+
+    def Placeholders(i):
+      return [tclib.Placeholder(name, '$%d' % (n + 1), name.lower())
+              for n, name in enumerate(names[:i % (len(names) + 1)])]
+
+    def Text(i):
+      return 'Message %d ' % i + ' and '.join(
+          ph.GetPresentation() for ph in Placeholders(i))
+
+    def Build():
+      uberclique = clique.UberClique()
+      for i in range(count):
+        uberclique.MakeClique(tclib.Message(text=Text(i),
+                                            placeholders=Placeholders(i)))
+      return uberclique
+
+    xtbs = []
+    for lang in langs:
+      lines = ['<?xml version="1.0" ?>',
+               '<translationbundle lang="%s">' % lang]
+      for i in range(count):
+        message = tclib.Message(text=Text(i), placeholders=Placeholders(i))
+        content = ' '.join(
+            '<ph name="%s"/>' % part.GetPresentation()
+            if isinstance(part, tclib.Placeholder) else part
+            for part in reversed(message.GetContent()))
+        lines.append('<translation id="%s">%s %s</translation>' % (
+            message.GetId(), lang, content))
+      lines.append('</translationbundle>')
+      xtbs.append('\n'.join(lines))
+
+    def Load():
+      uberclique = Build()
+      for lang, xtb in zip(langs, xtbs):
+        xtb_reader.Parse(StringIO.StringIO(xtb),
+                         uberclique.GenerateXtbParserCallback(lang), fast=True)
+
+    def Parse(fast):
+      for xtb in xtbs:
+        xtb_reader.Parse(StringIO.StringIO(xtb), lambda id, parts: None,
+                         fast=fast)
+
+    build_time = BestTime(Build, self.repeat)
+    load_time = BestTime(Load, self.repeat)
+    self.Out('%d messages built in %.2f ms, %d translations loaded in '
+             '%.2f ms\n' % (count, build_time * 1000, count * len(langs),
+                            (load_time - build_time) * 1000))
+    self.Out('XTB files parsed in %.2f ms with SAX, %.2f ms with pyexpat\n' % (
+        BestTime(lambda: Parse(False), self.repeat) * 1000,
+        BestTime(lambda: Parse(True), self.repeat) * 1000))
+    return 0
+
+  def BenchOutput(self, args):
+    from grit.tool import build
+    count = int(args[0]) if args else 5000
+    messages = []
+    for i in range(count):
+      if i % 2:
+        messages.append(
+            u'<message name="IDS_MESSAGE_%d" desc="Message %d">Message %d for '
+            u'<ph name="USER">%%s<ex>Joi</ex></ph>, \u00e9t\u00e9 '
+            u'"quoted"</message>' % (i, i, i))
+      else:
+        messages.append(
+            u'<message name="IDS_MESSAGE_%d" desc="Message %d">Message %d '
+            u'without placeholders</message>' % (i, i, i))
+    root = util.ParseGrdForUnittest(
+        u'<messages>%s</messages>' % u''.join(messages))
+    root.SetOutputLanguage('en')
+    root.RunGatherers()
+
+    self.Out('%-20s %10s %10s %14s %14s  %s\n' % (
+        'output', 'KB', 'format ms', 'codecs MB/s', 'buffered MB/s',
+        'digest'))
+    for type in ('rc_all', 'android', 'c_format', 'js_map_format',
+                 'chrome_messages_json'):
+      encoding = build.GetOutputEncoding(type)
+      formatter = build.GetFormatter(type)
+      format_time = BestTime(lambda: list(formatter(root, 'en', '.')),
+                             self.repeat)
+      fragments = list(formatter(root, 'en', '.'))
+
+      def Write(wrap):
+        buf = StringIO.StringIO()
+        buf.close = lambda: None  # Keep the data when the stream is closed.
+        with wrap(buf, encoding) as outfile:
+          for fragment in fragments:
+            outfile.write(fragment)
+        return buf.getvalue()
+
+      data = Write(util.WrapOutputStream)
+      assert data == Write(util.BufferedEncodingStream)
+      megabytes = len(data) / 1048576.0
+      self.Out('%-20s %10.1f %10.2f %14.2f %14.2f  %s\n' % (
+          type, len(data) / 1024.0, format_time * 1000,
+          megabytes / BestTime(lambda: Write(util.WrapOutputStream),
+                               self.repeat),
+          megabytes / BestTime(lambda: Write(util.BufferedEncodingStream),
+                               self.repeat),
+          hashlib.md5(data).hexdigest()))
+    return 0
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for the 'grit bench' tool.'''
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+import StringIO
+
+from grit import util
+from grit.tool import bench
+
+
+class DummyOpts(object):
+  def __init__(self):
+    self.output_stream = StringIO.StringIO()
+    self.verbose = False
+    self.extra_verbose = False
+
+
+class BenchUnittest(unittest.TestCase):
+
+  def _Run(self, args):
+    opts = DummyOpts()
+    status = bench.BenchmarkTool().Run(opts, args)
+    return status, opts.output_stream.getvalue()
+
+  def testTrHtml(self):
+    status, output = self._Run(
+        ['-r', '1', 'tr_html',
+         util.PathFromRoot('grit/testdata/chrome_html.html')])
+    self.failUnlessEqual(0, status)
+    lines = output.splitlines()
+    self.failUnlessEqual(1 + len(bench._SCALES), len(lines))
+    self.failUnless(lines[0].split() == ['KB', 'ms', 'us/KB', 'digest'])
+
+  def testMessages(self):
+    status, output = self._Run(['-r', '1', 'messages', '10', '2'])
+    self.failUnlessEqual(0, status)
+    self.failUnless(output.startswith('30 messages in '))
+
+  def testXtb(self):
+    status, output = self._Run(['-r', '1', 'xtb', '12', '2'])
+    self.failUnlessEqual(0, status)
+    self.failUnless(output.startswith('12 messages built in '))
+    self.failUnless('24 translations loaded in ' in output)
+
+  def testOutput(self):
+    status, output = self._Run(['-r', '1', 'output', '20'])
+    self.failUnlessEqual(0, status)
+    lines = output.splitlines()
+    self.failUnlessEqual(6, len(lines))
+    self.failUnlessEqual(['rc_all', 'android', 'c_format', 'js_map_format',
+                          'chrome_messages_json'],
+                         [line.split()[0] for line in lines[1:]])
+
+  def testDeepSize(self):
+    shared = ['x' * 100]
+    pair = [shared, shared]
+    self.failUnlessEqual(sys.getsizeof(pair) + bench.DeepSize(shared),
+                         bench.DeepSize(pair))
+
+  def testUnknownBenchmark(self):
+    status, output = self._Run(['nosuchbenchmark'])
+    self.failUnlessEqual(2, status)
+
+  def testBestTime(self):
+    calls = []
+    elapsed = bench.BestTime(lambda: calls.append(1), 4)
+    self.failUnlessEqual(4, len(calls))
+    self.failUnless(elapsed >= 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -8,11 +8,11 @@ SCons build system.
 '''
 
 import codecs
-import filecmp
 import getopt
 import os
-import shutil
 import sys
+import time
+from functools import partial
 
 from grit import grd_reader
 from grit import util
@@ -37,10 +37,16 @@ _format_modules = {
   'resource_map_source':      'resource_map',
   'resource_file_map_source': 'resource_map',
 }
+
+# <output> node types produced by the policy template writers.  They are
+# generated together in a separate stage, see RcBuilder.ProcessPolicyTemplates.
+_policy_template_types = (
+    'adm', 'admx', 'adml', 'reg', 'doc', 'json',
+    'plist', 'plist_strings', 'ios_plist', 'android_policy')
+
 _format_modules.update(
-    (type, 'policy_templates.template_formatter') for type in
-        [ 'adm', 'admx', 'adml', 'reg', 'doc', 'json',
-          'plist', 'plist_strings', 'ios_plist', 'android_policy' ])
+    (type, 'policy_templates.template_formatter')
+    for type in _policy_template_types)
 
 
 def GetFormatter(type):
@@ -53,6 +59,70 @@ def GetFormatter(type):
     return module.GetFormatter(type)
 
 
+def GetOutputEncoding(type):
+  '''Returns the encoding files of the given <output> type are written in.'''
+  # Microsoft's RC compiler can only deal with single-byte or double-byte
+  # files (no UTF-8), so we make all RC files UTF-16 to support all
+  # character sets.
+  if type in ('rc_header', 'resource_map_header',
+      'resource_map_source', 'resource_file_map_source'):
+    return 'cp1252'
+  elif type in ('android', 'c_format', 'js_map_format', 'plist',
+                'plist_strings', 'doc', 'json', 'android_policy'):
+    return 'utf_8'
+  elif type in ('chrome_messages_json'):
+    # Chrome Web Store currently expects BOM for UTF-8 files :-(
+    return 'utf-8-sig'
+  else:
+    # TODO(gfeher) modify here to set utf-8 encoding for admx/adml
+    return 'utf_16'
+
+
+def _RenderPolicyTemplates(job):
+  '''Generates and writes the policy templates of one language from its
+  policy text.  Runs in a worker process when policy templates are built in
+  parallel.
+
+  Args:
+    job: (policy_text, defines, [(type, filename, encoding), ...],
+          write_only_new)
+
+  Return:
+    [(type, filename, seconds taken), ...]
+  '''
+  from grit.format.policy_templates import template_formatter
+  policy_text, defines, outputs, write_only_new = job
+  return _WritePolicyTemplates(
+      partial(template_formatter.RenderTemplates, policy_text, defines),
+      outputs, write_only_new)
+
+
+def _WritePolicyTemplates(render, outputs, write_only_new):
+  '''Writes the policy templates of one language.
+
+  Args:
+    render: Function taking a list of writer types and yielding (type, text,
+      seconds taken) for each, e.g. template_formatter.RenderTemplates.
+    outputs: [(type, filename, encoding), ...]
+    write_only_new: See util.AtomicOutputFile.
+
+  Return:
+    [(type, filename, seconds taken), ...]
+  '''
+  types = sorted(set(type for type, _, _ in outputs))
+  templates = dict(
+      (type, (text, seconds)) for type, text, seconds in render(types))
+  timings = []
+  for type, filename, encoding in outputs:
+    text, seconds = templates[type]
+    start = time.time()
+    with util.AtomicOutputFile(filename, write_only_new) as outfile:
+      with util.BufferedEncodingStream(outfile, encoding) as stream:
+        stream.write(text)
+    timings.append((type, filename, seconds + time.time() - start))
+  return timings
+
+
 class RcBuilder(interface.Tool):
   '''A tool that builds RC files and resource header files for compilation.
 
@@ -100,6 +170,10 @@ Options:
                     flag should match what sys.platform would report for your
                     target platform; see grit.node.base.EvaluateCondition.
 
+  -j JOBS           Generate policy templates (adm, admx, json, ...) for
+                    different languages in JOBS worker processes.  Defaults
+                    to 1, generating them in this process.
+
   -h HEADERFORMAT   Custom format string to use for generating rc header files.
                     The string should have two placeholders: {textual_id}
                     and {numeric_id}. E.g. "#define {textual_id} {numeric_id}"
@@ -112,7 +186,7 @@ Options:
 
   --write-only-new flag
                     If flag is non-0, write output files to a temporary file
-                    first, and copy it to the real output only if the new file
+                    first, and move it to the real output only if the new file
                     is different from the old file.  This allows some build
                     systems to realize that dependent build steps might be
                     unnecessary, at the cost of comparing the output data at
@@ -123,6 +197,12 @@ Options:
                     generated will depend on a stampfile instead of the first
                     output in the input .grd file.
 
+  --id-table FILE   Reuse the numeric resource ids stored in FILE if they were
+                    assigned from the same .grd, <part> and first_ids files
+                    and defines, instead of assigning them again.  Otherwise
+                    the ids are assigned and written to FILE for the next
+                    build.
+
 Conditional inclusion of resources only affects the output of files which
 control which resources get linked into a binary, e.g. it affects .rc files
 meant for compilation but it does not affect resource header files (that define
@@ -145,11 +225,13 @@ are exported to translation interchange files (e.g. XMB files), etc.
     output_all_resource_defines = None
     write_only_new = False
     depend_on_stamp = False
-    (own_opts, args) = getopt.getopt(args, 'a:o:D:E:f:w:t:h:',
+    id_table_file = None
+    (own_opts, args) = getopt.getopt(args, 'a:o:D:E:f:w:t:h:j:',
         ('depdir=','depfile=','assert-file-list=',
          'output-all-resource-defines',
          'no-output-all-resource-defines',
          'depend-on-stamp',
+         'id-table=',
          'write-only-new='))
     for (key, val) in own_opts:
       if key == '-a':
@@ -180,6 +262,8 @@ are exported to translation interchange files (e.g. XMB files), etc.
         target_platform = val
       elif key == '-h':
         rc_header_format = val
+      elif key == '-j':
+        self.policy_jobs = int(val)
       elif key == '--depdir':
         depdir = val
       elif key == '--depfile':
@@ -188,6 +272,8 @@ are exported to translation interchange files (e.g. XMB files), etc.
         write_only_new = val != '0'
       elif key == '--depend-on-stamp':
         depend_on_stamp = True
+      elif key == '--id-table':
+        id_table_file = val
 
     if len(args):
       print 'This tool takes no tool-specific arguments.'
@@ -209,25 +295,27 @@ are exported to translation interchange files (e.g. XMB files), etc.
 
     self.write_only_new = write_only_new
 
-    self.res = grd_reader.Parse(opts.input,
-                                debug=opts.extra_verbose,
-                                first_ids_file=first_ids_file,
-                                defines=self.defines,
-                                target_platform=target_platform)
-
-    # If the output_all_resource_defines option is specified, override the value
-    # found in the grd file.
-    if output_all_resource_defines is not None:
-      self.res.SetShouldOutputAllResourceDefines(output_all_resource_defines)
-
-    # Set an output context so that conditionals can use defines during the
-    # gathering stage; we use a dummy language here since we are not outputting
-    # a specific language.
-    self.res.SetOutputLanguage('en')
-    if rc_header_format:
-      self.res.AssignRcHeaderFormat(rc_header_format)
-    self.res.RunGatherers()
-    self.Process()
+    # Structures, skeletons and flattened includes often read the same files
+    # (and the same .rc file once per section), so cache reads for the run.
+    with util.ReadFileCacheScope() as file_cache:
+      self.res = self.LoadResourceTree(opts.input, first_ids_file,
+                                       target_platform,
+                                       output_all_resource_defines,
+                                       rc_header_format,
+                                       debug=opts.extra_verbose)
+      if id_table_file:
+        id_table_signature = self.GetIdTableSignature(
+            opts.input, getattr(opts, 'hash', None))
+        id_table_loaded = self.LoadIdTable(id_table_file, id_table_signature)
+      try:
+        self.Process()
+      finally:
+        # The processed policy data is only shared within this build; a
+        # build server reuses the tree for the next one.
+        self.res.policy_generators.clear()
+      if id_table_file and not id_table_loaded:
+        self.res.GetIdTable().Write(id_table_file, id_table_signature)
+      self.ExtraVerboseOut(file_cache.Stats() + '\n')
 
     if assert_output_files:
       if not self.CheckAssertedOutputFiles(assert_output_files):
@@ -263,6 +351,76 @@ are exported to translation interchange files (e.g. XMB files), etc.
     # Whether to compare outputs to their old contents before writing.
     self.write_only_new = False
 
+    # Number of processes to generate policy templates in.
+    self.policy_jobs = 1
+
+  def LoadResourceTree(self, input, first_ids_file, target_platform,
+                       output_all_resource_defines, rc_header_format,
+                       debug=False):
+    '''Parses the .grd file 'input' and runs its gatherers, returning the
+    resulting resource tree.  Overridden by the build server to reuse trees
+    across builds.
+    '''
+    res = grd_reader.Parse(input,
+                           debug=debug,
+                           first_ids_file=first_ids_file,
+                           defines=self.defines,
+                           target_platform=target_platform)
+
+    # If the output_all_resource_defines option is specified, override the value
+    # found in the grd file.
+    if output_all_resource_defines is not None:
+      res.SetShouldOutputAllResourceDefines(output_all_resource_defines)
+
+    # Set an output context so that conditionals can use defines during the
+    # gathering stage; we use a dummy language here since we are not outputting
+    # a specific language.
+    res.SetOutputLanguage('en')
+    if rc_header_format:
+      res.AssignRcHeaderFormat(rc_header_format)
+    res.RunGatherers()
+    return res
+
+  def GetIdTableSignature(self, input, hash=None):
+    '''Returns a description of everything the resource ids of self.res are
+    assigned from: the .grd file, its <part> files and first_ids file, the
+    defines (which the first_ids file may use) and the fingerprint module.
+
+    Args:
+      input: The .grd file self.res was read from.
+      hash: The fingerprint module given to grit, or None.
+    '''
+    from grit.node import misc
+    files = [input]
+    files.extend(os.path.join(util.dirname(input), node.GetInputPath())
+                 for node in self.res.Preorder()
+                 if isinstance(node, misc.PartNode))
+    first_ids_file = self.res.GetFirstIdsFile()
+    if first_ids_file:
+      files.append(first_ids_file)
+    return {
+      'files': [(os.path.abspath(f), util.FileSignature(f)) for f in files],
+      'defines': sorted(self.defines.items()),
+      'hash': hash,
+    }
+
+  def LoadIdTable(self, filename, signature):
+    '''Makes self.res use the ids stored in |filename| if they were assigned
+    from the inputs described by |signature|, and returns whether it does.
+    '''
+    from grit.format import rc_header
+    if not os.path.exists(filename):
+      return False
+    try:
+      id_table = rc_header.ReadIdTable(filename, signature)
+    except ValueError:
+      return False  # Not a file written by IdTable.Write().
+    if id_table is None:
+      return False
+    self.VerboseOut('Using resource ids from %s\n' % filename)
+    self.res.SetIdTable(id_table)
+    return True
+
   @staticmethod
   def AddWhitelistTags(start_node, whitelist_names):
     # Walk the tree of nodes added attributes for the nodes that shouldn't
@@ -319,70 +477,39 @@ are exported to translation interchange files (e.g. XMB files), etc.
     if self.whitelist_names:
       self.AddWhitelistTags(self.res, self.whitelist_names)
 
+    policy_outputs = []
     for output in self.res.GetOutputFiles():
+      if output.GetType() in _policy_template_types:
+        policy_outputs.append(output)
+        continue
       self.VerboseOut('Creating %s...' % output.GetFilename())
-
-      # Microsoft's RC compiler can only deal with single-byte or double-byte
-      # files (no UTF-8), so we make all RC files UTF-16 to support all
-      # character sets.
-      if output.GetType() in ('rc_header', 'resource_map_header',
-          'resource_map_source', 'resource_file_map_source'):
-        encoding = 'cp1252'
-      elif output.GetType() in ('android', 'c_format', 'js_map_format', 'plist',
-                                'plist_strings', 'doc', 'json', 'android_policy'):
-        encoding = 'utf_8'
-      elif output.GetType() in ('chrome_messages_json'):
-        # Chrome Web Store currently expects BOM for UTF-8 files :-(
-        encoding = 'utf-8-sig'
-      else:
-        # TODO(gfeher) modify here to set utf-8 encoding for admx/adml
-        encoding = 'utf_16'
-
-      # Set the context, for conditional inclusion of resources
-      self.res.SetOutputLanguage(output.GetLanguage())
-      self.res.SetOutputContext(output.GetContext())
-      self.res.SetFallbackToDefaultLayout(output.GetFallbackToDefaultLayout())
-      self.res.SetDefines(self.defines)
+      encoding = GetOutputEncoding(output.GetType())
+      self.SetOutputContext(output)
 
       # Make the output directory if it doesn't exist.
       self.MakeDirectoriesTo(output.GetOutputFilename())
 
-      # Write the results to a temporary file and only overwrite the original
-      # if the file changed.  This avoids unnecessary rebuilds.
-      outfile = self.fo_create(output.GetOutputFilename() + '.tmp', 'wb')
-
-      if output.GetType() != 'data_package':
-        outfile = util.WrapOutputStream(outfile, encoding)
-
-      # Iterate in-order through entire resource tree, calling formatters on
-      # the entry into a node and on exit out of it.
-      with outfile:
-        self.ProcessNode(self.res, output, outfile)
-
-      # Now copy from the temp file back to the real output, but on Windows,
-      # only if the real output doesn't exist or the contents of the file
-      # changed.  This prevents identical headers from being written and .cc
-      # files from recompiling (which is painful on Windows).
-      if not os.path.exists(output.GetOutputFilename()):
-        os.rename(output.GetOutputFilename() + '.tmp',
-                  output.GetOutputFilename())
-      else:
-        # CHROMIUM SPECIFIC CHANGE.
-        # This clashes with gyp + vstudio, which expect the output timestamp
-        # to change on a rebuild, even if nothing has changed, so only do
-        # it when opted in.
-        if not self.write_only_new:
-          write_file = True
+      # Write the results to a temporary file which then replaces the
+      # original.  With --write-only-new, the original is only replaced if
+      # the file changed.  This avoids unnecessary rebuilds.
+      with util.AtomicOutputFile(output.GetOutputFilename(),
+                                 self.write_only_new,
+                                 self.fo_create) as outfile:
+        # Iterate in-order through entire resource tree, calling formatters
+        # on the entry into a node and on exit out of it.
+        if output.GetType() == 'data_package':
+          self.ProcessNode(self.res, output, outfile)
         else:
-          files_match = filecmp.cmp(output.GetOutputFilename(),
-              output.GetOutputFilename() + '.tmp')
-          write_file = not files_match
-        if write_file:
-          shutil.copy2(output.GetOutputFilename() + '.tmp',
-                       output.GetOutputFilename())
-        os.remove(output.GetOutputFilename() + '.tmp')
+          with util.BufferedEncodingStream(outfile, encoding) as stream:
+            self.ProcessNode(self.res, output, stream)
 
-      self.VerboseOut(' done.\n')
+      if outfile.replaced:
+        self.VerboseOut(' done.\n')
+      else:
+        self.VerboseOut(' unchanged.\n')
+
+    if policy_outputs:
+      self.ProcessPolicyTemplates(policy_outputs)
 
     # Print warnings if there are any duplicate shortcuts.
     warnings = shortcuts.GenerateDuplicateShortcutsWarnings(
@@ -402,6 +529,89 @@ are exported to translation interchange files (e.g. XMB files), etc.
       sys.exit(-1)
 
 
+  def SetOutputContext(self, output):
+    '''Sets the language, context and defines of |output| on the resource
+    tree, for conditional inclusion of resources.
+    '''
+    self.res.SetOutputLanguage(output.GetLanguage())
+    self.res.SetOutputContext(output.GetContext())
+    self.res.SetFallbackToDefaultLayout(output.GetFallbackToDefaultLayout())
+    self.res.SetDefines(self.defines)
+
+  def ProcessPolicyTemplates(self, outputs):
+    '''Generates the policy template |outputs|.  Every writer of a language
+    is run at once on policy data processed once for that language.  With
+    more than one of self.policy_jobs, the policy templates metafile is
+    translated into all of its languages at once and the text of each
+    language is sent to a pool of worker processes; otherwise the templates
+    are rendered here, from the resource tree.  Prints how long each output
+    and each type of writer took when verbose.
+
+    Args:
+      outputs: [grit.node.io.OutputNode, ...] of policy template types
+    '''
+    from grit.format.policy_templates import template_formatter
+    languages = []  # [(first output, [(type, filename, encoding), ...])]
+    outputs_by_key = {}
+    for output in outputs:
+      key = (output.GetLanguage(), output.GetContext())
+      if key not in outputs_by_key:
+        outputs_by_key[key] = []
+        languages.append((output, outputs_by_key[key]))
+      self.MakeDirectoriesTo(output.GetOutputFilename())
+      outputs_by_key[key].append((output.GetType(), output.GetOutputFilename(),
+                                  GetOutputEncoding(output.GetType())))
+
+    processes = min(self.policy_jobs, len(languages))
+    if processes > 1:
+      import multiprocessing
+      # Pool workers, e.g. those of 'grit batch', cannot start processes.
+      if multiprocessing.current_process().daemon:
+        processes = 1
+    results = []
+    if processes > 1:
+      items = []  # The metafile structure of each entry of languages.
+      langs_by_item = {}
+      for output, language_outputs in languages:
+        self.SetOutputContext(output)
+        item = template_formatter.GetPolicyTemplateNode(self.res)
+        items.append(item)
+        langs_by_item.setdefault(item, []).append(output.GetLanguage())
+      policy_texts = {}
+      for item, langs in langs_by_item.iteritems():
+        texts = template_formatter.GetPolicyTexts(item, langs)
+        for lang, text in texts.iteritems():
+          policy_texts[(item, lang)] = text
+      jobs = []
+      for item, (output, language_outputs) in zip(items, languages):
+        jobs.append((policy_texts[(item, output.GetLanguage())],
+                     dict(self.defines), language_outputs,
+                     self.write_only_new))
+      pool = multiprocessing.Pool(processes)
+      try:
+        results = pool.map(_RenderPolicyTemplates, jobs, chunksize=1)
+      finally:
+        pool.close()
+        pool.join()
+    else:
+      for output, language_outputs in languages:
+        self.SetOutputContext(output)
+        results.append(_WritePolicyTemplates(
+            partial(template_formatter.RenderTreeTemplates, self.res,
+                    output.GetLanguage()),
+            language_outputs, self.write_only_new))
+
+    totals = {}
+    for timings in results:
+      for type, filename, seconds in timings:
+        self.VerboseOut('Created %s in %.2f ms\n' % (
+            os.path.basename(filename), seconds * 1000))
+        count, total = totals.get(type, (0, 0))
+        totals[type] = (count + 1, total + seconds)
+    for type, (count, total) in sorted(totals.items()):
+      self.VerboseOut('%s writer: %d files in %.2f ms\n' % (
+          type, count, total * 1000))
+
   def CheckAssertedOutputFiles(self, assert_output_files):
     '''Checks that the asserted output files are specified in the given list.
 
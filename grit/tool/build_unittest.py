@@ -16,6 +16,7 @@ if __name__ == '__main__':
 import unittest
 
 from grit import util
+from grit.format import rc_header
 from grit.tool import build
 
 
@@ -301,6 +302,116 @@ class BuildUnittest(unittest.TestCase):
     self.assertTrue(abs(second_mtime - UNCHANGED) > 5)
     self.assertTrue(abs(third_mtime - UNCHANGED) < 5)
 
+  def testIdTableFile(self):
+    output_dir = tempfile.mkdtemp()
+    class DummyOpts(object):
+      def __init__(self):
+        self.input = util.PathFromRoot('grit/testdata/substitute.grd')
+        self.verbose = False
+        self.extra_verbose = False
+    id_table_file = os.path.join(output_dir, 'ids.json')
+    header = os.path.join(output_dir, 'resource.h')
+
+    builder = build.RcBuilder()
+    builder.Run(DummyOpts(), ['-o', output_dir, '--id-table', id_table_file])
+    self.failUnless(os.path.exists(id_table_file))
+    first_header = util.ReadFile(header, util.RAW_TEXT)
+    ids = builder.res.GetIdTable().GetIds()
+
+    # The ids are read back instead of being assigned again.
+    old_compute = rc_header.ComputeIdTable
+    def FailingComputeIdTable(root):
+      self.fail('Ids assigned again')
+    rc_header.ComputeIdTable = FailingComputeIdTable
+    try:
+      builder = build.RcBuilder()
+      builder.Run(DummyOpts(), ['-o', output_dir, '--id-table', id_table_file])
+    finally:
+      rc_header.ComputeIdTable = old_compute
+    self.failUnlessEqual(ids, builder.res.GetIdTable().GetIds())
+    self.failUnlessEqual(first_header, util.ReadFile(header, util.RAW_TEXT))
+
+    # Different defines may give different first ids, so the table is not
+    # reused.
+    builder = build.RcBuilder()
+    builder.Run(DummyOpts(), ['-o', output_dir, '--id-table', id_table_file,
+                              '-D', 'foo'])
+    self.failUnless(rc_header.ReadIdTable(
+        id_table_file, builder.GetIdTableSignature(DummyOpts().input)))
+
+    # A malformed table is replaced with freshly assigned ids.
+    with open(id_table_file, 'w') as f:
+      f.write('{"ids": 5}')
+    builder = build.RcBuilder()
+    builder.Run(DummyOpts(), ['-o', output_dir, '--id-table', id_table_file])
+    self.failUnlessEqual(ids, builder.res.GetIdTable().GetIds())
+    self.failUnless(rc_header.ReadIdTable(
+        id_table_file, builder.GetIdTableSignature(DummyOpts().input)))
+
+  def testPolicyTemplatesInParallel(self):
+    input_dir = tempfile.mkdtemp()
+    with open(os.path.join(input_dir, 'policy_templates.json'), 'w') as f:
+      f.write('''{
+        'policy_definitions': [{
+          'name': 'HomepageLocation',
+          'type': 'string',
+          'supported_on': ['chrome.win:8-', 'chrome.linux:8-'],
+          'features': {'dynamic_refresh': True},
+          'example_value': 'http://chromium.org',
+          'id': 1,
+          'caption': 'Home page of $1',
+          'desc': 'Sets the home page.',
+        }],
+        'messages': {},
+        'placeholders': [],
+      }''')
+    input = os.path.join(input_dir, 'policy_templates.grd')
+    with open(input, 'w') as f:
+      f.write('''<?xml version="1.0"?>
+        <grit latest_public_release="2" current_release="3" base_dir=".">
+          <outputs>
+            <output filename="en/policy.json" type="json" lang="en" />
+            <output filename="en/policy.reg" type="reg" lang="en" />
+            <output filename="en/policy.plist" type="plist" lang="en" />
+            <output filename="fr/policy.json" type="json" lang="fr" />
+            <output filename="fr/policy.reg" type="reg" lang="fr" />
+            <output filename="fr/policy.plist" type="plist" lang="fr" />
+          </outputs>
+          <release seq="3">
+            <structures>
+              <structure name="IDD_POLICY_SOURCE_FILE"
+                         file="policy_templates.json"
+                         type="policy_template_metafile" />
+            </structures>
+          </release>
+        </grit>''')
+    class DummyOpts(object):
+      def __init__(self):
+        self.input = input
+        self.verbose = False
+        self.extra_verbose = False
+
+    outputs = []
+    for jobs in ('1', '2'):
+      output_dir = os.path.join(input_dir, 'out' + jobs)
+      builder = build.RcBuilder()
+      builder.Run(DummyOpts(), ['-o', output_dir, '-j', jobs,
+                                '-D', '_chromium',
+                                '-D', 'mac_bundle_id=org.chromium'])
+      # The processed policy data does not outlive the build.
+      self.failUnlessEqual({}, builder.res.policy_generators)
+      outputs.append(dict(
+          (filename, util.ReadFile(os.path.join(output_dir, filename),
+                                   util.BINARY))
+          for filename in ('en/policy.json', 'en/policy.reg',
+                           'en/policy.plist',
+                           'fr/policy.json', 'fr/policy.reg',
+                           'fr/policy.plist')))
+    self.failUnlessEqual(outputs[0], outputs[1])
+    self.failUnless('HomepageLocation' in outputs[0]['en/policy.json'])
+    self.failIfEqual(outputs[0]['en/policy.json'],
+                     outputs[0]['fr/policy.json'])
+
   def testGenerateDepFileWithDependOnStamp(self):
     output_dir = tempfile.mkdtemp()
     builder = build.RcBuilder()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''The 'grit pack' tool, for inspecting data pack (.pak) files.
+'''
+
+import getopt
+import sys
+
+from grit.format import data_pack
+from grit.format import gzip_string
+from grit.format import rc_header
+from grit.tool import interface
+
+
+# Leading bytes of common resource types, used to classify resources for the
+# per-type histogram.
+_MAGIC_TYPES = (
+  (gzip_string.GZIP_MAGIC, 'gzip'),
+  ('\x89PNG', 'png'),
+  ('\xff\xd8\xff', 'jpeg'),
+  ('GIF8', 'gif'),
+  ('RIFF', 'riff'),
+)
+
+# Number of leading bytes read from each resource to classify it.
+_SNIFF_LENGTH = 64
+
+
+def SniffType(prefix):
+  '''Returns a short name for the type of a resource given its first bytes.
+
+  Args:
+    prefix: '\x89PNG\r\n...'
+
+  Return:
+    'png'
+  '''
+  for magic, type in _MAGIC_TYPES:
+    if prefix.startswith(magic):
+      return type
+  try:
+    text = prefix.decode('utf-8').lstrip()
+  except UnicodeDecodeError:
+    # The prefix may end in the middle of a multi-byte character.
+    try:
+      text = prefix[:-3].decode('utf-8').lstrip()
+    except UnicodeDecodeError:
+      return 'binary'
+  if '\0' in text:
+    return 'binary'
+  if text.startswith('<'):
+    return 'markup'
+  if text.startswith('{') or text.startswith('['):
+    return 'json'
+  return 'text'
+
+
+def _SizeBucket(size):
+  '''Returns the smallest power of two that is at least |size|.'''
+  bucket = 1
+  while bucket < size:
+    bucket *= 2
+  return bucket
+
+
+class PackTool(interface.Tool):
+  '''Inspects data pack (.pak) files without loading them into memory.
+Resources are located by binary search over the pack's sorted index, so
+looking at a single resource only reads that resource.
+
+Usage: grit pack list [-i IDTABLE] PAKFILE
+       grit pack extract [-d] [-o OUTFILE] PAKFILE ID
+       grit pack histogram PAKFILE
+       grit pack diff PAKFILE1 PAKFILE2
+
+  list        Prints the id and size of every resource, whether it is
+              compressed, and which resource it is an alias of, if any.
+              With -i, the textual ids of the
+              resources are printed too, as found in the IDTABLE file
+              written by 'grit build --id-table'.
+
+  extract     Writes the data of resource ID to OUTFILE, or to standard
+              output if -o is not given.  With -d, a resource the pack
+              records as gzip-compressed is decompressed first.
+
+  histogram   Prints the number and total size of resources by size bucket
+              and by type of content.
+
+  diff        Prints the ids of resources that were added ('+'), removed
+              ('-') or changed ('*') between the two packs.
+'''
+
+  def ShortDescription(self):
+    return 'Lists, extracts and compares the resources of .pak files.'
+
+  def Run(self, opts, args):
+    self.SetOptions(opts)
+    commands = {
+      'list': self.List,
+      'extract': self.Extract,
+      'histogram': self.Histogram,
+      'diff': self.Diff,
+    }
+    if not args or args[0] not in commands:
+      print 'Usage: grit pack list|extract|histogram|diff [args]'
+      return 2
+    try:
+      return commands[args[0]](args[1:])
+    except data_pack.WrongFileVersion, e:
+      print '%s is not a data pack file of a supported version' % e.args[0]
+      return 2
+
+  def List(self, args):
+    id_table = None
+    (own_opts, args) = getopt.getopt(args, 'i:')
+    for (key, val) in own_opts:
+      if key == '-i':
+        try:
+          id_table = rc_header.ReadIdTable(val)
+        except ValueError, e:
+          print e
+          return 2
+    if len(args) != 1:
+      print 'Usage: grit pack list [-i IDTABLE] PAKFILE'
+      return 2
+    with data_pack.DataPackFile(args[0]) as pack:
+      self.Out('version %d, encoding %d, %d resources, %d aliases\n' % (
+          pack.version, pack.encoding, pack.num_entries, pack.num_aliases))
+      for id, size, alias_of in pack.ListResources():
+        line = '%5d %10d' % (id, size)
+        if id_table:
+          line += '  %s' % (id_table.GetTextualId(id) or '?')
+        if pack.IsCompressed(id):
+          line += '  gzip'
+        if alias_of is not None:
+          line += '  alias of %d' % alias_of
+        self.Out(line + '\n')
+    return 0
+
+  def Extract(self, args):
+    decompress = False
+    output_file = None
+    (own_opts, args) = getopt.getopt(args, 'do:')
+    for (key, val) in own_opts:
+      if key == '-d':
+        decompress = True
+      elif key == '-o':
+        output_file = val
+    if len(args) != 2:
+      print 'Usage: grit pack extract [-d] [-o OUTFILE] PAKFILE ID'
+      return 2
+    try:
+      id = int(args[1])
+    except ValueError:
+      print 'Usage: grit pack extract [-d] [-o OUTFILE] PAKFILE ID'
+      print 'ID must be a numeric resource id, not %s' % args[1]
+      return 2
+
+    with data_pack.DataPackFile(args[0]) as pack:
+      data = pack.GetResource(id)
+      compressed = pack.IsCompressed(id)
+    if data is None:
+      print 'No resource with id %s in %s' % (args[1], args[0])
+      return 1
+    if decompress and compressed:
+      data = gzip_string.GunzipString(data)
+
+    if output_file:
+      with open(output_file, 'wb') as f:
+        f.write(data)
+    else:
+      # Bypass the encoding wrapper grit_runner puts around stdout.
+      getattr(sys.stdout, 'stream', sys.stdout).write(data)
+    return 0
+
+  def Histogram(self, args):
+    if len(args) != 1:
+      print 'Usage: grit pack histogram PAKFILE'
+      return 2
+    by_bucket = {}
+    by_type = {}
+    with data_pack.DataPackFile(args[0]) as pack:
+      for id, size, alias_of in pack.ListResources():
+        if alias_of is not None:
+          continue  # Aliases take no space of their own.
+        type = SniffType(pack.GetPrefix(id, _SNIFF_LENGTH))
+        for histogram, key in ((by_bucket, _SizeBucket(size)),
+                               (by_type, type)):
+          count, total = histogram.get(key, (0, 0))
+          histogram[key] = (count + 1, total + size)
+
+    self.Out('%12s %8s %12s\n' % ('size <=', 'count', 'bytes'))
+    for bucket, (count, total) in sorted(by_bucket.items()):
+      self.Out('%12d %8d %12d\n' % (bucket, count, total))
+    self.Out('\n%12s %8s %12s\n' % ('type', 'count', 'bytes'))
+    for type, (count, total) in sorted(by_type.items(),
+                                       key=lambda item: -item[1][1]):
+      self.Out('%12s %8d %12d\n' % (type, count, total))
+    return 0
+
+  def Diff(self, args):
+    if len(args) != 2:
+      print 'Usage: grit pack diff PAKFILE1 PAKFILE2'
+      return 2
+    with data_pack.DataPackFile(args[0]) as old_pack:
+      with data_pack.DataPackFile(args[1]) as new_pack:
+        old_sizes = dict((id, size)
+                         for id, size, _ in old_pack.ListResources())
+        new_sizes = dict((id, size)
+                         for id, size, _ in new_pack.ListResources())
+        for id in sorted(set(old_sizes) | set(new_sizes)):
+          if id not in new_sizes:
+            self.Out('- %5d %10d\n' % (id, old_sizes[id]))
+          elif id not in old_sizes:
+            self.Out('+ %5d %10d\n' % (id, new_sizes[id]))
+          elif (old_sizes[id] != new_sizes[id] or
+                old_pack.GetResource(id) != new_pack.GetResource(id)):
+            self.Out('* %5d %10d -> %d\n' % (id, old_sizes[id],
+                                              new_sizes[id]))
+    return 0
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for the 'grit pack' tool.'''
+
+import os
+import sys
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+import StringIO
+
+from grit import util
+from grit.format import data_pack
+from grit.format import gzip_string
+from grit.format import rc_header
+from grit.tool import pack
+
+
+class DummyOpts(object):
+  def __init__(self):
+    self.output_stream = StringIO.StringIO()
+    self.verbose = False
+    self.extra_verbose = False
+
+
+class PackUnittest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = util.TempDir({})
+    self.old_pak = self.tmp_dir.GetPath('old.pak')
+    self.new_pak = self.tmp_dir.GetPath('new.pak')
+    data_pack.WriteDataPack(
+        {1: 'one', 2: '\x89PNG\r\n\x1a\n', 3: '{"a": 1}', 4: 'one'},
+        self.old_pak, data_pack.UTF8,
+        version=data_pack.PACK_FILE_VERSION_WITH_ALIASES)
+    # Resource 6 is a .gz file that is stored as it is.
+    data_pack.WriteDataPack(
+        {1: 'one', 2: '\x89PNG\r\n\x1a\nmore', 5: gzip_string.GzipString('x'),
+         6: gzip_string.GzipString('y')},
+        self.new_pak, data_pack.UTF8,
+        version=data_pack.PACK_FILE_VERSION_WITH_ALIASES, compressed_ids=[5])
+
+  def tearDown(self):
+    self.tmp_dir.CleanUp()
+
+  def _Run(self, args):
+    opts = DummyOpts()
+    self.assertEqual(0, pack.PackTool().Run(opts, args))
+    return opts.output_stream.getvalue()
+
+  def testSniffType(self):
+    self.assertEqual('png', pack.SniffType('\x89PNG\r\n\x1a\n'))
+    self.assertEqual('gzip', pack.SniffType(gzip_string.GzipString('x')))
+    self.assertEqual('markup', pack.SniffType('  <!doctype html>'))
+    self.assertEqual('json', pack.SniffType('{"a": 1}'))
+    self.assertEqual('text', pack.SniffType('Hello'))
+    self.assertEqual('binary', pack.SniffType('\x00\x01\x02'))
+
+  def testList(self):
+    output = self._Run(['list', self.old_pak])
+    lines = output.splitlines()
+    self.assertEqual('version 5, encoding 1, 3 resources, 1 aliases', lines[0])
+    self.assertEqual(['1', '3'], lines[1].split())
+    self.assertEqual(['4', '3', 'alias', 'of', '1'], lines[4].split())
+
+  def testListWithIdTable(self):
+    id_table_file = self.tmp_dir.GetPath('ids.json')
+    rc_header.IdTable([('IDR_ONE', 1), ('IDR_FOUR', 4)]).Write(id_table_file)
+    output = self._Run(['list', '-i', id_table_file, self.old_pak])
+    lines = output.splitlines()
+    self.assertEqual(['1', '3', 'IDR_ONE'], lines[1].split())
+    self.assertEqual(['2', '8', '?'], lines[2].split())
+    self.assertEqual(['4', '3', 'IDR_FOUR', 'alias', 'of', '1'],
+                     lines[4].split())
+
+  def testExtract(self):
+    output_file = self.tmp_dir.GetPath('out')
+    self._Run(['extract', '-o', output_file, self.old_pak, '3'])
+    self.assertEqual('{"a": 1}', util.ReadFile(output_file, util.BINARY))
+    self._Run(['extract', '-d', '-o', output_file, self.new_pak, '5'])
+    self.assertEqual('x', util.ReadFile(output_file, util.BINARY))
+    self._Run(['extract', '-d', '-o', output_file, self.new_pak, '6'])
+    self.assertEqual(gzip_string.GzipString('y'),
+                     util.ReadFile(output_file, util.BINARY))
+
+  def testListCompressed(self):
+    lines = self._Run(['list', self.new_pak]).splitlines()
+    self.assertEqual(['5', str(len(gzip_string.GzipString('x'))), 'gzip'],
+                     lines[3].split())
+    self.assertEqual(2, len(lines[4].split()))
+
+  def testExtractErrors(self):
+    opts = DummyOpts()
+    tool = pack.PackTool()
+    self.assertEqual(2, tool.Run(opts, ['extract', self.old_pak, 'IDR_ONE']))
+    not_a_pak = self.tmp_dir.GetPath('not_a.pak')
+    with open(not_a_pak, 'wb') as f:
+      f.write('<html></html>')
+    self.assertEqual(2, tool.Run(opts, ['extract', not_a_pak, '1']))
+    self.assertEqual(2, tool.Run(opts, ['list', not_a_pak]))
+
+  def testHistogram(self):
+    output = self._Run(['histogram', self.old_pak])
+    self.assertTrue(' png ' in output)
+    self.assertTrue(' json ' in output)
+
+  def testDiff(self):
+    output = self._Run(['diff', self.old_pak, self.new_pak])
+    self.assertEqual([['*', '2', '8', '->', '12'],
+                      ['-', '3', '8'],
+                      ['-', '4', '3'],
+                      ['+', '5', str(len(gzip_string.GzipString('x')))],
+                      ['+', '6', str(len(gzip_string.GzipString('y')))]],
+                     [line.split() for line in output.splitlines()])
+
+
+if __name__ == '__main__':
+  unittest.main()
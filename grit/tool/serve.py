@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''The 'grit serve' tool, a long-lived build server, and the thin client
+used by 'grit --server SOCKET build' to talk to it.
+'''
+
+import getopt
+import json
+import os
+import re
+import socket
+import StringIO
+import sys
+
+from grit import util
+from grit.format import html_inline
+from grit.tool import interface
+
+
+# Environment variable naming the socket of a running build server.
+SERVER_SOCKET_ENV = 'GRIT_SERVER_SOCKET'
+
+# Matches the $NAME and ${NAME} references os.path.expandvars() substitutes.
+_ENV_REFERENCE = re.compile(r'\$(?:(\w+)|\{([^}]*)\})')
+
+
+def _EncodeStrings(value):
+  '''Converts the unicode strings json.loads() produces back into the UTF-8
+  byte strings the rest of GRIT expects for paths and arguments.
+  '''
+  if isinstance(value, unicode):
+    return value.encode('utf-8')
+  if isinstance(value, list):
+    return [_EncodeStrings(v) for v in value]
+  if isinstance(value, dict):
+    return dict((_EncodeStrings(k), _EncodeStrings(v))
+                for k, v in value.iteritems())
+  return value
+
+
+def _GetTreeEnvironment(res):
+  '''Returns the environment variables that gathering |res| depends on: the
+  ones its file attributes reference, plus the distribution variable the HTML
+  inliner reads.
+
+  Return:
+    {'CHROMIUM_BUILD': '_google_chrome', 'OUT_DIR': None}
+  '''
+  names = set([html_inline.DIST_ENV_VAR])
+  for node in res.Preorder():
+    for value in node.attrs.itervalues():
+      if not isinstance(value, basestring):
+        continue
+      for match in _ENV_REFERENCE.finditer(value):
+        names.add(match.group(1) or match.group(2))
+  return dict((name, os.environ.get(name)) for name in names)
+
+
+class _CachedTree(object):
+  '''A gathered resource tree together with the signatures of every file
+  and the values of the environment variables that were read to produce it.
+  '''
+
+  def __init__(self, res, input_files):
+    self.res = res
+    self.signatures = dict((f, util.FileSignature(f)) for f in input_files)
+    self.environ = _GetTreeEnvironment(res)
+
+  def IsValid(self):
+    for name, value in self.environ.iteritems():
+      if os.environ.get(name) != value:
+        return False
+    for path, signature in self.signatures.iteritems():
+      if util.FileSignature(path) != signature:
+        return False
+    return True
+
+
+class ResourceTreeCache(object):
+  '''Keeps parsed and gathered resource trees (including their uberclique and
+  loaded translations) in memory between builds.  An entry is dropped as soon
+  as any of the files or environment variables it was built from changes.
+  '''
+
+  def __init__(self):
+    self.trees_ = {}
+    self.hits = 0
+    self.misses = 0
+
+  def Get(self, key):
+    entry = self.trees_.get(key)
+    if entry and entry.IsValid():
+      self.hits += 1
+      return entry.res
+    self.trees_.pop(key, None)
+    self.misses += 1
+    return None
+
+  def Put(self, key, res, input_files):
+    self.trees_[key] = _CachedTree(res, input_files)
+
+  def Clear(self):
+    self.trees_.clear()
+
+
+def _CachingRcBuilder(tree_cache):
+  '''Returns an RcBuilder whose resource trees come from |tree_cache|.'''
+  from grit.tool import build
+
+  class CachingRcBuilder(build.RcBuilder):
+    def LoadResourceTree(self, input, first_ids_file, target_platform,
+                         output_all_resource_defines, rc_header_format,
+                         debug=False):
+      whitelist = self.whitelist_names
+      key = (os.path.abspath(input),
+             os.getcwd(),
+             first_ids_file,
+             target_platform,
+             output_all_resource_defines,
+             rc_header_format,
+             tuple(sorted(self.defines.items())),
+             frozenset(whitelist) if whitelist is not None else None)
+      res = tree_cache.Get(key)
+      if res is None:
+        res = super(CachingRcBuilder, self).LoadResourceTree(
+            input, first_ids_file, target_platform,
+            output_all_resource_defines, rc_header_format, debug=debug)
+        input_files = [input] + res.GetInputFiles()
+        ids_file = first_ids_file or res.GetFirstIdsFile()
+        if ids_file:
+          input_files.append(ids_file)
+        tree_cache.Put(key, res, [os.path.abspath(f) for f in input_files])
+      return res
+
+  return CachingRcBuilder()
+
+
+class _RequestOptions(object):
+  '''Stands in for grit_runner.Options when running a build request.'''
+
+  def __init__(self, request, output_stream):
+    self.input = request['input']
+    self.verbose = request.get('verbose', False)
+    self.extra_verbose = request.get('extra_verbose', False)
+    self.output_stream = output_stream
+
+
+class BuildServer(interface.Tool):
+  '''Runs a long-lived build server that keeps parsed .grd files, their
+cliques and loaded translations in memory, so that repeated builds do not
+pay for Python startup, imports and parsing.  Cached trees are invalidated
+whenever the .grd file or any file it reads changes.
+
+Usage: grit serve [-s SOCKET]
+
+Build requests are sent by running 'grit --server SOCKET build [args]', which
+accepts the same arguments as 'grit build' and runs the build in-process if no
+server is listening on SOCKET.
+
+Options:
+
+  -s SOCKET         Path of the Unix socket to listen on.  Defaults to the
+                    value of the GRIT_SERVER_SOCKET environment variable.
+'''
+
+  def __init__(self):
+    super(BuildServer, self).__init__()
+    self.tree_cache = ResourceTreeCache()
+
+  def ShortDescription(self):
+    return 'Runs a persistent server that executes build requests.'
+
+  def Run(self, opts, args):
+    self.SetOptions(opts)
+    socket_path = os.environ.get(SERVER_SOCKET_ENV)
+    (own_opts, args) = getopt.getopt(args, 's:')
+    for (key, val) in own_opts:
+      if key == '-s':
+        socket_path = val
+    if args or not socket_path:
+      print 'Usage: grit serve [-s SOCKET]'
+      return 2
+
+    if os.path.exists(socket_path):
+      os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      listener.bind(socket_path)
+      listener.listen(16)
+      self.VerboseOut('Listening on %s\n' % socket_path)
+      self.Serve(listener)
+    finally:
+      listener.close()
+      if os.path.exists(socket_path):
+        os.remove(socket_path)
+    return 0
+
+  def Serve(self, listener):
+    '''Handles requests on |listener| one at a time until a 'shutdown'
+    request arrives.
+    '''
+    while True:
+      connection, _ = listener.accept()
+      command = None
+      try:
+        stream = connection.makefile('rwb')
+        try:
+          request = _EncodeStrings(json.loads(stream.readline()))
+          command = request.get('command')
+          response = self.HandleRequest(request)
+        except Exception, e:
+          # A malformed request must not take the server down with it.
+          response = {'status': 2,
+                      'output': 'Bad request: %s\n' % e}
+        stream.write(json.dumps(response) + '\n')
+        stream.close()
+      except socket.error:
+        # The client went away before reading its response.
+        pass
+      finally:
+        connection.close()
+      if command == 'shutdown':
+        return
+
+  def HandleRequest(self, request):
+    '''Executes a single decoded request and returns the response to send.
+
+    Args:
+      request: {'command': 'build', 'cwd': '/src', 'input': 'app.grd',
+                'args': ['-o', 'out'], 'env': {...}}
+
+    Return:
+      {'status': 0, 'output': u'...'}
+    '''
+    command = request.get('command', 'build')
+    if command == 'shutdown':
+      return {'status': 0, 'output': ''}
+    if command == 'stats':
+      return {'status': 0, 'output': 'hits: %d misses: %d\n' % (
+          self.tree_cache.hits, self.tree_cache.misses)}
+    if command != 'build':
+      return {'status': 2, 'output': 'Unknown command %s\n' % command}
+
+    # Builds change global state (working directory, environment, stdout and
+    # verbosity flags), so restore it all once the request has been handled.
+    old_cwd = os.getcwd()
+    old_environ = dict(os.environ)
+    old_stdout = sys.stdout
+    old_verbose = (util.verbose, util.extra_verbose)
+    buf = StringIO.StringIO()
+    output_stream = util.WrapOutputStream(buf)
+    opts = _RequestOptions(request, output_stream)
+    try:
+      os.chdir(request['cwd'])
+      if 'env' in request:
+        os.environ.clear()
+        os.environ.update(request['env'])
+      sys.stdout = output_stream
+      util.verbose = opts.verbose
+      util.extra_verbose = opts.extra_verbose
+      try:
+        status = _CachingRcBuilder(self.tree_cache).Run(opts, request['args'])
+      except SystemExit, e:
+        status = e.code
+      except Exception, e:
+        import traceback
+        traceback.print_exc(file=output_stream)
+        # A failed build may leave its tree half-processed.
+        self.tree_cache.Clear()
+        status = 1
+    finally:
+      sys.stdout = old_stdout
+      util.verbose, util.extra_verbose = old_verbose
+      os.environ.clear()
+      os.environ.update(old_environ)
+      os.chdir(old_cwd)
+    return {'status': status or 0, 'output': buf.getvalue().decode('utf-8')}
+
+
+def SendRequest(socket_path, request):
+  '''Sends |request| to the server listening on |socket_path| and returns its
+  decoded response.  Raises socket.error if no server is listening.
+  '''
+  client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    client.connect(socket_path)
+    stream = client.makefile('rwb')
+    stream.write(json.dumps(request) + '\n')
+    stream.flush()
+    response = json.loads(stream.readline())
+    stream.close()
+  finally:
+    client.close()
+  return response
+
+
+def RunBuild(socket_path, options, args):
+  '''Runs 'grit build' with |args| on the server at |socket_path|, falling back
+  to building in-process if no server is running.
+
+  Args:
+    socket_path: '/tmp/grit.sock'
+    options: grit_runner.Options
+    args: ['-o', 'out', '-D', 'foo']
+
+  Return:
+    The exit status of the build.
+  '''
+  request = {
+    'command': 'build',
+    'cwd': os.getcwd(),
+    'input': options.input,
+    'args': args,
+    'env': dict(os.environ),
+    'verbose': options.verbose,
+    'extra_verbose': options.extra_verbose,
+  }
+  # A custom fingerprint module changes message ids process-wide, so such
+  # builds never go through a shared server.
+  if socket_path and not options.hash:
+    try:
+      response = SendRequest(socket_path, request)
+    except socket.error:
+      pass
+    else:
+      options.output_stream.write(response['output'])
+      return response['status']
+
+  from grit.tool import build
+  toolobject = build.RcBuilder()
+  return toolobject.Run(options, args)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 The Chromium Authors. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be
+# found in the LICENSE file.
+
+'''Unit tests for the 'grit serve' tool.'''
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+if __name__ == '__main__':
+  sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import unittest
+import StringIO
+
+from grit import util
+from grit.tool import serve
+
+
+class DummyOpts(object):
+  def __init__(self):
+    self.input = util.PathFromRoot('grit/testdata/substitute.grd')
+    self.verbose = False
+    self.extra_verbose = False
+    self.hash = None
+    self.output_stream = StringIO.StringIO()
+
+
+class ServeUnittest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.output_dir = os.path.join(self.tmp_dir, 'out')
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def _BuildRequest(self, input):
+    return {'command': 'build', 'cwd': os.getcwd(), 'input': input,
+            'args': ['-o', self.output_dir]}
+
+  def testTreeIsReused(self):
+    server = serve.BuildServer()
+    input = util.PathFromRoot('grit/testdata/substitute.grd')
+    response = server.HandleRequest(self._BuildRequest(input))
+    self.failUnlessEqual(0, response['status'])
+    response = server.HandleRequest(self._BuildRequest(input))
+    self.failUnlessEqual(0, response['status'])
+    self.failUnlessEqual(1, server.tree_cache.hits)
+    self.failUnlessEqual(1, server.tree_cache.misses)
+    self.failUnless(os.path.isfile(os.path.join(self.output_dir,
+                                                'resource.h')))
+
+  def testChangedInputInvalidatesTree(self):
+    input = os.path.join(self.tmp_dir, 'substitute.grd')
+    shutil.copy(util.PathFromRoot('grit/testdata/substitute.grd'), input)
+    shutil.copy(util.PathFromRoot('grit/testdata/substitute.xmb'),
+                self.tmp_dir)
+    server = serve.BuildServer()
+    server.HandleRequest(self._BuildRequest(input))
+    with open(input, 'a') as f:
+      f.write('\n')
+    response = server.HandleRequest(self._BuildRequest(input))
+    self.failUnlessEqual(0, response['status'])
+    self.failUnlessEqual(0, server.tree_cache.hits)
+    self.failUnlessEqual(2, server.tree_cache.misses)
+
+  def testEnvironmentInvalidatesTreeOnlyIfRead(self):
+    server = serve.BuildServer()
+    input = util.PathFromRoot('grit/testdata/substitute.grd')
+    request = self._BuildRequest(input)
+    request['env'] = dict(os.environ, GRIT_UNUSED_VAR='1')
+    server.HandleRequest(request)
+    request['env'] = dict(os.environ, GRIT_UNUSED_VAR='2')
+    server.HandleRequest(request)
+    self.failUnlessEqual(1, server.tree_cache.hits)
+    request['env']['CHROMIUM_BUILD'] = '_google_chrome'
+    response = server.HandleRequest(request)
+    self.failUnlessEqual(0, response['status'])
+    self.failUnlessEqual(1, server.tree_cache.hits)
+    self.failUnlessEqual(2, server.tree_cache.misses)
+
+  def testFallsBackToInProcessBuild(self):
+    opts = DummyOpts()
+    status = serve.RunBuild(os.path.join(self.tmp_dir, 'no-server'), opts,
+                            ['-o', self.output_dir])
+    self.failUnlessEqual(0, status)
+    self.failUnless(os.path.isfile(os.path.join(self.output_dir,
+                                                'resource.h')))
+
+  def testRoundTrip(self):
+    socket_path = os.path.join(self.tmp_dir, 'grit.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+    server = serve.BuildServer()
+    thread = threading.Thread(target=server.Serve, args=(listener,))
+    thread.start()
+    try:
+      status = serve.RunBuild(socket_path, DummyOpts(),
+                              ['-o', self.output_dir])
+    finally:
+      serve.SendRequest(socket_path, {'command': 'shutdown'})
+      thread.join()
+      listener.close()
+    self.failUnlessEqual(0, status)
+    self.failUnlessEqual(1, server.tree_cache.misses)
+
+  def testBadRequestKeepsServing(self):
+    socket_path = os.path.join(self.tmp_dir, 'grit.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+    server = serve.BuildServer()
+    thread = threading.Thread(target=server.Serve, args=(listener,))
+    thread.start()
+    try:
+      client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      client.connect(socket_path)
+      stream = client.makefile('rwb')
+      stream.write('not json\n')
+      stream.flush()
+      response = json.loads(stream.readline())
+      stream.close()
+      client.close()
+      stats = serve.SendRequest(socket_path, {'command': 'stats'})
+    finally:
+      serve.SendRequest(socket_path, {'command': 'shutdown'})
+      thread.join()
+      listener.close()
+    self.failUnlessEqual(2, response['status'])
+    self.failUnlessEqual(0, stats['status'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -7,6 +7,7 @@
 '''
 
 import codecs
+import collections
 import htmlentitydefs
 import os
 import re
@@ -194,6 +195,145 @@ _HTML_CHARS_TO_ESCAPE = lazy_re.compile(
     re.IGNORECASE | re.MULTILINE)
 
 
+def FileSignature(filename):
+  '''Returns a (mtime, size) pair identifying the current contents of the
+  given file, or None if it does not exist.
+  '''
+  try:
+    st = os.stat(filename)
+  except OSError:
+    return None
+  return (st.st_mtime, st.st_size)
+
+
+def _ConvertNewlines(data):
+  '''Converts all linebreaks in |data| to '\n', as reading a file in 'rU'
+  mode does.'''
+  return data.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class _CachedFile(object):
+  '''The raw contents of a file, plus its contents as read with each of the
+  encodings ReadFile() was called with.
+  '''
+
+  def __init__(self, signature, raw):
+    self.signature = signature
+    self.contents = {BINARY: raw}
+    self.size = len(raw)
+    # Maps (encoding, derive function) to the function's result.
+    self.derived = {}
+
+  def Get(self, encoding):
+    '''Returns the contents for |encoding|, decoding them if needed.'''
+    data = self.contents.get(encoding)
+    if data is None:
+      data = _ConvertNewlines(self.contents[BINARY])
+      if encoding != RAW_TEXT:
+        data = data.decode(encoding)
+      self.contents[encoding] = data
+      self.size += len(data)
+    return data
+
+  def GetDerived(self, encoding, derive):
+    '''Returns derive() of the contents for |encoding|, calling it only once.'''
+    key = (encoding, derive)
+    if key not in self.derived:
+      self.derived[key] = derive(self.Get(encoding))
+    return self.derived[key]
+
+
+class FileCache(object):
+  '''Keeps the contents of files read by ReadFile(), keyed by absolute path.
+  A file is read from disk once for as long as its signature is unchanged,
+  and decoded once per encoding it is read with.  Once the cached contents
+  exceed |max_size| characters the least recently used files are dropped.
+  '''
+
+  def __init__(self, max_size=256 * 1024 * 1024):
+    self.max_size = max_size
+    # Least recently used first.
+    self.files_ = collections.OrderedDict()
+    self.size = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def Read(self, filename, encoding):
+    return self.ReadDerived(filename, encoding, None)
+
+  def ReadDerived(self, filename, encoding, derive):
+    '''Returns derive(contents) for the contents of |filename| read with
+    |encoding|, or the contents themselves if |derive| is None.  The result
+    is cached with the contents, and dropped along with them.
+    '''
+    path = os.path.abspath(filename)
+    signature = FileSignature(path)
+    entry = self.files_.pop(path, None)
+    if entry:
+      self.size -= entry.size
+    if entry and entry.signature == signature:
+      self.hits += 1
+    else:
+      with open(path, 'rb') as f:
+        entry = _CachedFile(signature, f.read())
+      self.misses += 1
+    if derive is None:
+      data = entry.Get(encoding)
+    else:
+      data = entry.GetDerived(encoding, derive)
+
+    self.files_[path] = entry
+    self.size += entry.size
+    while self.size > self.max_size and len(self.files_) > 1:
+      _, evicted = self.files_.popitem(last=False)
+      self.size -= evicted.size
+      self.evictions += 1
+    return data
+
+  def Stats(self):
+    '''Returns a line summarizing how effective the cache was.'''
+    return ('File cache: %d hits, %d misses, %d evictions, %d files, '
+            '%d characters' % (self.hits, self.misses, self.evictions,
+                               len(self.files_), self.size))
+
+
+# When not None, the FileCache ReadFile() reads through, so that files read
+# several times during a run (or by tools building several .grd files in one
+# process) are only read and decoded once.  Set and cleared by
+# EnableReadFileCache().
+_read_file_cache = None
+
+
+def EnableReadFileCache(enable=True):
+  '''Turns caching of ReadFile() results on or off.  Turning it off drops
+  all cached data.
+  '''
+  global _read_file_cache
+  _read_file_cache = FileCache() if enable else None
+
+
+def GetReadFileCache():
+  '''Returns the FileCache ReadFile() currently uses, or None.'''
+  return _read_file_cache
+
+
+class ReadFileCacheScope(object):
+  '''Enables the ReadFile() cache for the duration of a 'with' block, unless
+  it is already enabled, in which case the enclosing scope owns it.
+  '''
+
+  def __enter__(self):
+    self.owner_ = _read_file_cache is None
+    if self.owner_:
+      EnableReadFileCache()
+    return _read_file_cache
+
+  def __exit__(self, *exc_info):
+    if self.owner_:
+      EnableReadFileCache(False)
+
+
 def ReadFile(filename, encoding):
   '''Reads and returns the entire contents of the given file.
 
@@ -203,6 +343,9 @@ def ReadFile(filename, encoding):
               the file in binary mode, or RAW_TEXT to read it with newline
               conversion but without decoding to Unicode.
   '''
+  if _read_file_cache is not None:
+    return _read_file_cache.Read(filename, encoding)
+
   mode = 'rb' if encoding == BINARY else 'rU'
   with open(filename, mode) as f:
     data = f.read()
@@ -211,12 +354,167 @@ def ReadFile(filename, encoding):
   return data
 
 
+def ReadFileDerived(filename, encoding, derive):
+  '''Returns derive(ReadFile(filename, encoding)).  While the ReadFile() cache
+  is enabled, the result is kept with the cached contents of the file, so
+  |derive| runs once for as long as the file is unchanged.
+
+  Args:
+    filename: The path to the file.
+    encoding: As for ReadFile().
+    derive: A function of the file contents, e.g. a parser building an index.
+  '''
+  if _read_file_cache is not None:
+    return _read_file_cache.ReadDerived(filename, encoding, derive)
+  return derive(ReadFile(filename, encoding))
+
+
 def WrapOutputStream(stream, encoding = 'utf-8'):
   '''Returns a stream that wraps the provided stream, making it write
   characters using the specified encoding.'''
   return codecs.getwriter(encoding)(stream)
 
 
+class BufferedEncodingStream(object):
+  '''A stream that writes characters to the provided stream using the
+  specified encoding, like the one WrapOutputStream() returns.  What is
+  written is collected and encoded in chunks of about |buffer_size|
+  characters, so that formatters may write many small strings cheaply
+  without the whole output being kept in memory.
+
+  As with a codecs stream, the byte order mark of encodings such as utf_16
+  and utf-8-sig is written before the first text, even if it is empty.
+  Closing this stream closes the provided one.
+  '''
+
+  def __init__(self, stream, encoding='utf-8', buffer_size=64 * 1024):
+    self.stream = stream
+    self.buffer_size = buffer_size
+    self.encoder_ = codecs.getincrementalencoder(encoding)()
+    self.pending_ = []
+    self.pending_size_ = 0
+    self.written_ = False
+
+  def write(self, text):
+    self.written_ = True
+    self.pending_.append(text)
+    self.pending_size_ += len(text)
+    if self.pending_size_ >= self.buffer_size:
+      self._Encode()
+
+  def writelines(self, lines):
+    self.written_ = True
+    pending = self.pending_
+    for text in lines:
+      pending.append(text)
+      self.pending_size_ += len(text)
+      if self.pending_size_ >= self.buffer_size:
+        self._Encode()
+
+  def _Encode(self, final=False):
+    '''Encodes and writes the pending text.'''
+    text = u''.join(self.pending_)
+    del self.pending_[:]
+    self.pending_size_ = 0
+    self.stream.write(self.encoder_.encode(text, final))
+
+  def flush(self):
+    if self.pending_:
+      self._Encode()
+    self.stream.flush()
+
+  def close(self):
+    if self.written_:
+      self._Encode(final=True)
+    self.stream.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+
+def ReplaceFile(source, destination):
+  '''Renames |source| to |destination|, replacing any file of that name.  On
+  POSIX systems the replacement is atomic.
+  '''
+  try:
+    os.rename(source, destination)
+  except OSError:
+    # Windows does not rename over existing files.
+    if not os.path.exists(destination):
+      raise
+    os.remove(destination)
+    os.rename(source, destination)
+
+
+class AtomicOutputFile(object):
+  '''A file that is written under a temporary name and renamed to its real
+  name once it is complete, so that a partially written output is never
+  seen.  Use it in a 'with' block; the file is put in place when the block
+  completes, and discarded if it raises.
+
+  If |write_only_new| is true and the file already has the same contents,
+  it is left untouched, so that its timestamp does not change.  The data is
+  compared with the existing file as it is written, so the new file is never
+  read back, and the existing one at most once.  Otherwise the file is always
+  replaced, which updates its timestamp even if nothing changed, as gyp and
+  Visual Studio expect.
+  '''
+
+  def __init__(self, filename, write_only_new=False, open_function=open):
+    self.filename = filename
+    self.file_ = open_function(filename + '.tmp', 'wb')
+    # The existing file, while what was written so far matches its start.
+    self.existing_ = None
+    if write_only_new and os.path.exists(filename):
+      self.existing_ = open(filename, 'rb')
+    # Whether the file was replaced when the 'with' block completed.
+    self.replaced = False
+
+  def write(self, data):
+    if (self.existing_ is not None and
+        self.existing_.read(len(data)) != data):
+      self._StopComparing()
+    self.file_.write(data)
+
+  def writelines(self, lines):
+    for data in lines:
+      self.write(data)
+
+  def flush(self):
+    self.file_.flush()
+
+  def close(self):
+    '''Finishes writing the temporary file.  It is only put in place when the
+    'with' block completes.
+    '''
+    self.file_.close()
+
+  def _StopComparing(self):
+    self.existing_.close()
+    self.existing_ = None
+
+  def IsUnchanged(self):
+    '''Returns true if the file already exists with the contents written.'''
+    return self.existing_ is not None and self.existing_.read(1) == ''
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+    unchanged = exc_type is None and self.IsUnchanged()
+    if self.existing_ is not None:
+      self._StopComparing()
+    if exc_type is not None or unchanged:
+      os.remove(self.filename + '.tmp')
+    else:
+      ReplaceFile(self.filename + '.tmp', self.filename)
+      self.replaced = True
+
+
 def ChangeStdoutEncoding(encoding = 'utf-8'):
   '''Changes STDOUT to print characters using the specified encoding.'''
   sys.stdout = WrapOutputStream(sys.stdout, encoding)
@@ -562,6 +860,8 @@ class Substituter(object):
     Returns:
       A string of text with substitutions done.
     '''
+    if '[' not in text:
+      return text  # Most text has nothing to substitute.
     return ''.join([self._SubFragment(f) for f in self.GetExp().split(text)])
 
   def _SubFragment(self, fragment):
@@ -11,6 +11,7 @@ import sys
 if __name__ == '__main__':
   sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+import StringIO
 import unittest
 
 from grit import util
@@ -103,6 +104,133 @@ class UtilUnittest(unittest.TestCase):
           Test(test, 'cp1252', test_std_newline.decode('cp1252'))
         self.assertRaises(UnicodeDecodeError, Test, '\x80', 'utf-8', None)
 
+  def testFileCacheMatchesReadFile(self):
+    data = '\xEF\xBB\xBFabc\ndef\r\nghi\rjkl'
+    with util.TempDir({}) as tmp_dir:
+      path = tmp_dir.GetPath('testfile')
+      with open(path, 'wb') as f:
+        f.write(data)
+      cache = util.FileCache()
+      for encoding in (util.BINARY, util.RAW_TEXT, 'utf-8', 'utf-8-sig',
+                       'cp1252'):
+        self.failUnlessEqual(util.ReadFile(path, encoding),
+                             cache.Read(path, encoding))
+      self.failUnlessEqual(1, cache.misses)
+      self.failUnlessEqual(4, cache.hits)
+
+  def testFileCacheNoticesChanges(self):
+    with util.TempDir({'a.txt': 'abc'}) as tmp_dir:
+      path = tmp_dir.GetPath('a.txt')
+      cache = util.FileCache()
+      self.failUnlessEqual(u'abc', cache.Read(path, 'utf-8'))
+      with open(path, 'a') as f:
+        f.write('def')
+      self.failUnlessEqual(u'abcdef', cache.Read(path, 'utf-8'))
+      self.failUnlessEqual(2, cache.misses)
+      os.remove(path)
+      self.assertRaises(IOError, cache.Read, path, 'utf-8')
+
+  def testFileCacheEvictsLeastRecentlyUsed(self):
+    with util.TempDir({'a': 'a' * 10, 'b': 'b' * 10,
+                       'c': 'c' * 10}) as tmp_dir:
+      cache = util.FileCache(max_size=25)
+      cache.Read(tmp_dir.GetPath('a'), util.BINARY)
+      cache.Read(tmp_dir.GetPath('b'), util.BINARY)
+      cache.Read(tmp_dir.GetPath('a'), util.BINARY)
+      cache.Read(tmp_dir.GetPath('c'), util.BINARY)
+      self.failUnlessEqual(1, cache.evictions)
+      self.failUnlessEqual(20, cache.size)
+      cache.Read(tmp_dir.GetPath('a'), util.BINARY)
+      self.failUnlessEqual(2, cache.hits)
+      cache.Read(tmp_dir.GetPath('b'), util.BINARY)
+      self.failUnlessEqual(4, cache.misses)
+
+  def testReadFileDerived(self):
+    with util.TempDir({'a.txt': 'abc'}) as tmp_dir:
+      path = tmp_dir.GetPath('a.txt')
+      derived = []
+      def Derive(text):
+        derived.append(text)
+        return text.upper()
+      self.failUnlessEqual(u'ABC', util.ReadFileDerived(path, 'utf-8', Derive))
+      with util.ReadFileCacheScope() as cache:
+        self.failUnlessEqual(u'ABC',
+                             util.ReadFileDerived(path, 'utf-8', Derive))
+        self.failUnlessEqual(u'ABC',
+                             util.ReadFileDerived(path, 'utf-8', Derive))
+        self.failUnlessEqual(u'abc', cache.Read(path, 'utf-8'))
+        with open(path, 'a') as f:
+          f.write('def')
+        self.failUnlessEqual(u'ABCDEF',
+                             util.ReadFileDerived(path, 'utf-8', Derive))
+      self.failUnlessEqual([u'abc', u'abc', u'abcdef'], derived)
+
+  def testReadFileCacheScope(self):
+    self.failUnless(util.GetReadFileCache() is None)
+    with util.ReadFileCacheScope() as outer:
+      self.failUnless(util.GetReadFileCache() is outer)
+      with util.ReadFileCacheScope() as inner:
+        self.failUnless(inner is outer)
+      self.failUnless(util.GetReadFileCache() is outer)
+    self.failUnless(util.GetReadFileCache() is None)
+
+  def _WriteEncoded(self, wrap, encoding, fragments):
+    buf = StringIO.StringIO()
+    buf.close = lambda: None  # Keep the data when the stream is closed.
+    with wrap(buf, encoding) as stream:
+      for fragment in fragments:
+        stream.write(fragment)
+    return buf.getvalue()
+
+  def testBufferedEncodingStreamMatchesCodecs(self):
+    fragments = [u'STRINGTABLE\n', 'BEGIN\n', u'  IDS_A "\u00e9t\u00e9"\n',
+                 u'', u'\u4e2d\u6587' * 50, 'END\n']
+    for encoding in ('utf_16', 'utf-8-sig', 'utf_8', 'cp1252'):
+      if encoding == 'cp1252':
+        fragments = fragments[:3] + fragments[5:]
+      expected = self._WriteEncoded(util.WrapOutputStream, encoding, fragments)
+      # A small buffer makes the text be encoded in several chunks, but the
+      # byte order mark is still only written once.
+      self.failUnlessEqual(expected, self._WriteEncoded(
+          lambda stream, encoding: util.BufferedEncodingStream(
+              stream, encoding, buffer_size=8),
+          encoding, fragments))
+      self.failUnlessEqual(expected, self._WriteEncoded(
+          util.BufferedEncodingStream, encoding, fragments))
+    # As with codecs streams, the byte order mark is written for empty
+    # output, but not if nothing was written.
+    self.failUnlessEqual(self._WriteEncoded(util.WrapOutputStream, 'utf_16',
+                                            ['']),
+                         self._WriteEncoded(util.BufferedEncodingStream,
+                                            'utf_16', ['']))
+    self.failUnlessEqual('', self._WriteEncoded(util.BufferedEncodingStream,
+                                                'utf_16', []))
+
+  def testAtomicOutputFile(self):
+    with util.TempDir({'out.txt': 'old'}) as tmp_dir:
+      path = tmp_dir.GetPath('out.txt')
+
+      def Write(data, write_only_new):
+        with util.AtomicOutputFile(path, write_only_new) as f:
+          f.write(data)
+          self.failUnlessEqual('old', util.ReadFile(path, util.BINARY))
+        self.failIf(os.path.exists(path + '.tmp'))
+        return f.replaced
+
+      self.failIf(Write('old', True))
+      self.failUnless(Write('old', False))
+      self.failUnless(Write('new', True))
+      self.failUnlessEqual('new', util.ReadFile(path, util.BINARY))
+
+      # A failed write leaves the file as it was.
+      def Fail():
+        with util.AtomicOutputFile(path) as f:
+          f.write('partial')
+          raise ValueError()
+      self.assertRaises(ValueError, Fail)
+      self.failUnlessEqual('new', util.ReadFile(path, util.BINARY))
+      self.failIf(os.path.exists(path + '.tmp'))
+
 
 class TestBaseClassToLoad(object):
   pass
@@ -10,10 +10,15 @@
 import sys
 import xml.sax
 import xml.sax.handler
+from xml.parsers import expat
 
 import grit.node.base
 
 
+# Number of bytes ExpatXtbParser reads from the file at a time.
+_READ_SIZE = 64 * 1024
+
+
 class XtbContentHandler(xml.sax.handler.ContentHandler):
   '''A content handler that calls a given callback function for each
   translation in the XTB file.
@@ -62,12 +67,6 @@ class XtbContentHandler(xml.sax.handler.ContentHandler):
     if name == 'translation':
       assert self.current_id != 0
 
-      defs = self.defines
-      def pp_ifdef(define):
-        return define in defs
-      def pp_if(define):
-        return define in defs and defs[define]
-
       # If we're in an if block, only call the callback (add the translation)
       # if the expression is True.
       should_run_callback = True
@@ -94,6 +93,120 @@ class XtbContentHandler(xml.sax.handler.ContentHandler):
       self.current_structure.append((False, content))
 
 
+class ExpatXtbParser(object):
+  '''Does the work of XtbContentHandler with pyexpat directly, which saves
+  the overhead of SAX.  Text is buffered, so each run of text between
+  placeholders is a single part, and the expression of an <if> block is only
+  evaluated once.
+  '''
+
+  def __init__(self, callback, defs=None, debug=False, target_platform=None):
+    self.callback = callback
+    self.debug = debug
+    # None if we are not currently parsing a translation, otherwise the
+    # message ID of that translation.
+    self.current_id = None
+    # The parts we have for the current translation - a list of tuples
+    # (is_placeholder, text) - not including self.current_text.
+    self.current_structure = []
+    # Text of the current translation since the last placeholder.
+    self.current_text = []
+    # Set to the language ID when we see the <translationbundle> node.
+    self.language = ''
+    # The expression of the if block we're inside, and its value once known.
+    self.if_expr = None
+    self.if_value = None
+    self.defines = defs or {}
+    self.target_platform = target_platform or sys.platform
+
+  def Parse(self, xtb_file):
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = self.StartElement
+    parser.EndElementHandler = self.EndElement
+    parser.CharacterDataHandler = self.CharacterData
+    # ParseFile() would read the file in much smaller pieces.
+    while True:
+      data = xtb_file.read(_READ_SIZE)
+      parser.Parse(data, not data)
+      if not data:
+        break
+
+  def _FlushText(self):
+    if self.current_text:
+      self.current_structure.append((False, ''.join(self.current_text)))
+      self.current_text = []
+
+  def StartElement(self, name, attrs):
+    if name == 'translation':
+      assert self.current_id is None and len(self.current_structure) == 0, (
+              "Didn't expect a <translation> element here.")
+      self.current_id = attrs['id']
+    elif name == 'ph':
+      assert self.current_id is not None, "Didn't expect a <ph> element here."
+      self._FlushText()
+      self.current_structure.append((True, attrs['name']))
+    elif name == 'translationbundle':
+      self.language = attrs['lang']
+    elif name in ('if', 'then', 'else'):
+      assert self.if_expr is None, "Can't nest <if> or use <else> in xtb files"
+      self.if_expr = attrs['expr']
+      self.if_value = None
+
+  def EndElement(self, name):
+    if name == 'translation':
+      assert self.current_id is not None
+      self._FlushText()
+      # If we're in an if block, only call the callback (add the translation)
+      # if the expression is True.
+      if self.if_expr and self.if_value is None:
+        self.if_value = grit.node.base.Node.EvaluateExpression(
+            self.if_expr, self.defines, self.target_platform)
+      if not self.if_expr or self.if_value:
+        self.callback(self.current_id, self.current_structure)
+      self.current_id = None
+      self.current_structure = []
+    elif name == 'if':
+      assert self.if_expr is not None
+      self.if_expr = None
+      self.if_value = None
+
+  def CharacterData(self, content):
+    if self.current_id is not None:
+      self.current_text.append(content)
+
+
+class _BatchingCallback(object):
+  '''Collects translations and passes them to a callback |batch_size| at a
+  time, as a list of (msg_id, parts) tuples.
+  '''
+
+  def __init__(self, callback, batch_size):
+    self.callback = callback
+    self.batch_size = batch_size
+    self.batch = []
+
+  def __call__(self, msg_id, parts):
+    self.batch.append((msg_id, parts))
+    if len(self.batch) >= self.batch_size:
+      self.Flush()
+
+  def Flush(self):
+    if self.batch:
+      self.callback(self.batch)
+      self.batch = []
+
+
+def _IsPlainXtb(front_of_file):
+  '''Returns True if an XTB file starting with |front_of_file| can be parsed
+  by ExpatXtbParser, i.e. if it declares no entities and the start of its
+  <translationbundle> element is within |front_of_file|.  Other files are
+  left to the SAX parser, so that they fail the way they always have.
+  '''
+  return ('<translationbundle' in front_of_file and
+          '<!ENTITY' not in front_of_file)
+
+
 class XtbErrorHandler(xml.sax.handler.ErrorHandler):
   def error(self, exception):
     pass
@@ -106,7 +219,7 @@ class XtbErrorHandler(xml.sax.handler.ErrorHandler):
 
 
 def Parse(xtb_file, callback_function, defs=None, debug=False,
-          target_platform=None):
+          target_platform=None, fast=False, batch_size=0):
   '''Parse xtb_file, making a call to callback_function for every translation
   in the XTB file.
 
@@ -115,13 +228,22 @@ def Parse(xtb_file, callback_function, defs=None, debug=False,
   either the raw text (if is_placeholder is False) or the name of the placeholder
   (if is_placeholder is True).
 
+  With |fast|, the file is parsed with ExpatXtbParser unless it looks unusual
+  (see _IsPlainXtb()), in which case the SAX parser is still used.  The fast
+  parser never splits text between two placeholders into several parts.
+
   Args:
     xtb_file:           open('fr.xtb')
     callback_function:  def Callback(msg_id, parts): pass
+                        or, if batch_size is given,
+                        def Callback([(msg_id, parts), ...]): pass
     defs:               None, or a dictionary of preprocessor definitions.
     debug:              Default False. Set True for verbose debug output.
     target_platform:    None, or a sys.platform-like identifier of the build
                         target platform.
+    fast:               Default False. Set True to parse with pyexpat.
+    batch_size:         Default 0. If set, callback_function is called with
+                        lists of up to this many translations.
 
   Return:
     The language of the XTB, e.g. 'fr'
@@ -133,9 +255,19 @@ def Parse(xtb_file, callback_function, defs=None, debug=False,
   front_of_file = xtb_file.read(1024)
   xtb_file.seek(front_of_file.find('<translationbundle'))
 
-  handler = XtbContentHandler(callback=callback_function, defs=defs,
-                              debug=debug, target_platform=target_platform)
-  xml.sax.parse(xtb_file, handler)
+  callback = callback_function
+  if batch_size:
+    callback = _BatchingCallback(callback_function, batch_size)
+  if fast and _IsPlainXtb(front_of_file):
+    handler = ExpatXtbParser(callback=callback, defs=defs, debug=debug,
+                             target_platform=target_platform)
+    handler.Parse(xtb_file)
+  else:
+    handler = XtbContentHandler(callback=callback, defs=defs,
+                                debug=debug, target_platform=target_platform)
+    xml.sax.parse(xtb_file, handler)
+  if batch_size:
+    callback.Flush()
   assert handler.language != ''
   return handler.language
 
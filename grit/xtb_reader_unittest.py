@@ -13,6 +13,7 @@ if __name__ == '__main__':
 
 import StringIO
 import unittest
+import xml.sax
 
 from grit import util
 from grit import xtb_reader
@@ -95,6 +96,60 @@ and another after a blank line.</translation>
                      target_platform='darwin')
     self.assertEqual('Congo!', clique.MessageForLanguage('is').GetRealContent())
 
+  def testFastParserMergesText(self):
+    xtb = '''<?xml version="1.0" encoding="UTF-8"?>
+      <!DOCTYPE translationbundle>
+      <translationbundle lang="fr">
+        <translation id="1">Bo&amp;ngo
+longo <ph name="USER"/><ph name="COUNT"/>.</translation>
+        <if expr="is_linux">
+          <translation id="2">Linux</translation>
+          <translation id="3">Linux too</translation>
+        </if>
+        <if expr="not is_linux">
+          <translation id="2">Not Linux</translation>
+        </if>
+      </translationbundle>'''
+    messages = []
+    lang = xtb_reader.Parse(StringIO.StringIO(xtb),
+                            lambda id, parts: messages.append((id, parts)),
+                            target_platform='linux2', fast=True)
+    self.failUnlessEqual('fr', lang)
+    self.failUnlessEqual([
+        ('1', [(False, 'Bo&ngo\nlongo '), (True, 'USER'), (True, 'COUNT'),
+               (False, '.')]),
+        ('2', [(False, 'Linux')]),
+        ('3', [(False, 'Linux too')]),
+      ], messages)
+
+  def testBatches(self):
+    path = util.PathFromRoot('grit/testdata/generated_resources_fr.xtb')
+    batches = []
+    with open(path) as xtb:
+      xtb_reader.Parse(xtb, batches.append, fast=True, batch_size=100)
+    self.failUnless(len(batches) > 1)
+    self.failUnless(all(len(batch) == 100 for batch in batches[:-1]))
+    self.failUnless(0 < len(batches[-1]) <= 100)
+
+    messages = []
+    with open(path) as xtb:
+      xtb_reader.Parse(xtb, lambda id, parts: messages.append((id, parts)),
+                       fast=True)
+    self.failUnlessEqual(messages, sum(batches, []))
+
+  def testFastParserFallsBackForEntities(self):
+    xtb = '''<?xml version="1.0" encoding="UTF-8"?>
+      <!DOCTYPE translationbundle [<!ENTITY bingo "Bingo">]>
+      <translationbundle lang="fr">
+        <translation id="1">&bingo;!</translation>
+      </translationbundle>'''
+    self.failIf(xtb_reader._IsPlainXtb(xtb))
+    # The DOCTYPE is skipped, so the entity is undefined and the SAX parser
+    # reports it.
+    self.assertRaises(xml.sax.SAXParseException, xtb_reader.Parse,
+                      StringIO.StringIO(xtb), lambda id, parts: None,
+                      fast=True)
+
   def testParseLargeFile(self):
     def Callback(id, structure):
       pass
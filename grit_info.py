@@ -146,8 +146,11 @@ def DoMain(argv):
     inputs = []
     if len(args) == 1:
       filename = args[0]
-      inputs = Inputs(filename, defines, options.ids_file,
-                      options.target_platform)
+      # Flattened structures are gathered once per configuration, so keep the
+      # files they read in memory.
+      with util.ReadFileCacheScope():
+        inputs = Inputs(filename, defines, options.ids_file,
+                        options.target_platform)
 
     # Add in the grit source files.  If one of these change, we want to re-run
     # grit.